@@ -9,6 +9,8 @@ from darsia.image.image import *
 from darsia.image.indexing import *
 from darsia.image.patches import *
 from darsia.image.imread import *
+from darsia.image.container import *
+from darsia.image.lazyseries import *
 from darsia.image.arithmetics import *
 from darsia.measure.integration import *
 from darsia.measure.emd import *
@@ -25,7 +27,9 @@ from darsia.utils.linear_solvers.solver import *
 from darsia.utils.linear_solvers.jacobi import *
 from darsia.utils.linear_solvers.cg import *
 from darsia.utils.linear_solvers.mg import *
+from darsia.utils.linear_solvers.geometric_mg import *
 from darsia.utils.andersonacceleration import *
+from darsia.utils.profiling import *
 from darsia.utils.dtype import *
 from darsia.utils.formats import *
 from darsia.utils.grid import *
@@ -44,6 +48,7 @@ from darsia.image.subregions import *
 from darsia.corrections.basecorrection import *
 from darsia.corrections.typecorrection import *
 from darsia.corrections.shape.transformation import *
+from darsia.corrections.shape.remap import *
 from darsia.corrections.shape.curvature import *
 from darsia.corrections.shape.affine import *
 from darsia.corrections.shape.translation import *
@@ -52,6 +57,7 @@ from darsia.corrections.shape.generalizedperspective import *
 from darsia.corrections.shape.rotation import *
 from darsia.corrections.shape.drift import *
 from darsia.corrections.shape.deformation import *
+from darsia.corrections.shape.composition import *
 from darsia.corrections.color.colorbalance import *
 from darsia.corrections.color.colorcheckerfinder import *
 from darsia.corrections.color.illuminationcorrection import *
@@ -59,6 +65,7 @@ from darsia.corrections.color.colorcorrection import *
 from darsia.corrections.color.relativecolorcorrection import *
 from darsia.corrections.color.experimentalcolorcorrection import *
 from darsia.corrections.readcorrection import *
+from darsia.corrections.correctioncache import *
 from darsia.image.coordinatetransformation import *  # Requires affine correction
 from darsia.signals.models.basemodel import *
 from darsia.signals.models.combinedmodel import *
@@ -79,8 +86,10 @@ from darsia.restoration.binaryinpaint import *
 from darsia.restoration.h1_regularization import *
 from darsia.restoration.split_bregman_tvd import *
 from darsia.restoration.averaging import *
+from darsia.restoration.tiling import *
 from darsia.multi_image_analysis.translationanalysis import *
 from darsia.multi_image_analysis.concentrationanalysis import *
+from darsia.multi_image_analysis.multiconcentrationanalysis import *
 from darsia.multi_image_analysis.model_calibration import *
 from darsia.multi_image_analysis.balancing_calibration import *
 from darsia.multi_image_analysis.imageregistration import *
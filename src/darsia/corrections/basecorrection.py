@@ -17,22 +17,29 @@ class BaseCorrection(ABC):
 
     def __call__(
         self,
-        image: Union[np.ndarray, darsia.Image],
+        image: Union[np.ndarray, darsia.Image, darsia.LazyImageSeries],
         overwrite: bool = False,
-    ) -> Union[np.ndarray, darsia.Image]:
+    ) -> Union[np.ndarray, darsia.Image, darsia.LazyImageSeries]:
         """Workflow for any correction routine.
 
         Args:
-            image (array or Image): image
+            image (array, Image, or LazyImageSeries): image
             overwrite (bool): flag controlling whether the original image is overwritten
                 or the correction is applied to a copy. This option has to be used with
                 case.
 
         Returns:
-            array or Image: corrected image, data type depends on input.
+            array, Image, or LazyImageSeries: corrected image, data type depends on
+                input. For lazy series, the correction is deferred to the time slices.
 
         """
-        if isinstance(image, np.ndarray):
+        if isinstance(image, darsia.LazyImageSeries):
+            # Apply correction to each time slice when read
+            series = image if overwrite else image.copy()
+            series.add_transformation(self)
+            return series
+
+        elif isinstance(image, np.ndarray):
             if overwrite:
                 # Overwrite original array
                 image = self.correct_array(image)
@@ -0,0 +1,450 @@
+"""Module containing a persistent, content-addressed cache for corrected images.
+
+Reading an image and applying a chain of corrections is deterministic. Thus, the
+corrected image is fully determined by the content of the file, the (serialized)
+corrections, and the reading arguments. The cache stores corrected images as image
+containers (see darsia.write_image_container) under a key combining hashes of these
+ingredients, such that repeated runs can reuse corrected images instead of
+recomputing them.
+
+The cache may be shared by several processes (e.g., workers of a parallel batch
+analysis). There is no shared index file: sizes and times of last access are read
+from the cached entries themselves (the modification time of each entry marks its
+last access), and entries are written to temporary folders and renamed once
+complete. Each process updates its view of the cache incrementally with its own
+entries, and rereads all entries from disk only if its view exceeds the size limit.
+Thus, the limit may be exceeded temporarily by entries of other processes.
+
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+import darsia
+
+
+class CorrectionCache:
+    """Persistent cache of corrected images with LRU eviction.
+
+    Example:
+        cache = darsia.CorrectionCache("cache", max_size=10 * 1024**3)
+        fingerprint = cache.fingerprint_transformations(transformations)
+        image = cache.imread(path, transformations, fingerprint=fingerprint)
+        print(cache.statistics())
+
+    """
+
+    def __init__(
+        self,
+        folder: Union[str, Path],
+        max_size: Optional[int] = None,
+        mmap_mode: Optional[str] = None,
+    ) -> None:
+        """Initialization of the cache.
+
+        Args:
+            folder (str or Path): folder for storing cached images.
+            max_size (int, optional): maximal size of the cache in bytes; the least
+                recently used images are evicted once exceeded. Unbounded if None.
+            mmap_mode (str, optional): memory-map mode for reading cached images, see
+                darsia.imread_from_container. Cached images are loaded into memory if
+                None.
+
+        """
+        self.folder = Path(folder)
+        """Folder for storing cached images."""
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        self.max_size = max_size
+        """Maximal size of the cache in bytes."""
+
+        self.mmap_mode = mmap_mode
+        """Memory-map mode for reading cached images."""
+
+        self.hits = 0
+        """Number of cache hits."""
+
+        self.misses = 0
+        """Number of cache misses."""
+
+        self.evictions = 0
+        """Number of evicted cache entries."""
+
+        self._index: dict[str, dict] = self._read_index()
+        """Size and time of last access for each entry, as last read from disk."""
+
+    # ! ---- Fingerprints
+
+    def fingerprint_file(self, path: Union[str, Path]) -> str:
+        """Hash of the content of a file.
+
+        Args:
+            path (str or Path): path to file.
+
+        Returns:
+            str: hexadecimal hash.
+
+        """
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def fingerprint_transformations(self, transformations: Optional[list]) -> str:
+        """Hash of a chain of transformations, based on their serialization.
+
+        Each correction is serialized via its save() method. If not supported, the
+        correction is pickled instead.
+
+        NOTE: The serialization may be costly. Therefore, the fingerprint should be
+        computed once, and updated whenever a correction changes.
+
+        Args:
+            transformations (list, optional): chain of transformations.
+
+        Returns:
+            str: hexadecimal hash.
+
+        """
+        sha = hashlib.sha256()
+        for transformation in transformations or []:
+            if transformation is None:
+                sha.update(b"None")
+                continue
+            sha.update(type(transformation).__name__.encode())
+            sha.update(_serialize_transformation(transformation))
+        return sha.hexdigest()
+
+    def checksum_transformations(
+        self, transformations: Optional[list], sample_size: Optional[int] = None
+    ) -> str:
+        """Cheap checksum of the state of a chain of transformations.
+
+        In contrast to fingerprint_transformations, nothing is written to disk. The
+        state of each transformation (as it would be pickled, i.e., without caches
+        dropped by __getstate__) is traversed, and arrays are checksummed in memory.
+        Suited for detecting changes, incl. in-place modifications, to decide whether
+        the fingerprint has to be updated.
+
+        NOTE: The full checksum still reads all arrays (e.g., baseline images and
+        remapping tables). Checksums of subsamples of large arrays are suited for
+        checks before each use of the transformations, but may miss modifications
+        of individual entries.
+
+        Args:
+            transformations (list, optional): chain of transformations.
+            sample_size (int, optional): arrays with more entries are checksummed
+                on a regular subsample of about sample_size entries; all entries
+                are used if None.
+
+        Returns:
+            str: hexadecimal checksum.
+
+        """
+        return format(_checksum(transformations or [], sample_size=sample_size), "08x")
+
+    def key(
+        self,
+        path: Union[str, Path],
+        transformations: Optional[list] = None,
+        fingerprint: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        """Cache key of an image file read with transformations and keyword arguments.
+
+        Args:
+            path (str or Path): path to image file.
+            transformations (list, optional): chain of transformations.
+            fingerprint (str, optional): precomputed fingerprint of transformations.
+            kwargs: keyword arguments for reading the image.
+
+        Returns:
+            str: hexadecimal hash.
+
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint_transformations(transformations)
+        sha = hashlib.sha256()
+        sha.update(self.fingerprint_file(path).encode())
+        sha.update(fingerprint.encode())
+        sha.update(json.dumps(kwargs, sort_keys=True, default=str).encode())
+        return sha.hexdigest()
+
+    # ! ---- Main routines
+
+    def imread(
+        self,
+        path: Union[str, Path],
+        transformations: Optional[list] = None,
+        fingerprint: Optional[str] = None,
+        **kwargs,
+    ) -> darsia.Image:
+        """Read corrected image from cache, or read, correct and cache it.
+
+        Args:
+            path (str or Path): path to image file.
+            transformations (list, optional): chain of transformations.
+            fingerprint (str, optional): precomputed fingerprint of transformations.
+            kwargs: keyword arguments passed to darsia.imread.
+
+        Returns:
+            Image: corrected image.
+
+        """
+        key = self.key(path, transformations, fingerprint, **kwargs)
+        image = self.get(key)
+        if image is None:
+            image = darsia.imread(path, transformations=transformations, **kwargs)
+            self.put(key, image)
+        return image
+
+    def get(self, key: str) -> Optional[darsia.Image]:
+        """Fetch image from cache.
+
+        Args:
+            key (str): cache key.
+
+        Returns:
+            Image, optional: cached image, None if not cached.
+
+        """
+        entry = self.folder / key
+        try:
+            self._touch(entry)
+            image = darsia.imread_from_container(entry, mmap_mode=self.mmap_mode)
+        except (FileNotFoundError, NotADirectoryError):
+            # Not cached, or evicted by another process in the meantime
+            self.misses += 1
+            return None
+        self.hits += 1
+        return image
+
+    def put(self, key: str, image: darsia.Image) -> None:
+        """Store image in cache, and evict least recently used images if required.
+
+        Args:
+            key (str): cache key.
+            image (Image): image to be cached.
+
+        """
+        # Write to a temporary folder first, such that other processes never read
+        # incomplete entries.
+        tmp_entry = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.folder))
+        darsia.write_image_container(image, tmp_entry)
+        entry = self.folder / key
+        try:
+            os.replace(tmp_entry, entry)
+            self._touch(entry)
+        except OSError:
+            # Entry has been stored by another process in the meantime
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        # Update the index incrementally, and reread it from disk (incl. entries of
+        # other processes) only if the size limit may be exceeded.
+        try:
+            self._index[key] = self._stat(entry)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            self._index.pop(key, None)
+        if self.max_size is not None and self._indexed_size() > self.max_size:
+            self._index = self._read_index()
+            self._evict(keep=key)
+
+    def clear(self) -> None:
+        """Remove all cached images."""
+        self._index = self._read_index()
+        for key in list(self._index.keys()):
+            self._remove(key)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cache in bytes.
+
+        Returns:
+            int: size of all cached images
+
+        """
+        self._index = self._read_index()
+        return self._indexed_size()
+
+    def statistics(self) -> dict:
+        """Hit/miss statistics of the cache.
+
+        Returns:
+            dict: number of hits, misses, evictions, entries, size in bytes, and
+                hit rate.
+
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": self.size,
+            "entries": len(self._index),
+            "hit_rate": self.hits / requests if requests > 0 else 0.0,
+        }
+
+    # ! ---- Auxiliary routines
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the size limit is met."""
+        if self.max_size is None:
+            return
+        size = self._indexed_size()
+        lru_keys = sorted(self._index, key=lambda k: self._index[k]["last_access"])
+        for key in lru_keys:
+            if size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            size -= self._index[key]["size"]
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Remove single entry; moved aside first, such that removal is atomic."""
+        self._index.pop(key, None)
+        trash = Path(tempfile.mkdtemp(prefix=".del-", dir=self.folder))
+        try:
+            os.replace(self.folder / key, trash / key)
+        except OSError:
+            # Removed by another process in the meantime
+            pass
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def _touch(self, entry: Path) -> None:
+        """Mark entry as accessed now, via its modification time."""
+        now = time.time_ns()
+        os.utime(entry, ns=(now, now))
+
+    def _stat(self, entry: Path) -> dict:
+        """Read size and time of last access of single entry from disk."""
+        return {
+            "size": sum(f.stat().st_size for f in entry.iterdir()),
+            "last_access": entry.stat().st_mtime,
+        }
+
+    def _read_index(self) -> dict:
+        """Read size and time of last access of all complete entries from disk."""
+        index = {}
+        for entry in self.folder.iterdir():
+            if entry.name.startswith(".") or not darsia.is_image_container(entry):
+                continue
+            try:
+                index[entry.name] = self._stat(entry)
+            except FileNotFoundError:
+                # Evicted by another process in the meantime
+                continue
+        return index
+
+    def _indexed_size(self) -> int:
+        """Total size of the entries in the index in bytes."""
+        return sum(entry["size"] for entry in self._index.values())
+
+
+def _checksum(
+    obj,
+    value: int = 0,
+    depth: int = 0,
+    visited=None,
+    sample_size: Optional[int] = None,
+) -> int:
+    """Running CRC-32 checksum of an object and its state.
+
+    Args:
+        obj: object.
+        value (int): checksum of previously visited objects.
+        depth (int): recursion depth; objects nested deeper are represented by their
+            type only.
+        visited (set, optional): ids of visited containers, to avoid cycles.
+        sample_size (int, optional): arrays with more entries are represented by a
+            regular subsample of about sample_size entries.
+
+    Returns:
+        int: updated checksum.
+
+    """
+    visited = set() if visited is None else visited
+    value = zlib.crc32(type(obj).__qualname__.encode(), value)
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        return zlib.crc32(repr(obj).encode(), value)
+    if isinstance(obj, np.ndarray):
+        value = zlib.crc32(f"{obj.dtype}{obj.shape}".encode(), value)
+        if obj.dtype == object:
+            return _checksum(obj.tolist(), value, depth + 1, visited, sample_size)
+        if sample_size is not None and obj.size > sample_size:
+            # Same number of samples per axis, as a strided view
+            num = max(int(sample_size ** (1 / obj.ndim)), 1)
+            obj = obj[tuple(slice(None, None, -(-n // num)) for n in obj.shape)]
+        return zlib.crc32(memoryview(np.ascontiguousarray(obj)).cast("B"), value)
+    if depth > 8 or id(obj) in visited:
+        return value
+    visited.add(id(obj))
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            value = _checksum(item, value, depth + 1, visited, sample_size)
+        return value
+    if isinstance(obj, dict):
+        for key, item in obj.items():
+            value = zlib.crc32(repr(key).encode(), value)
+            value = _checksum(item, value, depth + 1, visited, sample_size)
+        return value
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        get_state = getattr(obj, "__getstate__", None)
+        state = get_state() if get_state is not None else vars(obj)
+        return _checksum(state, value, depth + 1, visited, sample_size)
+    return zlib.crc32(repr(obj).encode(), value)
+
+
+def _serialize_transformation(transformation) -> bytes:
+    """Serialize transformation based on the content of its save() output.
+
+    NOTE: The hash is computed from the content of the stored arrays, not the raw
+    file, since npz files contain timestamps.
+
+    Args:
+        transformation: correction object.
+
+    Returns:
+        bytes: serialization.
+
+    """
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            with contextlib.redirect_stdout(io.StringIO()):
+                transformation.save(Path(folder) / "transformation.npz")
+            arrays = {}
+            for path in sorted(Path(folder).iterdir()):
+                if path.suffix == ".npz":
+                    with np.load(path, allow_pickle=True) as data:
+                        arrays.update({key: data[key] for key in sorted(data.files)})
+                else:
+                    arrays[path.name] = np.load(path, allow_pickle=True)
+    except (NotImplementedError, AttributeError, TypeError):
+        return pickle.dumps(transformation)
+
+    serialization = b""
+    for key, array in arrays.items():
+        serialization += key.encode()
+        if array.dtype == object:
+            serialization += pickle.dumps(array.tolist())
+        else:
+            serialization += str(array.dtype).encode() + array.tobytes()
+    return serialization
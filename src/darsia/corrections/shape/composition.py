@@ -0,0 +1,378 @@
+"""Module containing the composition of multiple shape corrections.
+
+Each shape correction resamples the full image. Applying a chain of shape corrections
+thus results in multiple interpolations, with compounding interpolation errors. Here,
+the chain is instead composed into a single map from pixels of the corrected image to
+(non-integer) pixels of the original image, such that each image is resampled once.
+
+Static corrections (curvature, rotation, general transformations and fixed
+translations) are composed once and cached. Drift corrections are re-estimated for
+each image; the estimated translation is composed with the cached maps, and the
+estimation is restricted to the ROI of the drift correction.
+
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+import darsia
+
+_INVALID = -2.0
+"""Coordinate used for pixels without preimage in the original image."""
+
+
+def is_composable(correction) -> bool:
+    """Check whether a correction can be composed with other shape corrections.
+
+    Args:
+        correction: correction object.
+
+    Returns:
+        bool: True if the correction is a composable 2d shape correction.
+
+    """
+    return isinstance(correction, _static_corrections() + (darsia.DriftCorrection,))
+
+
+def compose_shape_corrections(transformations: list) -> list:
+    """Group consecutive composable shape corrections in a chain of transformations.
+
+    Other transformations (e.g., color corrections) remain untouched and separate
+    consecutive groups.
+
+    Example:
+        transformations = darsia.compose_shape_corrections(
+            [drift_correction, color_correction, curvature_correction]
+        )
+        image = darsia.imread(path, transformations=transformations)
+
+    Args:
+        transformations (list): chain of transformations.
+
+    Returns:
+        list: chain of transformations, with groups of more than one composable
+            shape correction replaced by a ComposedShapeCorrection.
+
+    """
+    composed_transformations = []
+    group = []
+    for transformation in transformations + [None]:
+        if transformation is not None and is_composable(transformation):
+            group.append(transformation)
+            continue
+        if len(group) == 1:
+            composed_transformations.append(group[0])
+        elif len(group) > 1:
+            composed_transformations.append(ComposedShapeCorrection(group))
+        group = []
+        if transformation is not None:
+            composed_transformations.append(transformation)
+    return composed_transformations
+
+
+class ComposedShapeCorrection(darsia.BaseCorrection):
+    """Chain of 2d shape corrections, applied through a single resampling.
+
+    The composed map is evaluated by pulling back the pixels of the corrected image
+    through all corrections in reverse order. Consecutive static corrections are
+    stored as a single coordinate map (in premultiplied format, i.e., row and column
+    coordinates multiplied with a validity weight, together with the weight). These
+    maps are computed once for the first image, and reused as long as the shape of
+    the images does not change and invalidate() is not called.
+
+    NOTE: Static corrections are assumed not to change after the first use. Call
+    invalidate() after modifying them.
+
+    Example:
+        correction = darsia.ComposedShapeCorrection(
+            [drift_correction, translation_correction, curvature_correction]
+        )
+        image = darsia.imread(path, transformations=[correction])
+
+    """
+
+    def __init__(
+        self,
+        corrections: list[darsia.BaseCorrection],
+        interpolation_order: int = 1,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            corrections (list of corrections): chain of composable shape corrections,
+                applied in the given order.
+            interpolation_order (int): order of interpolation of the final resampling,
+                0 (nearest) or 1 (linear).
+
+        Raises:
+            ValueError: if a correction is not composable.
+
+        """
+        for correction in corrections:
+            if not is_composable(correction):
+                raise ValueError(f"{type(correction)} cannot be composed.")
+
+        self.corrections = corrections
+        """Chain of shape corrections."""
+
+        self.interpolation_order = interpolation_order
+        """Order of interpolation of the final resampling."""
+
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Reset the cached maps, e.g., after modifying one of the corrections."""
+
+        self._shape: Optional[tuple[int, ...]] = None
+        """Shape of the images, for which the maps are cached."""
+
+        self._stages: list = []
+        """Cached maps of static corrections and active drift corrections."""
+
+        self._remap: Optional[darsia.RemapTable] = None
+        """Cached composed map, if no drift correction is involved."""
+
+    # ! ---- Main correction routines
+
+    def correct_array(self, img: np.ndarray) -> np.ndarray:
+        """Apply all corrections by resampling the image once.
+
+        Args:
+            img (array): 2d image, scalar or with arbitrary number of channels.
+
+        Returns:
+            array: corrected image
+
+        """
+        if self._shape != img.shape[:2]:
+            self._setup(img.shape[:2])
+
+        if self._remap is not None:
+            return self._remap(img)
+
+        # Estimate translations of drift corrections in order
+        translations = []
+        for i, stage in enumerate(self._stages):
+            if isinstance(stage, darsia.DriftCorrection):
+                translations.append(self._estimate_translation(img, i, translations))
+
+        # Pull back pixels of corrected image
+        remap = self._to_remap_table(self._pull_back(self._stages, translations))
+        if len(translations) == 0:
+            self._remap = remap
+        return remap(img)
+
+    def correct_metadata(self, metadata: dict = {}) -> dict:
+        """Accumulate the metadata corrections of all corrections.
+
+        Args:
+            metadata (dict): metadata dictionary.
+
+        Returns:
+            dict: corrected metadata dictionary.
+
+        """
+        metadata = metadata.copy()
+        meta_update = {}
+        for correction in self.corrections:
+            update = correction.correct_metadata(metadata)
+            metadata.update(update)
+            meta_update.update(update)
+        return meta_update
+
+    # ! ---- Auxiliary routines
+
+    def _setup(self, shape: tuple[int, ...]) -> None:
+        """Compose consecutive static corrections for given image shape.
+
+        Args:
+            shape (tuple of int): shape of the original images.
+
+        """
+        self.invalidate()
+        self._shape = shape
+        static_corrections = []
+        for correction in self.corrections + [None]:
+            if isinstance(correction, _static_corrections()):
+                if getattr(correction, "active", True):
+                    static_corrections.append(correction)
+                continue
+
+            # Compose static corrections by pushing forward the identity
+            if len(static_corrections) > 0:
+                coordinates = _identity(shape)
+                for static_correction in static_corrections:
+                    coordinates = static_correction.correct_array(coordinates)
+                self._stages.append(coordinates.astype(np.float32))
+                shape = coordinates.shape[:2]
+                static_corrections = []
+
+            if correction is not None and correction.active:
+                self._stages.append(correction)
+                shape = correction.base.shape[:2]
+
+    def _estimate_translation(
+        self, img: np.ndarray, index: int, translations: list[np.ndarray]
+    ) -> np.ndarray:
+        """Estimate translation of a drift correction.
+
+        The translation is determined based on the image corrected by all previous
+        stages, evaluated in the ROI only.
+
+        Args:
+            img (array): original image.
+            index (int): index of the drift correction among the stages.
+            translations (list of arrays): translations of previous drift corrections.
+
+        Returns:
+            array: translation as affine map.
+
+        """
+        drift_correction = self._stages[index]
+        shape = self._input_shape(index)
+        roi = (
+            tuple(slice(0, n) for n in shape)
+            if drift_correction.roi is None
+            else drift_correction.roi
+        )
+        coordinates = _identity(shape)[roi]
+        coordinates = self._pull_back(self._stages[:index], translations, coordinates)
+        img_roi = self._to_remap_table(coordinates)(img)
+        return drift_correction.estimate_translation(
+            img_roi, tuple(slice(0, n) for n in img_roi.shape[:2])
+        )
+
+    def _input_shape(self, index: int) -> tuple[int, ...]:
+        """Shape of the image before applying the stage with given index."""
+        shape = self._shape
+        for stage in self._stages[:index]:
+            if isinstance(stage, darsia.DriftCorrection):
+                shape = stage.base.shape[:2]
+            else:
+                shape = stage.shape[:2]
+        return shape
+
+    def _pull_back(
+        self,
+        stages: list,
+        translations: list[np.ndarray],
+        coordinates: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Pull back pixel coordinates through stages in reverse order.
+
+        Args:
+            stages (list): cached maps and drift corrections.
+            translations (list of arrays): translations of the drift corrections.
+            coordinates (array, optional): premultiplied coordinates in the frame
+                after the last stage; all pixels of that frame if None.
+
+        Returns:
+            array: premultiplied coordinates in the frame of the original image.
+
+        """
+        translations = translations[: sum(_is_drift(stage) for stage in stages)]
+        for stage in reversed(stages):
+            if _is_drift(stage):
+                if coordinates is None:
+                    coordinates = _identity(stage.base.shape[:2])
+                coordinates = _invert_affine(coordinates, translations.pop())
+            elif coordinates is None:
+                # Pixels of the frame are the cached map itself
+                coordinates = stage
+            else:
+                # Interpolate cached map at the coordinates
+                coordinates = self._to_remap_table(coordinates, 1)(stage)
+        if coordinates is None:
+            coordinates = _identity(self._shape)
+        return coordinates
+
+    def _to_remap_table(
+        self, coordinates: np.ndarray, interpolation_order: Optional[int] = None
+    ) -> darsia.RemapTable:
+        """Convert premultiplied coordinates to remap table.
+
+        Args:
+            coordinates (array): premultiplied coordinates.
+            interpolation_order (int, optional): order of interpolation; the order of
+                the final resampling is used if None.
+
+        Returns:
+            RemapTable: remap table, mapping pixels without preimage outside.
+
+        """
+        if interpolation_order is None:
+            interpolation_order = self.interpolation_order
+        rows, cols = _positions(coordinates)
+        return darsia.RemapTable.from_coordinates(rows, cols, interpolation_order)
+
+    # ! ---- I/O ----
+
+    def save(self, path: Path) -> None:
+        raise NotImplementedError("Not implemented yet.")
+
+    def load(self, path: Path) -> None:
+        raise NotImplementedError("Not implemented yet.")
+
+
+def _static_corrections() -> tuple[type, ...]:
+    """Shape corrections, which are pure warps independent of the image content."""
+    return (
+        darsia.CurvatureCorrection,
+        darsia.RotationCorrection,
+        darsia.TransformationCorrection,
+        darsia.TranslationCorrection,
+    )
+
+
+def _is_drift(stage) -> bool:
+    """Check whether a stage is a drift correction."""
+    return isinstance(stage, darsia.DriftCorrection)
+
+
+def _identity(shape: tuple[int, ...]) -> np.ndarray:
+    """Premultiplied coordinates of all pixels with unit weights."""
+    coordinates = np.ones((*shape[:2], 3), dtype=np.float32)
+    coordinates[..., :2] = np.moveaxis(np.indices(shape[:2], dtype=np.float32), 0, -1)
+    return coordinates
+
+
+def _positions(coordinates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Row and column coordinates from premultiplied coordinates.
+
+    Pixels with weights below 0.5 are considered without preimage.
+
+    """
+    weights = coordinates[..., 2]
+    valid = weights > 0.5
+    safe_weights = np.where(valid, weights, 1)
+    rows = np.where(valid, coordinates[..., 0] / safe_weights, _INVALID)
+    cols = np.where(valid, coordinates[..., 1] / safe_weights, _INVALID)
+    return rows, cols
+
+
+def _invert_affine(coordinates: np.ndarray, translation: np.ndarray) -> np.ndarray:
+    """Pull back premultiplied coordinates through an affine map.
+
+    Args:
+        coordinates (array): premultiplied coordinates in the target frame.
+        translation (array): affine map (2 x 3 matrix) operating on pixel coordinates
+            using reverse matrix indexing, as used by cv2.warpAffine.
+
+    Returns:
+        array: premultiplied coordinates in the source frame.
+
+    """
+    inverse = cv2.invertAffineTransform(np.asarray(translation, dtype=np.float64))
+    rows, cols = _positions(coordinates)
+    valid = coordinates[..., 2] > 0.5
+    pulled_back = np.zeros_like(coordinates)
+    pulled_back[..., 0] = inverse[1, 0] * cols + inverse[1, 1] * rows + inverse[1, 2]
+    pulled_back[..., 1] = inverse[0, 0] * cols + inverse[0, 1] * rows + inverse[0, 2]
+    pulled_back[..., 2] = valid
+    pulled_back[~valid] = 0
+    return pulled_back
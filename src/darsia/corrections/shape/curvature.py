@@ -545,28 +545,29 @@ class CurvatureCorrection(darsia.BaseCorrection):
 
         """
         # Precompute transformed coordinates based on self.config, if required.
-        if (
-            not (self.use_cache and self.cache_path.exists())
-            and "grid" not in self.cache
-        ):
-            self._precompute_transformed_coordinates(img)
-
-            # Store in cache
-            if self.use_cache:
-                np.save(self.cache_path, self.cache)
+        if "remap" not in self.cache and "grid" not in self.cache:
+            if self.use_cache and self.cache_path.exists():
+                # Read cache from file - only once
+                self.cache = np.load(self.cache_path, allow_pickle=True).item()
+            else:
+                self._precompute_transformed_coordinates(img)
 
-        elif self.use_cache and self.cache_path.exists():
-            # Reache cache from file
-            self.cache = np.load(self.cache_path, allow_pickle=True).item()
+                # Store in cache
+                if self.use_cache:
+                    np.save(self.cache_path, self.cache)
 
-        # Fetch precomputed transformed coordinates and the shape of the transformed image.
-        grid = self.cache["grid"]
-        shape = self.cache["shape"]
+        # Fetch precomputed remap table, and convert legacy caches of transformed
+        # coordinates.
+        if "remap" not in self.cache:
+            self.cache["remap"] = darsia.RemapTable.from_grid(
+                self.cache.pop("grid"), self.cache["shape"], self.interpolation_order
+            ).to_dict()
+        remap_table = darsia.RemapTable.from_dict(self.cache["remap"])
 
-        # Determine the corrected image
-        corrected_img = self._transform_image(img, grid, shape)
+        # Determine the corrected image - all channels at once
+        corrected_img = remap_table(img)
 
-        return corrected_img
+        return np.squeeze(corrected_img)
 
     # TODO: Add an automatic way (using e.g, gradient decent) to choose the parameters.
     # OR determine manual tuning rules.
@@ -617,7 +618,7 @@ class CurvatureCorrection(darsia.BaseCorrection):
         order of transformation. Furthermore, this routine implicitly defines
         hardcoded keywords addressing the single transformation.
 
-        The final result is stored in cache.
+        The final result is stored in cache, as remap table (see darsia.RemapTable).
 
         Args:
             img (np.ndarray)
@@ -656,11 +657,10 @@ class CurvatureCorrection(darsia.BaseCorrection):
         X = coords["X"]
         Y = coords["Y"]
 
-        # Create out grid as the corrected grid, use (row,col) format
-        grid = np.array([Y.ravel(), X.ravel()])
-
-        # Store grid and shape
-        self.cache["grid"] = grid
+        # Store transformed coordinates as remap table, and the shape
+        self.cache["remap"] = darsia.RemapTable.from_coordinates(
+            Y, X, self.interpolation_order
+        ).to_dict()
         self.cache["shape"] = X.shape[:2]
 
     def _adapt_config(self) -> None:
@@ -7,9 +7,11 @@ Finally, corrections are based on single, global translation.
 
 from typing import Optional, Union
 
+import cv2
 import numpy as np
 
 import darsia
+from darsia.utils.features import FeatureDetection
 
 
 class DriftCorrection(darsia.BaseCorrection):
@@ -107,29 +109,76 @@ class DriftCorrection(darsia.BaseCorrection):
             np.ndarray: aligned image array.
         """
         if self.active:
-            # Define roi for source image. Let input argument be dominating over self.roi.
-            roi_src = self.roi if roi is None else roi
             # Match image with baseline image
-            return self.translation_estimator.match_roi(
-                img_src=img, img_dst=self.base, roi_src=roi_src, roi_dst=self.roi
-            )
+            translation = self.estimate_translation(img, roi)
+            (h, w) = self.base.shape[:2]
+            return cv2.warpAffine(img, translation, (w, h))
         else:
             return img
 
+    def estimate_translation(
+        self, img: np.ndarray, roi: Optional[tuple[slice, ...]] = None
+    ) -> np.ndarray:
+        """
+        Determine translation aligning image with baseline image.
+
+        Args:
+            img (np.ndarray): input image, to be aligned.
+            roi (2-tuple of slices, optional): ROI to be applied to img; if None
+                the cached roi is used.
+
+        Returns:
+            np.ndarray: translation as affine map (2 x 3 matrix), operating on pixel
+                coordinates using reverse matrix indexing, see cv2.warpAffine.
+
+        Raises:
+            ValueError: if ROIs cannot be aligned by translation.
+
+        """
+        # Define roi for source image. Let input argument be dominating over self.roi.
+        roi_src = self.roi if roi is None else roi
+        translation, intact_translation = (
+            self.translation_estimator.find_effective_translation(
+                img, self.base, roi_src, self.roi
+            )
+        )
+        if not intact_translation:
+            raise ValueError("ROIs cannot be aligned by translation.")
+        return translation
+
     # ! ---- I/O ----
 
     def load(self, path) -> None:
-        """Load the drift correction from a file."""
-        self.base = np.load(path, allow_pickle=True)["base"]
-        config = np.load(path, allow_pickle=True)["config"].item()
+        """Load the drift correction from a file.
+
+        Stored features of the baseline image are restored into the feature cache of
+        the translation estimator.
+
+        """
+        data = np.load(path, allow_pickle=True)
+        self.base = data["base"]
+        config = data["config"].item()
         self._init_from_config(config)
+        if "keypoints" in data:
+            features = FeatureDetection.deserialize_features(
+                data["keypoints"], data["descriptors"]
+            )
+            self.translation_estimator.store_features(
+                self.base, self.roi, None, features
+            )
 
     def save(self, path) -> None:
-        """Save the drift correction to a file."""
+        """Save the drift correction to a file, incl. the features of the baseline."""
+        (features, _) = self.translation_estimator.extract_features(
+            self.base, self.roi, None
+        )
+        keypoints, descriptors = FeatureDetection.serialize_features(features)
         np.savez(
             path,
             class_name=type(self).__name__,
             base=self.base,
             config=self.return_config(),
+            keypoints=keypoints,
+            descriptors=descriptors,
         )
         print(f"Drift correction saved to {path}.")
@@ -0,0 +1,260 @@
+"""Module containing precomputed pixel maps for warping 2d images.
+
+Shape corrections with fixed coordinate transformations map each pixel of the
+corrected image to a (non-integer) pixel in the original image. Instead of
+interpolating each channel separately based on the transformed coordinates, the
+mapping is stored in the compact fixed-point format of cv2.remap, and applied to
+all channels at once.
+
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import cv2
+import numpy as np
+from scipy.ndimage import map_coordinates
+
+_INTERPOLATION_FLAGS = {
+    0: cv2.INTER_NEAREST,
+    1: cv2.INTER_LINEAR,
+}
+"""Translation of interpolation orders to cv2 interpolation flags.
+
+NOTE: Higher orders are not consistent with scipy.ndimage.map_coordinates (spline
+interpolation), and therefore evaluated with the latter.
+
+"""
+
+_SUPPORTED_DTYPES = [np.uint8, np.uint16, np.int16, np.float32, np.float64]
+"""Data types supported by cv2.remap."""
+
+_MAX_CHANNELS = 4
+"""Maximal number of channels supported by cv2.remap in a single call."""
+
+_MAX_FIXED_POINT_SIZE = np.iinfo(np.int16).max
+"""Maximal pixel index representable in fixed-point maps."""
+
+
+class RemapTable:
+    """Precomputed mapping from pixels of a target image to pixels of a source image.
+
+    The mapping is stored in fixed-point format (CV_16SC2 and CV_16UC1, see
+    cv2.convertMaps), requiring 6 bytes per pixel instead of 16 bytes for a grid of
+    float64 coordinates. Fixed-point coordinates have a resolution of 1/32 pixel.
+    Pixels mapped outside the source image are assigned zero.
+
+    Example:
+        table = RemapTable.from_coordinates(rows, cols, interpolation_order=1)
+        corrected_array = table(array)
+
+    """
+
+    def __init__(
+        self,
+        map1: np.ndarray,
+        map2: Optional[np.ndarray] = None,
+        interpolation_order: int = 1,
+    ) -> None:
+        """Initialization from maps in cv2.remap format.
+
+        Args:
+            map1 (array): first map, either fixed-point (CV_16SC2) integer parts, or
+                float32 column coordinates.
+            map2 (array, optional): second map, either fixed-point (CV_16UC1)
+                interpolation table indices, or float32 row coordinates.
+            interpolation_order (int): order of interpolation - 0 (nearest), 1
+                (linear), or higher (spline interpolation without cv2).
+
+        """
+        self.map1 = map1
+        """First map in cv2.remap format."""
+
+        self.map2 = map2
+        """Second map in cv2.remap format."""
+
+        self.interpolation_order = interpolation_order
+        """Order of interpolation."""
+
+    @classmethod
+    def from_coordinates(
+        cls,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        interpolation_order: int = 1,
+        fixed_point: bool = True,
+    ) -> RemapTable:
+        """Construct table from source coordinates of each target pixel.
+
+        Args:
+            rows (array): row coordinates in the source image, with the shape of the
+                target image.
+            cols (array): column coordinates in the source image, with the shape of
+                the target image.
+            interpolation_order (int): order of interpolation - 0 (nearest), 1
+                (linear), or higher (spline interpolation without cv2).
+            fixed_point (bool): flag controlling whether the maps are stored in
+                fixed-point format; not applicable for very large coordinates.
+
+        Returns:
+            RemapTable: remap table
+
+        """
+        map_x = np.ascontiguousarray(cols, dtype=np.float32)
+        map_y = np.ascontiguousarray(rows, dtype=np.float32)
+        valid_range = max(np.max(np.abs(map_x)), np.max(np.abs(map_y)))
+        if fixed_point and valid_range < _MAX_FIXED_POINT_SIZE:
+            map1, map2 = cv2.convertMaps(
+                map_x,
+                map_y,
+                cv2.CV_16SC2,
+                nninterpolation=interpolation_order == 0,
+            )
+            return cls(map1, map2, interpolation_order)
+        return cls(map_x, map_y, interpolation_order)
+
+    @classmethod
+    def from_grid(
+        cls,
+        grid: np.ndarray,
+        shape: tuple[int, ...],
+        interpolation_order: int = 1,
+    ) -> RemapTable:
+        """Construct table from flat grid of transformed coordinates.
+
+        Args:
+            grid (array): (2, N) array of row and column coordinates in the source
+                image, as used by scipy.ndimage.map_coordinates.
+            shape (tuple of int): shape of the target image.
+            interpolation_order (int): order of interpolation.
+
+        Returns:
+            RemapTable: remap table
+
+        """
+        return cls.from_coordinates(
+            np.reshape(grid[0], shape), np.reshape(grid[1], shape), interpolation_order
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the target image."""
+        return tuple(self.map1.shape[:2])
+
+    @property
+    def fixed_point(self) -> bool:
+        """Flag whether the maps are stored in fixed-point format."""
+        return self.map1.dtype == np.int16
+
+    @property
+    def nbytes(self) -> int:
+        """Memory footprint of the table in bytes."""
+        return self.map1.nbytes + (0 if self.map2 is None else self.map2.nbytes)
+
+    def coordinates(self) -> tuple[np.ndarray, np.ndarray]:
+        """Source coordinates of each target pixel.
+
+        Returns:
+            array: row coordinates, with the shape of the target image.
+            array: column coordinates, with the shape of the target image.
+
+        """
+        if self.fixed_point and self.map2 is None:
+            # Nearest neighbor maps only contain integer parts
+            map_x = self.map1[..., 0].astype(np.float32)
+            map_y = self.map1[..., 1].astype(np.float32)
+        elif self.fixed_point:
+            map_x, map_y = cv2.convertMaps(self.map1, self.map2, cv2.CV_32FC1)
+        else:
+            map_x, map_y = self.map1, self.map2
+        return map_y, map_x
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        """Warp image.
+
+        Args:
+            img (array): 2d source image, scalar or with arbitrary number of channels.
+
+        Returns:
+            array: warped image with same data type and number of channels.
+
+        """
+        if (
+            img.dtype not in _SUPPORTED_DTYPES
+            or self.interpolation_order not in _INTERPOLATION_FLAGS
+        ):
+            return self._map_coordinates(img)
+
+        flag = _INTERPOLATION_FLAGS[self.interpolation_order]
+        if img.ndim == 2 or img.shape[2] <= _MAX_CHANNELS:
+            # Apply to all channels in one call
+            return self._remap(img, flag)
+
+        # Apply to chunks of channels
+        warped_img = np.empty((*self.shape, *img.shape[2:]), dtype=img.dtype)
+        for start in range(0, img.shape[2], _MAX_CHANNELS):
+            stop = min(start + _MAX_CHANNELS, img.shape[2])
+            warped_img[:, :, start:stop] = np.atleast_3d(
+                self._remap(img[:, :, start:stop], flag)
+            )
+        return warped_img
+
+    # ! ---- Auxiliary routines
+
+    def _remap(self, img: np.ndarray, flag: int) -> np.ndarray:
+        """Single call of cv2.remap, preserving the shape of the channels."""
+        warped_img = cv2.remap(
+            np.ascontiguousarray(img),
+            self.map1,
+            self.map2,
+            flag,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0,
+        )
+        if img.ndim == 3 and warped_img.ndim == 2:
+            # cv2 drops singleton channels
+            warped_img = warped_img[:, :, np.newaxis]
+        return warped_img
+
+    def _map_coordinates(self, img: np.ndarray) -> np.ndarray:
+        """Fallback for data types and interpolation orders not supported by cv2."""
+        rows, cols = self.coordinates()
+        grid = np.array([rows.ravel(), cols.ravel()])
+        channels = np.reshape(img, (*img.shape[:2], -1))
+        warped_img = np.zeros((*self.shape, channels.shape[2]), dtype=img.dtype)
+        for i in range(channels.shape[2]):
+            warped_img[:, :, i] = (
+                map_coordinates(channels[:, :, i], grid, order=self.interpolation_order)
+                .reshape(self.shape)
+                .astype(img.dtype)
+            )
+        return np.reshape(warped_img, (*self.shape, *img.shape[2:]))
+
+    # ! ---- I/O
+
+    def to_dict(self) -> dict:
+        """Conversion to dictionary of arrays, e.g., for storing in npz files.
+
+        Returns:
+            dict: maps and interpolation order
+
+        """
+        return {
+            "map1": self.map1,
+            "map2": self.map2,
+            "interpolation_order": self.interpolation_order,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> RemapTable:
+        """Construction from dictionary, see to_dict.
+
+        Args:
+            data (dict): maps and interpolation order
+
+        Returns:
+            RemapTable: remap table
+
+        """
+        return cls(data["map1"], data.get("map2"), data["interpolation_order"])
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import itertools
+from collections import namedtuple
 from pathlib import Path
 from typing import Union
 
@@ -26,6 +27,8 @@ class RotationCorrection(darsia.BaseCorrection):
         anchor (array or list): voxel coordinates of anchor
         rotation (array): rotation matrix
         rotation_inv (array): inverted rotation matrix
+        interpolation (str): interpolation mode, "nearest" or "linear"
+        cache (namedtuple): cached source voxels for the last used image shape
 
     """
 
@@ -87,122 +90,154 @@ class RotationCorrection(darsia.BaseCorrection):
                         self.rotation_inv, rotation_inv.as_matrix()
                     )
 
+        # Interpolation mode
+        self.interpolation = kwargs.get("interpolation", "nearest")
+        if self.interpolation not in ["nearest", "linear"]:
+            raise ValueError(f"Interpolation {self.interpolation} not supported.")
+
+        # Cache of source voxels, set up for the first image
+        self.cache = None
+
     def correct_array(self, img: np.ndarray) -> np.ndarray:
         """Application of inherent rotation to provided image.
 
+        The source voxels (and interpolation weights) are cached for the shape of the
+        image, and reused as long as the shape does not change.
+
         Args:
-            img (array): image
+            img (array): image; trailing axes beyond the spatial dimensions (e.g.,
+                color channels) are rotated alike.
 
         Returns:
             array: rotated image
 
         """
-        # Warp entire array by mapping target voxels to destination
-        # voxels by applying the inverse rotations.
-
         # Implicitly assume the mapped image is of same size as the input image
-        shape = img.shape
-        num_voxels = np.prod(img.shape[: self.dim])
+        shape = img.shape[: self.dim]
+        if self.cache is None or self.cache.shape != shape:
+            self._setup_cache(shape)
 
-        # Collect all voxels in dim x num_voxels format
-        if self.dim == 2:
-            target_voxels = list(itertools.product(*[range(shape[0]), range(shape[1])]))
-        elif self.dim == 3:
-            target_voxels = list(
-                itertools.product(*[range(shape[0]), range(shape[1]), range(shape[2])])
-            )
-        target_voxels = np.transpose(np.array(target_voxels))
+        # Treat all trailing axes as channels
+        channels = np.reshape(img, (*shape, -1))
 
-        # Find corresponding voxels in the original image
-        anchor_extruded = np.outer(self.anchor, np.ones(num_voxels))
-        src_voxels = anchor_extruded + self.rotation_inv.dot(
-            target_voxels - anchor_extruded
-        )
-        src_voxels = np.clip(
-            src_voxels.astype(int),
-            0,
-            np.outer(np.array(shape) - 1, np.ones(num_voxels)),
-        ).astype(int)
-        rotated_img = np.zeros(shape)
-        rotated_img[tuple(target_voxels[j] for j in range(self.dim))] = img[
-            tuple(src_voxels[j] for j in range(self.dim))
-        ]
-        return rotated_img
-
-        # print(target_voxels[:,34], src_voxels[:,34], img[src_voxels[:,34].astype(int)])
-
-        print(self.anchor + self.rotation_inv.dot(np.array([3, 4]) - self.anchor))
-        # Determine which columns lie within the image
-        mask = np.logical_and(
-            np.all(src_voxels > -1e-3, axis=0),
-            np.all(
-                np.less(src_voxels, np.outer(np.array(shape) - 1, np.ones(num_voxels))),
-                axis=0,
-            ),
-        )
-
-        # Deactivate voxels outside range - continue only with valid ones
-        target_voxels = target_voxels[:, mask]
-        src_voxels = src_voxels[:, mask]
-        num_active_voxels = src_voxels.shape[1]
-
-        # Find related voxels in two opposite corners defining a voxel,
-        # containing src_voxels. Need to check whether the voxel is
-        # contained in the image.
-        base_corner = np.floor(src_voxels).astype(int)
-        opposite_corner = base_corner + 1
-        base_corner[
-            np.less(
-                opposite_corner,
-                np.outer(np.array(shape) - 1, np.ones(num_active_voxels)),
-            )
-        ] -= 1
-        opposite_corner[
-            np.less(
-                opposite_corner,
-                np.outer(np.array(shape) - 1, np.ones(num_active_voxels)),
-            )
-        ] -= 1
-
-        # Collect all corners of the marked voxels.
-        corners = [
-            np.vstack(comb)
-            for comb in list(
-                itertools.product(
-                    *[[base_corner[i], opposite_corner[i]] for i in range(self.dim)]
+        if self.cache.remap is not None:
+            # Warp all channels at once
+            rotated_img = self.cache.remap(channels)
+        else:
+            # Gather (and interpolate) voxel values
+            flat_channels = np.reshape(channels, (-1, channels.shape[-1]))
+            if self.cache.weights is None:
+                rotated_img = flat_channels[self.cache.indices[0]]
+            else:
+                rotated_img = sum(
+                    weights[:, np.newaxis] * flat_channels[indices]
+                    for indices, weights in zip(self.cache.indices, self.cache.weights)
                 )
+                if np.issubdtype(img.dtype, np.integer):
+                    rotated_img = np.round(rotated_img)
+                rotated_img = rotated_img.astype(img.dtype, copy=False)
+
+        return np.reshape(rotated_img, img.shape)
+
+    def correct_array_series(self, img: np.ndarray) -> np.ndarray:
+        """Application of inherent rotation to all time slices at once.
+
+        Args:
+            img (array): space-time image with time axis following the spatial axes.
+
+        Returns:
+            array: rotated space-time image
+
+        """
+        # The time axis is treated as further channel
+        return self.correct_array(img)
+
+    # ! ---- Auxiliary routines ----
+
+    def _setup_cache(self, shape: tuple[int, ...]) -> None:
+        """Determine source voxels and interpolation weights for given shape.
+
+        Target voxels are mapped to source voxels by applying the inverse rotation.
+        In 2d, the result is stored as remap table (see darsia.RemapTable). In 3d,
+        flat indices of the source voxels (and the corners of the surrounding cells,
+        together with Q1 weights, for linear interpolation) are stored.
+
+        Args:
+            shape (tuple of int): spatial shape of the image.
+
+        """
+        Cache = namedtuple("Cache", ["shape", "remap", "indices", "weights"])
+
+        # Find corresponding (non-integer) voxels in the original image - build
+        # coordinates from open grids to avoid full index arrays
+        target_voxels = np.ogrid[tuple(slice(0, n) for n in shape)]
+        src_voxels = [
+            self.anchor[i]
+            + sum(
+                self.rotation_inv[i, j] * (target_voxels[j] - self.anchor[j])
+                for j in range(self.dim)
             )
+            for i in range(self.dim)
         ]
 
-        # Evaluate standard Q1 basis functions, and scale them such that they sum to 1.
-        basis = [
-            np.prod(1 - np.absolute(corner - src_voxels), axis=0) for corner in corners
-        ]
-        basis_sum = sum(basis)
-        basis = [b / basis_sum for b in basis]
+        if self.interpolation == "nearest":
+            # Truncate and restrict to the image
+            src_voxels = [
+                np.clip(src_voxels[i].astype(int), 0, shape[i] - 1)
+                for i in range(self.dim)
+            ]
+            if self.dim == 2:
+                remap = darsia.RemapTable.from_coordinates(
+                    *src_voxels, interpolation_order=0
+                )
+                self.cache = Cache(shape, remap, None, None)
+            else:
+                indices = [np.ravel_multi_index(src_voxels, shape).ravel()]
+                self.cache = Cache(shape, None, indices, None)
+            return
 
-        # Bilinear / trilinear interpolation: sum(data in voxels * basis)
-        q1_interpolation = sum(
+        # Linear interpolation - deactivate voxels outside of the image
+        valid = np.all(
             [
-                np.multiply(
-                    basis[i],
-                    img[
-                        tuple(
-                            np.array(corners[i][j]).astype(int) for j in range(self.dim)
-                        )
-                    ],
-                )
-                for i in range(len(basis))
-            ]
+                np.logical_and(src_voxels[i] >= 0, src_voxels[i] <= shape[i] - 1)
+                for i in range(self.dim)
+            ],
+            axis=0,
         )
 
-        # Finally assign interpolated values to the associated target voxels.
-        rotated_img = np.zeros(shape)
-        rotated_img[
-            tuple(np.floor(target_voxels[j]).astype(int) for j in range(self.dim))
-        ] = q1_interpolation
-
-        return rotated_img
+        if self.dim == 2:
+            # Map inactive voxels outside of the image
+            src_voxels = [np.where(valid, src_voxels[i], -1) for i in range(self.dim)]
+            remap = darsia.RemapTable.from_coordinates(
+                *src_voxels, interpolation_order=1
+            )
+            self.cache = Cache(shape, remap, None, None)
+            return
+
+        # Find base corners of the cells containing the source voxels, and the local
+        # coordinates within the cells
+        base_corner = [
+            np.clip(np.floor(src_voxels[i]).astype(int), 0, max(shape[i] - 2, 0))
+            for i in range(self.dim)
+        ]
+        local_coordinates = [src_voxels[i] - base_corner[i] for i in range(self.dim)]
+
+        # Collect flat indices of all corners and the associated Q1 basis functions
+        indices = []
+        weights = []
+        for offset in itertools.product(range(2), repeat=self.dim):
+            corner = [
+                np.minimum(base_corner[i] + offset[i], shape[i] - 1)
+                for i in range(self.dim)
+            ]
+            basis = valid.astype(float)
+            for i in range(self.dim):
+                basis = basis * (
+                    local_coordinates[i] if offset[i] else 1 - local_coordinates[i]
+                )
+            indices.append(np.ravel_multi_index(corner, shape).ravel())
+            weights.append(basis.ravel())
+        self.cache = Cache(shape, None, indices, weights)
 
     # ! ---- I/O ----
 
@@ -222,11 +222,10 @@ class TransformationCorrection(darsia.BaseCorrection):
 
         dim = self.coordinatesystem_src.dim
         shape = *self.coordinatesystem_dst.shape, *list(array_src.shape)[dim:]
-        array_dst = np.zeros(shape, dtype=array_src.dtype)
         voxels_dst = self.coordinatesystem_dst.voxels
 
         # Re-use cache
-        Cache = namedtuple("Cache", ["voxels_src", "valid_voxels"])
+        Cache = namedtuple("Cache", ["voxels_src", "valid_voxels", "remap"])
         if not hasattr(self, "cache"):
             # Find corresponding voxels in the original image by applying the inverse map.
             # This depends on how the transformation is set up. Follow a 3-step strategy:
@@ -251,10 +250,30 @@ class TransformationCorrection(darsia.BaseCorrection):
                 axis=1,
             )
 
+            # For 2d images, store the voxel assignment as remap table; invalid voxels
+            # are mapped outside of the source image.
+            remap = None
+            if dim == 2:
+                coordinates = -np.ones((2, *self.coordinatesystem_dst.shape))
+                for j in range(dim):
+                    coordinates[j][tuple(voxels_dst[valid_voxels].T)] = voxels_src[
+                        valid_voxels, j
+                    ]
+                remap = darsia.RemapTable.from_coordinates(
+                    coordinates[0], coordinates[1], interpolation_order=0
+                )
+
             # Cache
-            self.cache = Cache(voxels_src=voxels_src, valid_voxels=valid_voxels)
+            self.cache = Cache(
+                voxels_src=voxels_src, valid_voxels=valid_voxels, remap=remap
+            )
+
+        if self.cache.remap is not None:
+            # Warp all channels at once. Assign voxel values (no interpolation)
+            return np.reshape(self.cache.remap(array_src), shape)
 
         # Warp. Assign voxel values (no interpolation)
+        array_dst = np.zeros(shape, dtype=array_src.dtype)
         array_dst[tuple(voxels_dst[self.cache.valid_voxels, j] for j in range(dim))] = (
             array_src[
                 tuple(
@@ -21,18 +21,123 @@ class TranslationEstimator:
     Images.
     """
 
-    def __init__(self, max_features: int = 200, tol: float = 0.05, keep_percent=0.1):
+    def __init__(
+        self,
+        max_features: int = 200,
+        tol: float = 0.05,
+        keep_percent=0.1,
+        cache_size: int = 2,
+    ):
         """
         Setup of user-defined tuning parameters.
 
+        Features of the last extracted images are cached, keyed by the identity of the
+        image and mask arrays, and the ROI. When aligning a sequence of images with a
+        fixed baseline, the features of the baseline are thus extracted only once, and
+        the features of each image only once for all attempted transformation types.
+
+        NOTE: Modifications of cached arrays in place are not detected; call
+        clear_cache() after such modifications.
+
         Args:
             max_features (int): feature detection parameter
             tol (float): tolerance used to detect whether matching transformation is a
                 translation
+            keep_percent (float): how much of the features should be considered for
+                finding the transformation
+            cache_size (int): number of images, for which features are cached; no
+                caching if 0
         """
         self._max_features = max_features
         self._keep_percent = keep_percent
         self._tol = tol
+        self._cache_size = cache_size
+
+        self._feature_cache: dict[tuple, tuple] = {}
+        """Features (and references to image and mask) of the last used images."""
+
+    # ! ---- Feature cache
+
+    def extract_features(
+        self,
+        img: np.ndarray,
+        roi: Optional[tuple] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> tuple:
+        """
+        Extract features from an image, reusing cached features.
+
+        Args:
+            img (np.ndarray): image array
+            roi (tuple of slices, optional): region of interest
+            mask (np.ndarray, optional): boolean mask detecting considered pixels
+
+        Returns:
+            tuple: keypoints and descriptors of the features
+            bool: flag indicating whether features have been found
+        """
+        key = self._cache_key(img, roi, mask)
+        if key in self._feature_cache:
+            # Mark as most recently used
+            entry = self._feature_cache.pop(key)
+            self._feature_cache[key] = entry
+            return entry[2]
+
+        result = FeatureDetection.extract_features(img, roi, mask, self._max_features)
+        self.store_features(img, roi, mask, result)
+        return result
+
+    def store_features(
+        self,
+        img: np.ndarray,
+        roi: Optional[tuple],
+        mask: Optional[np.ndarray],
+        result: tuple,
+    ) -> None:
+        """
+        Store features of an image in the cache, e.g., features read from file.
+
+        Args:
+            img (np.ndarray): image array
+            roi (tuple of slices, optional): region of interest
+            mask (np.ndarray, optional): boolean mask detecting considered pixels
+            result (tuple): features and flag, as returned by extract_features
+        """
+        if self._cache_size <= 0:
+            return
+        key = self._cache_key(img, roi, mask)
+        self._feature_cache.pop(key, None)
+        while len(self._feature_cache) >= self._cache_size:
+            # Evict the least recently used entry
+            self._feature_cache.pop(next(iter(self._feature_cache)))
+        # Keep references, such that the identities of the arrays are not reused
+        self._feature_cache[key] = (img, mask, result)
+
+    def clear_cache(self) -> None:
+        """Remove all cached features."""
+        self._feature_cache.clear()
+
+    def __getstate__(self) -> dict:
+        """Pickle without the cached features, as keypoints cannot be pickled."""
+        state = self.__dict__.copy()
+        state["_feature_cache"] = {}
+        return state
+
+    def _cache_key(
+        self, img: np.ndarray, roi: Optional[tuple], mask: Optional[np.ndarray]
+    ) -> tuple:
+        """Key identifying the features of an image in the cache."""
+        roi_key = (
+            None
+            if roi is None
+            else tuple(
+                (s.start, s.stop, s.step) if isinstance(s, slice) else s for s in roi
+            )
+        )
+        mask_key = None if mask is None else id(mask)
+        return (id(img), roi_key, mask_key, self._max_features)
+
+    # ! ---- Main methods
 
     def find_effective_translation(
         self,
@@ -273,11 +378,11 @@ class TranslationEstimator:
         else:
             # Extract features for both images restricted to the ROI.
             # Pixel coordinates are prescibed using reverse matrix indexing.
-            features_src, have_features_src = FeatureDetection.extract_features(
-                img_src, roi_src, mask_src, self._max_features
+            features_src, have_features_src = self.extract_features(
+                img_src, roi_src, mask_src
             )
-            features_dst, have_features_dst = FeatureDetection.extract_features(
-                img_dst, roi_dst, mask_dst, self._max_features
+            features_dst, have_features_dst = self.extract_features(
+                img_dst, roi_dst, mask_dst
             )
 
         # Check whether features are valid
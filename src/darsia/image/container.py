@@ -0,0 +1,240 @@
+"""Memory-mappable on-disk container for darsia.Image.
+
+A container is a folder with two files:
+
+* array.npy: raw data array in npy format, which can be memory-mapped. For
+  space-time images, the time axis is stored as leading axis, such that each time
+  slice is a contiguous block on disk.
+* metadata.json: image type, layout and metadata of the image.
+
+Reading a container memory-maps the array, such that the data is only loaded from
+disk when accessed, and time slices are extracted without copying.
+
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+
+import darsia
+
+CONTAINER_FORMAT = "darsia-image"
+"""Identifier of the container format."""
+
+CONTAINER_VERSION = 1
+"""Version of the container format."""
+
+_ARRAY_FILE = "array.npy"
+_METADATA_FILE = "metadata.json"
+
+
+def is_image_container(path: Union[str, Path]) -> bool:
+    """Check whether path points to an image container.
+
+    Args:
+        path (str or Path): path to folder.
+
+    Returns:
+        bool: True if the folder contains an image container.
+
+    """
+    path = Path(path)
+    return path.is_dir() and (path / _METADATA_FILE).exists()
+
+
+def write_image_container(
+    image: darsia.Image, path: Union[str, Path], block_size: int = 16
+) -> None:
+    """Write image to container.
+
+    For space-time images, the data is written in blocks of time slices, such that
+    no full-size temporary array is required.
+
+    Args:
+        image (Image): image to be stored.
+        path (str or Path): path to the container folder.
+        block_size (int): number of time slices written at once.
+
+    """
+    time_num = image.time_num if image.series else None
+    array_shape = _container_shape(image.shape, image.space_dim, time_num)
+    array = _open_container(path, image, array_shape)
+
+    if image.series:
+        # Move time axis to the front - creates a view
+        data = np.moveaxis(image.img, image.space_dim, 0)
+        for start in range(0, image.time_num, block_size):
+            stop = min(start + block_size, image.time_num)
+            array[start:stop] = data[start:stop]
+    else:
+        array[...] = image.img
+    array.flush()
+    del array
+
+
+def write_image_series_container(
+    images: Iterable[darsia.Image],
+    path: Union[str, Path],
+    time_num: int,
+) -> None:
+    """Write a stream of time slices to a single space-time image container.
+
+    Each time slice is written to disk before the next is requested, such that
+    e.g. darsia.iter_images or darsia.LazyImageSeries can be stored without
+    materializing the full space-time image.
+
+    Args:
+        images (iterable of Image): non-series images with identical shape.
+        path (str or Path): path to the container folder.
+        time_num (int): number of time slices.
+
+    Raises:
+        ValueError: if the number of images does not match time_num.
+
+    """
+    path = _prepare_folder(path)
+    array = None
+    dates = []
+    times = []
+    for counter, image in enumerate(images):
+        assert not image.series, "Only single time slices can be streamed."
+        if counter >= time_num:
+            raise ValueError("Number of images does not match time_num.")
+        if array is None:
+            # Use the first time slice to define the layout
+            first_image = image
+            array_shape = (time_num,) + tuple(image.shape)
+            array = np.lib.format.open_memmap(
+                path / _ARRAY_FILE, mode="w+", dtype=image.dtype, shape=array_shape
+            )
+        array[counter] = image.img
+        dates.append(image.date)
+        times.append(image.time)
+
+    if len(dates) != time_num:
+        raise ValueError("Number of images does not match time_num.")
+    array.flush()
+    del array
+
+    # Metadata of the space-time image
+    metadata = first_image.metadata()
+    metadata["series"] = True
+    metadata["date"] = dates
+    metadata["time"] = None if None in times else times
+    _write_metadata(path, type(first_image), array_shape, first_image.dtype, metadata)
+
+
+def imread_from_container(
+    path: Union[str, Path], mmap_mode: Optional[str] = "c"
+) -> darsia.Image:
+    """Read image from container.
+
+    Args:
+        path (str or Path): path to the container folder.
+        mmap_mode (str, optional): memory-map mode of numpy.load; the default "c"
+            (copy-on-write) allows in-place modifications in memory, which are not
+            written to disk; if None, the data is loaded into memory.
+
+    Returns:
+        Image: image (of stored type) with possibly memory-mapped data array.
+
+    Raises:
+        ValueError: if format is not supported.
+
+    """
+    path = Path(path)
+    with open(path / _METADATA_FILE, "r") as f:
+        header = json.load(f)
+    if header.get("format") != CONTAINER_FORMAT:
+        raise ValueError(f"{path} is not a {CONTAINER_FORMAT} container.")
+
+    metadata = _decode(header["metadata"])
+    array = np.load(path / _ARRAY_FILE, mmap_mode=mmap_mode)
+
+    # Move time axis back to its place - creates a view
+    if metadata["series"]:
+        array = np.moveaxis(array, 0, metadata["space_dim"])
+
+    image_type = getattr(darsia, header["type"], darsia.Image)
+    return image_type(img=array, **metadata)
+
+
+# ! ---- Auxiliary routines
+
+
+def _container_shape(
+    shape: tuple[int, ...], space_dim: int, time_num: Optional[int]
+) -> tuple[int, ...]:
+    """Shape of the stored array, with the time axis first for space-time images."""
+    if time_num is None:
+        return tuple(shape)
+    return (time_num,) + tuple(shape[:space_dim]) + tuple(shape[space_dim + 1 :])
+
+
+def _prepare_folder(path: Union[str, Path]) -> Path:
+    """Create the container folder."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _open_container(
+    path: Union[str, Path], image: darsia.Image, array_shape: tuple[int, ...]
+) -> np.memmap:
+    """Write metadata and allocate memory-mapped array on disk."""
+    path = _prepare_folder(path)
+    _write_metadata(path, type(image), array_shape, image.dtype, image.metadata())
+    return np.lib.format.open_memmap(
+        path / _ARRAY_FILE, mode="w+", dtype=image.dtype, shape=array_shape
+    )
+
+
+def _write_metadata(
+    path: Union[str, Path],
+    image_type: type,
+    array_shape: tuple[int, ...],
+    dtype: np.dtype,
+    metadata: dict,
+) -> None:
+    """Write metadata sidecar in json format."""
+    header = {
+        "format": CONTAINER_FORMAT,
+        "version": CONTAINER_VERSION,
+        "type": image_type.__name__,
+        "shape": list(array_shape),
+        "dtype": np.dtype(dtype).str,
+        "metadata": _encode(metadata),
+    }
+    with open(Path(path) / _METADATA_FILE, "w") as f:
+        json.dump(header, f, indent=4)
+
+
+def _encode(item: Any) -> Any:
+    """Convert metadata to json-compatible format."""
+    if isinstance(item, dict):
+        return {key: _encode(value) for key, value in item.items()}
+    elif isinstance(item, (list, tuple)):
+        return [_encode(value) for value in item]
+    elif isinstance(item, datetime):
+        return {"__datetime__": item.isoformat()}
+    elif isinstance(item, np.ndarray):
+        return item.tolist()
+    elif isinstance(item, np.generic):
+        return item.item()
+    return item
+
+
+def _decode(item: Any) -> Any:
+    """Convert metadata from json-compatible format."""
+    if isinstance(item, dict):
+        if "__datetime__" in item:
+            return datetime.fromisoformat(item["__datetime__"])
+        return {key: _decode(value) for key, value in item.items()}
+    elif isinstance(item, list):
+        return [_decode(value) for value in item]
+    return item
@@ -1620,17 +1620,23 @@ class Image:
     def save(self, path: Union[str, Path], verbose=True) -> None:
         """Save image to file.
 
-        Store array and metadata in single file.
+        By default, the image is stored in a memory-mappable container, i.e., a folder
+        with the raw data array and a metadata file, see darsia.write_image_container.
+        For backward compatibility, array and metadata are stored in a single npz
+        file if the path ends with "npz".
 
-        NOTE: Keywords are compatible with imread_from_npz.
+        NOTE: Both formats are compatible with imread.
 
         Args:
-            path (Path): full path to image. Use ending "npz".
+            path (Path): full path to image container, or npz file.
 
         """
         # Make sure the parent directory exists
         Path(path).parent.mkdir(parents=True, exist_ok=True)
-        np.savez(str(Path(path)), array=self.img, metadata=self.metadata())
+        if Path(path).suffix == ".npz":
+            np.savez(str(Path(path)), array=self.img, metadata=self.metadata())
+        else:
+            darsia.write_image_container(self, path)
         if verbose:
             print(f"Image stored under {path}")
 
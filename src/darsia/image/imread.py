@@ -5,16 +5,21 @@ are supported:
 * DICOM images: *dcm
 * simulation data: anything which can be read by meshio, e.g. *vtu
 * numpy images: *npy
+* DarSIA images: *npz, and memory-mappable image containers (folders)
 
 """
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from io import BytesIO
+from multiprocessing import get_context
 from operator import itemgetter
 from pathlib import Path
 from subprocess import check_output
-from typing import Optional, Union
+from typing import Iterator, Literal, Optional, Union
 
 import cv2
 import numpy as np
@@ -34,13 +39,51 @@ def imread(path: Union[str, Path, list[str], list[Path]], **kwargs) -> darsia.Im
 
     Args:
         path (str, Path or list of such): path(s) to file(s).
-        kwargs: keyword arguments tailored to the file format.
+        kwargs: keyword arguments tailored to the file format; for lists of optical
+            images, see also 'num_workers', 'executor' and 'prefetch' of
+            imread_from_optical; for image containers, see 'mmap_mode' of
+            imread_from_container.
 
     Returns:
         Image, or list of such: image of collection of images.
 
     """
 
+    # Memory-mappable image containers
+    if not isinstance(path, list) and darsia.is_image_container(path):
+        return darsia.imread_from_container(path, kwargs.get("mmap_mode", "c"))
+
+    # Convert to path(s), and determine file type of images
+    path = _resolve_path(path)
+    suffix = _resolve_suffix(path, kwargs.get("suffix", None))
+
+    # Depending on the ending run the corresponding routine.
+    if suffix == ".npy":
+        return imread_from_numpy(path, **kwargs)
+    elif suffix == ".npz":
+        return imread_from_npz(path)
+    elif suffix in [".jpg", ".jpeg", ".png", ".tif", ".tiff"]:
+        return imread_from_optical(path, **kwargs)
+    elif suffix in [".dcm"]:
+        return imread_from_dicom(path, **kwargs)
+    elif suffix in [".vtu"]:
+        return imread_from_vtu(path, **kwargs)
+    else:
+        raise NotImplementedError(f"Filetype {suffix} not supported.")
+
+
+def _resolve_path(
+    path: Union[str, Path, list[str], list[Path]]
+) -> Union[Path, list[Path]]:
+    """Convert input to path(s), and extract the content of folders.
+
+    Args:
+        path (str, Path or list of such): path(s) to file(s) or folder(s).
+
+    Returns:
+        Path or list of Path: path(s) to existing file(s).
+
+    """
     # Convert to path
     if isinstance(path, list):
         path = [Path(p) for p in path]
@@ -62,9 +105,20 @@ def imread(path: Union[str, Path, list[str], list[Path]], **kwargs) -> darsia.Im
     else:
         assert path.exists(), f"File {path} does not exist."
 
-    # Determine file type of images
-    suffix = kwargs.get("suffix", None)
+    return path
 
+
+def _resolve_suffix(path: Union[Path, list[Path]], suffix: Optional[str] = None) -> str:
+    """Determine the (common) file type of path(s).
+
+    Args:
+        path (Path or list of Path): path(s) to file(s).
+        suffix (str, optional): user-defined suffix, used if provided.
+
+    Returns:
+        str: lowercase suffix.
+
+    """
     if suffix is None:
         if isinstance(path, list):
             suffix = path[0].suffix
@@ -75,19 +129,97 @@ def imread(path: Union[str, Path, list[str], list[Path]], **kwargs) -> darsia.Im
         # Use lowercase for robustness
         suffix = str(suffix).lower()
 
-    # Depending on the ending run the corresponding routine.
-    if suffix == ".npy":
-        return imread_from_numpy(path, **kwargs)
-    elif suffix == ".npz":
-        return imread_from_npz(path)
-    elif suffix in [".jpg", ".jpeg", ".png", ".tif", ".tiff"]:
-        return imread_from_optical(path, **kwargs)
-    elif suffix in [".dcm"]:
-        return imread_from_dicom(path, **kwargs)
-    elif suffix in [".vtu"]:
-        return imread_from_vtu(path, **kwargs)
+    return suffix
+
+
+def iter_images(
+    path: Union[str, Path, list[str], list[Path], darsia.Image],
+    time: Optional[list] = None,
+    transformations: Optional[list] = None,
+    **kwargs,
+) -> Iterator[darsia.Image]:
+    """Lazy reading of a series of images, one time slice at a time.
+
+    In contrast to imread, the series is never stacked into a single array. Each
+    time slice is read, converted, corrected by the transformations, and yielded
+    as a non-series image, before the next slice is processed. Thus, the memory
+    footprint is bounded by a few time slices, independent of the series length.
+
+    Args:
+        path (str, Path, list of such, or Image): path(s) to file(s) or folder(s),
+            each file containing a single time slice; alternatively a space-time
+            image or image container, which is decomposed into its time slices.
+        time (list, optional): user-specified physical times; detected from
+            metadata if 'None'.
+        transformations (list of callables): transformations applied to each
+            time slice.
+        kwargs: keyword arguments tailored to the file format; for optical images,
+            see also 'num_workers', 'executor' and 'prefetch' of
+            imread_from_optical.
+
+    Yields:
+        Image: corrected time slice.
+
+    """
+    # Decompose space-time images, possibly memory-mapped from image containers
+    if not isinstance(path, (list, darsia.Image)) and darsia.is_image_container(path):
+        path = darsia.imread_from_container(path)
+    if isinstance(path, darsia.Image):
+        for time_index in range(path.time_num):
+            image = path.time_slice(time_index) if path.series else path.copy()
+            if time is not None:
+                image.set_time(time[time_index])
+            # NOTE: Time slices are views - do not overwrite the original data.
+            for transformation in transformations or []:
+                if transformation is not None and hasattr(transformation, "__call__"):
+                    image = transformation(image, overwrite=False)
+            yield image
+        return
+
+    # Convert to path(s), and determine file type of images
+    path = _resolve_path(path)
+    if not isinstance(path, list):
+        path = [path]
+    suffix = _resolve_suffix(path, kwargs.pop("suffix", None))
+    times = len(path) * [None] if time is None else time
+    assert len(times) == len(path), "Provide one time per image."
+
+    if suffix in [".jpg", ".jpeg", ".png", ".tif", ".tiff"]:
+        # Use a prefetch queue for optical images
+        data = _iter_optical_data(
+            path,
+            num_workers=kwargs.pop("num_workers", 1),
+            executor=kwargs.pop("executor", "thread"),
+            prefetch=kwargs.pop("prefetch", None),
+        )
+        # Use custom dates if provided, otherwise read from metadata
+        dates = kwargs.pop("date", len(path) * [None])
+        kwargs["series"] = False
+        if "color_space" not in kwargs:
+            kwargs["color_space"] = "RGB"
+        for (array, date), custom_date, t in zip(data, dates, times):
+            if custom_date is not None:
+                date = custom_date
+
+            # Use the first date as reference date, if not provided otherwise
+            if "reference_date" not in kwargs and date is not None:
+                kwargs["reference_date"] = date
+
+            yield darsia.OpticalImage(
+                img=array,
+                date=date,
+                time=t,
+                transformations=transformations,
+                **kwargs,
+            ).img_as(float)
+
     else:
-        raise NotImplementedError(f"Filetype {suffix} not supported.")
+        # Read files one by one with the general reading routine
+        for p, t in zip(path, times):
+            image = imread(p, transformations=transformations, **kwargs)
+            if t is not None:
+                image.set_time(t)
+            yield image
 
 
 def imread_from_bytes(
@@ -148,6 +280,9 @@ def imread_from_numpy(
 def imread_from_npz(path: Union[Path, list[Path]]) -> darsia.Image:
     """Converter from npz format to darsia.Image.
 
+    NOTE: The data is loaded eagerly. For large images, memory-mappable image
+    containers are preferred, see imread_from_container.
+
     Args:
         path (Path or list of Path): path(s) to npz files.
 
@@ -178,6 +313,11 @@ def imread_from_optical(
         keyword arguments:
             date (datetime): custom datetime; otherwise read from metadata
             color_space (str): custom color space; RGB is assumed otherwise
+            num_workers (int): number of workers used to read a list of images;
+                defaults to 1, i.e., serial reading
+            executor (str): "thread" (default) or "process" pool of workers
+            prefetch (int): number of images decoded ahead in parallel reading;
+                defaults to twice the number of workers
             any arguments accepted by Image
 
     Returns:
@@ -187,6 +327,11 @@ def imread_from_optical(
     """
     # TODO check method for grayscale images. shape of array?
 
+    # Parameters for reading collections of images
+    num_workers = kwargs.pop("num_workers", 1)
+    executor = kwargs.pop("executor", "thread")
+    prefetch = kwargs.pop("prefetch", None)
+
     if isinstance(path, Path):
         # Read single image incl. date from metadata of the image
         array, date = _read_single_optical_image(path)
@@ -213,8 +358,15 @@ def imread_from_optical(
     elif isinstance(path, list):
         # Collection of images
 
-        # Read from file
-        data = [_read_single_optical_image(p) for p in path]
+        # Read from file - possibly in parallel, but always in order
+        data = list(
+            _iter_optical_data(
+                path,
+                num_workers=num_workers,
+                executor=executor,
+                prefetch=prefetch,
+            )
+        )
 
         # Create a space-time optical image through stacking along the time axis
         space_time_array = np.stack([d[0] for d in data], axis=2)
@@ -238,9 +390,76 @@ def imread_from_optical(
         raise NotImplementedError
 
 
+def _iter_optical_data(
+    paths: list[Path],
+    num_workers: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+    prefetch: Optional[int] = None,
+) -> Iterator[tuple[np.ndarray, Optional[datetime]]]:
+    """Read a collection of optical images, possibly in parallel.
+
+    The images are decoded by a pool of workers, while the results are returned
+    in the order of the input. At most 'prefetch' images are held in memory ahead
+    of the consumer, which bounds the memory footprint also for long series.
+
+    NOTE: Decoding with cv2 releases the GIL, such that a thread pool is usually
+    sufficient and avoids the serialization of the arrays between processes. Process
+    pools are started with 'spawn', since forking a process running cv2 may deadlock.
+
+    Args:
+        paths (list of Path): paths to images.
+        num_workers (int): number of workers; serial reading if 1.
+        executor (str): type of the pool, either "thread" or "process".
+        prefetch (int, optional): number of images decoded ahead of the consumer;
+            defaults to twice the number of workers.
+
+    Yields:
+        tuple: data array in RGB format and date (optional) for each image.
+
+    Raises:
+        ValueError: if executor type is not supported.
+
+    """
+    if num_workers is None or num_workers <= 1:
+        for p in paths:
+            yield _read_single_optical_image(p)
+        return
+
+    if executor == "thread":
+        pool: Executor = ThreadPoolExecutor(max_workers=num_workers)
+    elif executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=get_context("spawn")
+        )
+    else:
+        raise ValueError(f"Executor type {executor} not supported.")
+
+    if prefetch is None:
+        prefetch = 2 * num_workers
+    prefetch = max(prefetch, 1)
+
+    with pool:
+        # Bounded queue of pending reads, in input order
+        queue: deque = deque()
+        path_iterator = iter(paths)
+        for p in path_iterator:
+            queue.append(pool.submit(_read_single_optical_image, p))
+            if len(queue) >= prefetch:
+                break
+        while queue:
+            data = queue.popleft().result()
+            next_path = next(path_iterator, None)
+            if next_path is not None:
+                queue.append(pool.submit(_read_single_optical_image, next_path))
+            yield data
+
+
 def _read_single_optical_image(path: Path) -> tuple[np.ndarray, Optional[datetime]]:
     """Utility function for setting up a single optical image.
 
+    The file is read only once; both the pixel data and the exif data are decoded
+    from the same byte buffer.
+
     Args:
         path (Path): path to single optical image.
 
@@ -249,12 +468,42 @@ def _read_single_optical_image(path: Path) -> tuple[np.ndarray, Optional[datetim
         date (optional): date
 
     """
-    # Read image and convert to RGB and float ([0,1])
-    array = cv2.cvtColor(cv2.imread(str(path), cv2.IMREAD_UNCHANGED), cv2.COLOR_BGR2RGB)
+    # Read file content once
+    with open(path, "rb") as f:
+        buffer = f.read()
+
+    # Decode image and convert to RGB
+    array = cv2.cvtColor(
+        cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_UNCHANGED),
+        cv2.COLOR_BGR2RGB,
+    )
+
+    # Read date from metadata
+    date = _read_optical_date(path, buffer)
+
+    return array, date
+
+
+def _read_optical_date(
+    path: Path, buffer: Optional[bytes] = None
+) -> Optional[datetime]:
+    """Utility function for reading the date of an optical image from its metadata.
+
+    Args:
+        path (Path): path to single optical image.
+        buffer (bytes, optional): content of the file; read from file if not provided.
+
+    Returns:
+        date (optional): date
+
+    """
+    if buffer is None:
+        with open(path, "rb") as f:
+            buffer = f.read()
 
     # Prefered: Read time from exif metafile.
-    pil_img = PIL_Image.open(path)
-    exif = pil_img.getexif()
+    with PIL_Image.open(BytesIO(buffer)) as pil_img:
+        exif = pil_img.getexif()
     if exif.get(306) is not None:
         # Hardcoded way of retrieving the datetime of "2022:08:29 23:10:27"
         date = datetime.strptime(exif.get(306), "%Y:%m:%d %H:%M:%S")
@@ -285,7 +534,7 @@ def _read_single_optical_image(path: Path) -> tuple[np.ndarray, Optional[datetim
                 "Please install ImageMagick to read metadata from terminal."
             )
 
-    return array, date
+    return date
 
 
 # ! ---- DICOM images
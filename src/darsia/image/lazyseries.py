@@ -0,0 +1,222 @@
+"""Lazy space-time images.
+
+A lazy image series only holds the paths to its time slices. Time slices are read,
+converted and corrected on demand, such that the full space-time array is never
+materialized, unless explicitly requested.
+
+"""
+
+from __future__ import annotations
+
+import copy
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+import darsia
+
+
+class LazyImageSeries:
+    """Space-time image, for which time slices are read and corrected on demand.
+
+    Example:
+        series = darsia.LazyImageSeries(folder, transformations=[drift_correction])
+        for image in series:
+            ...  # single corrected time slice
+        image = series.time_slice(10)
+        first_hour = series.time_interval(slice(0, 60))
+
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, list[str], list[Path]],
+        time: Optional[list] = None,
+        transformations: Optional[list] = None,
+        **kwargs,
+    ) -> None:
+        """Initialization of a lazy space-time image.
+
+        Args:
+            path (str, Path or list of such): path(s) to file(s) or folder(s), each
+                file containing a single time slice.
+            time (list, optional): user-specified physical times; detected from
+                metadata if 'None'.
+            transformations (list of callables): transformations applied to each
+                time slice.
+            kwargs: keyword arguments passed to darsia.iter_images.
+
+        """
+        path = darsia.image.imread._resolve_path(path)
+
+        self.paths: list[Path] = path if isinstance(path, list) else [path]
+        """Paths to the time slices."""
+
+        assert time is None or len(time) == len(self.paths)
+        self.time = time
+        """Relative time in scalar format (in seconds), if provided."""
+
+        self.transformations: list = (
+            [] if transformations is None else list(transformations)
+        )
+        """Transformations applied to each time slice."""
+
+        self.kwargs = kwargs
+        """Keyword arguments for reading the time slices."""
+
+        self.series = True
+        """Flag for compatibility with darsia.Image."""
+
+        self._reference_date: Optional[datetime] = kwargs.pop("reference_date", None)
+        """Cached reference date (for defining relative time)."""
+
+    @property
+    def time_num(self) -> int:
+        """Number of time points.
+
+        Returns:
+            int: number of time slices
+
+        """
+        return len(self.paths)
+
+    def __len__(self) -> int:
+        return self.time_num
+
+    @property
+    def reference_date(self) -> Optional[datetime]:
+        """Reference date, by default the date of the first time slice.
+
+        NOTE: Requires reading the first time slice once, if not provided at
+        initialization.
+
+        Returns:
+            datetime, optional: reference date
+
+        """
+        if self._reference_date is None and self.time is None:
+            self._reference_date = next(
+                darsia.iter_images(self.paths[:1], **self.kwargs)
+            ).date
+        return self._reference_date
+
+    def copy(self) -> LazyImageSeries:
+        """Copy constructor, not copying any image data.
+
+        Returns:
+            LazyImageSeries: copy of the lazy series
+
+        """
+        series = copy.copy(self)
+        series.paths = list(self.paths)
+        series.transformations = list(self.transformations)
+        series.kwargs = copy.copy(self.kwargs)
+        return series
+
+    def add_transformation(self, transformation) -> None:
+        """Append transformation, applied to each time slice after the others.
+
+        Args:
+            transformation (callable): transformation
+
+        """
+        self.transformations.append(transformation)
+
+    # ! ---- Extraction routines
+
+    def __iter__(self) -> Iterator[darsia.Image]:
+        """Iterate over all corrected time slices in order.
+
+        Yields:
+            Image: corrected time slice
+
+        """
+        return self._iter_images(self.paths, self.time)
+
+    def time_slice(self, time_index: int) -> darsia.Image:
+        """Extraction of single time slice.
+
+        Args:
+            time_index (int): time index in interval [0, ..., time_num-1].
+
+        Returns:
+            Image: single-timed, corrected image.
+
+        """
+        time = None if self.time is None else [self.time[time_index]]
+        return next(self._iter_images([self.paths[time_index]], time))
+
+    def time_interval(self, indices: slice) -> LazyImageSeries:
+        """Extraction of temporal subregion, without reading any data.
+
+        Args:
+            indices (slice): time interval in terms of indices.
+
+        Returns:
+            LazyImageSeries: lazy image with restricted temporal domain.
+
+        Raises:
+            ValueError: if indices is not a slice
+
+        """
+        if not isinstance(indices, slice):
+            raise ValueError("indices needs to be a slice")
+
+        series = self.copy()
+        series.paths = self.paths[indices]
+        series.time = None if self.time is None else self.time[indices]
+        series._reference_date = self.reference_date
+        return series
+
+    def to_image(self) -> darsia.Image:
+        """Materialize the full space-time image.
+
+        Returns:
+            Image: space-time image of all corrected time slices.
+
+        """
+        slices = list(self)
+        img = np.stack([s.img for s in slices], axis=slices[0].space_dim)
+        metadata = slices[0].metadata()
+        metadata["series"] = True
+        metadata["date"] = [s.date for s in slices]
+        times = [s.time for s in slices]
+        metadata["time"] = None if None in times else times
+        return type(slices[0])(img=img, **metadata)
+
+    # ! ---- I/O
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Store the corrected space-time image in a memory-mappable container.
+
+        The time slices are read, corrected and written one by one.
+
+        Args:
+            path (str or Path): path to the container folder.
+
+        """
+        darsia.write_image_series_container(iter(self), path, self.time_num)
+
+    # ! ---- Auxiliary routines
+
+    def _iter_images(
+        self, paths: list[Path], time: Optional[list]
+    ) -> Iterator[darsia.Image]:
+        """Read time slices with shared reference date.
+
+        Args:
+            paths (list of Path): paths to time slices.
+            time (list, optional): relative times of the time slices.
+
+        Yields:
+            Image: corrected time slice
+
+        """
+        kwargs = copy.copy(self.kwargs)
+        if self.reference_date is not None:
+            kwargs["reference_date"] = self.reference_date
+        return darsia.iter_images(
+            paths, time=time, transformations=self.transformations, **kwargs
+        )
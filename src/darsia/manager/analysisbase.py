@@ -9,13 +9,19 @@ provide the approach for how to set up tailored analysis classes.
 from __future__ import annotations
 
 import json
+import pickle
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import get_context
 from pathlib import Path
-from typing import Optional, Union, cast
+from typing import Any, Optional, Union, cast
 
 import darsia
 
+_CHECKSUM_SAMPLE_SIZE = 1 << 16
+"""Number of entries of large arrays of corrections checksummed for each image."""
+
 
 class AnalysisBase:
     """
@@ -40,6 +46,11 @@ class AnalysisBase:
             config (str or Path): path to config dict
             update_setup (bool): flag controlling whether cache in setup
                 routines is emptied.
+
+        NOTE: If the config contains the entry "cache", with keys "folder" and
+        optionally "max_size" (in bytes), corrected images are stored in a persistent
+        cache, and reused in later calls and runs, see darsia.CorrectionCache.
+
         """
 
         # ! ---- Config
@@ -76,6 +87,35 @@ class AnalysisBase:
             else datetime.strptime(reference_date_str, "%Y-%m-%d %H:%M:%S")
         )
 
+        # ! ---- Cache for corrected images
+
+        self.cache: Optional[darsia.CorrectionCache] = None
+        """Persistent cache of corrected images."""
+
+        if "cache" in self.config:
+            self.cache = darsia.CorrectionCache(
+                folder=self.config["cache"]["folder"],
+                max_size=self.config["cache"].get("max_size"),
+            )
+            if update_setup:
+                self.cache.clear()
+
+        self._fingerprint: Optional[tuple[str, str]] = None
+        """Checksum and fingerprint of the correction chain, the latter used as part
+        of cache keys."""
+
+        self._sampled_checksum: Optional[str] = None
+        """Checksum of the correction chain with large arrays subsampled, checked
+        before each use of the cache."""
+
+        # ! ---- Timings
+
+        self.stage_timings: dict[str, float] = {}
+        """Timings of the stages of the latest single image analysis."""
+
+        self.batch_timings: list[dict[str, float]] = []
+        """Timings of the stages for each image of the latest batch analysis."""
+
         # ! ---- Reference to baseline images
 
         if isinstance(baseline, list):
@@ -156,22 +196,60 @@ class AnalysisBase:
             darsia.Image: image corrected for curvature and color.
 
         """
+        transformations = [
+            self.drift_correction,
+            self.deformation_correction,
+            self.color_correction,
+            self.translation_correction,
+            self.curvature_correction,
+        ]
+        kwargs = {
+            "width": self.width,
+            "height": self.height,
+            "origin": self.origin,
+            "reference_date": self.reference_date,
+        }
+
         # Use general interface to read image from file and apply correction
-        return darsia.imread(
+        if self.cache is None:
+            return darsia.imread(path, transformations=transformations, **kwargs)
+
+        # Reuse cached corrected image if available. The corrections are checked for
+        # changes, incl. modifications in place, at increasing cost: through a
+        # checksum of subsamples of large arrays for each image, a full checksum if
+        # the former changes (or once per batch), and a (costly) fingerprint, if
+        # the latter changes.
+        sampled_checksum = self.cache.checksum_transformations(
+            transformations, sample_size=_CHECKSUM_SAMPLE_SIZE
+        )
+        if sampled_checksum != self._sampled_checksum:
+            checksum = self.cache.checksum_transformations(transformations)
+            if self._fingerprint is None or self._fingerprint[0] != checksum:
+                self._fingerprint = (
+                    checksum,
+                    self.cache.fingerprint_transformations(transformations),
+                )
+            self._sampled_checksum = sampled_checksum
+        assert self._fingerprint is not None
+        return self.cache.imread(
             path,
-            transformations=[
-                self.drift_correction,
-                self.deformation_correction,
-                self.color_correction,
-                self.translation_correction,
-                self.curvature_correction,
-            ],
-            width=self.width,
-            height=self.height,
-            origin=self.origin,
-            reference_date=self.reference_date,
+            transformations=transformations,
+            fingerprint=self._fingerprint[1],
+            **kwargs,
         )
 
+    def reset_cache_fingerprints(self) -> None:
+        """Reset the fingerprint of the correction chain used for caching.
+
+        Changes of the corrections are detected automatically (except for
+        modifications in place missed by subsamples of large arrays, which are
+        detected at the start of the next batch analysis); resetting enforces
+        recomputing the fingerprint nonetheless.
+
+        """
+        self._fingerprint = None
+        self._sampled_checksum = None
+
     def load_and_process_image(self, path: Union[str, Path]) -> darsia.Image:
         """
         Load image for further analysis. Do all corrections and processing needed.
@@ -185,7 +263,9 @@ class AnalysisBase:
         """
 
         # Read and process
+        tic = time.time()
         self.img = self._read(path)
+        self.stage_timings["read"] = time.time() - tic
 
         return self.img
 
@@ -202,26 +282,150 @@ class AnalysisBase:
         """
         raise NotImplementedError("Has to be implemented for each special case.")
 
-    def batch_analysis(self, images: Union[Path, list[Path]], **kwargs) -> None:
+    def batch_analysis(
+        self,
+        images: Union[Path, list[Path]],
+        num_workers: int = 1,
+        start_method: str = "spawn",
+        **kwargs,
+    ) -> list[Any]:
         """
         Standard batch analysis.
 
+        The images are analyzed independently. In parallel mode, the analysis object,
+        incl. all correction objects, is set up once, and sent to each of the worker
+        processes once. The results are collected in the order of the input.
+
+        NOTE: In parallel mode, each worker operates on its own copy of the analysis
+        object. Changes of its state are not returned, and a correction cache is
+        only reused for images already cached when starting the batch analysis.
+
         Args:
             images (list of Path): paths to batch of images.
+            num_workers (int): number of worker processes; serial analysis if 1.
+            start_method (str): start method of the worker processes; "spawn"
+                requires the analysis class to be importable by the workers, "fork"
+                is only available on Unix.
             kwargs: optional keyword arguments used in single_image_analysis.
 
+        Returns:
+            list: results of single_image_analysis for each image.
+
         """
 
         if not isinstance(images, list):
             images = [images]
 
-        for img in images:
+        results = []
+        self.batch_timings = []
+
+        # Check the full state of the corrections once per batch
+        self._sampled_checksum = None
+
+        if num_workers <= 1:
+            for img in images:
+                result, timings = self._timed_single_image_analysis(img, **kwargs)
+                results.append(result)
+                self._report_progress(img, timings, len(images))
+
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=get_context(start_method),
+                initializer=_init_worker,
+                initargs=(pickle.dumps(self),),
+            ) as pool:
+                futures = [
+                    pool.submit(_worker_single_image_analysis, img, kwargs)
+                    for img in images
+                ]
+                # Collect in order of input
+                for img, future in zip(images, futures):
+                    result, timings = future.result()
+                    results.append(result)
+                    self._report_progress(img, timings, len(images))
+
+        return results
+
+    def _timed_single_image_analysis(
+        self, img: Union[Path, darsia.Image], **kwargs
+    ) -> tuple[Any, dict[str, float]]:
+        """Single image analysis with timings of the stages.
+
+        Args:
+            img (Path or Image): path to single image.
+            kwargs: optional keyword arguments used in single_image_analysis.
+
+        Returns:
+            object: result of single_image_analysis.
+            dict: timings of reading and analyzing the image, and total time.
+
+        """
+        self.stage_timings = {}
+        tic = time.time()
+
+        # Analyze single image
+        result = self.single_image_analysis(img, **kwargs)
+
+        total = time.time() - tic
+        timings = {"read": self.stage_timings.get("read", 0.0)}
+        timings["analysis"] = total - timings["read"]
+        timings["total"] = total
+        return result, timings
+
+    def _report_progress(
+        self, img: Union[Path, darsia.Image], timings: dict[str, float], num: int
+    ) -> None:
+        """Store timings and inform the user about the progress.
+
+        Args:
+            img (Path or Image): analyzed image.
+            timings (dict): timings of the stages.
+            num (int): total number of images in the batch.
+
+        """
+        self.batch_timings.append(timings)
 
-            tic = time.time()
+        if getattr(self, "verbosity", False):
+            name = img.name if hasattr(img, "name") else img
+            stages = ", ".join(
+                f"{key}: {value:.3f} s" for key, value in timings.items()
+            )
+            print(
+                f"[{len(self.batch_timings)}/{num}] Elapsed time for {name}: {stages}."
+            )
+
+
+# ! ---- Workers for parallel batch analysis
+
+_worker_analysis: Optional[AnalysisBase] = None
+"""Analysis object of a worker process, set up once per worker."""
+
+
+def _init_worker(serialized_analysis: bytes) -> None:
+    """Initialize worker process for parallel batch analysis.
 
-            # Determine binary mask detecting any(!) CO2, and CO2(g)
-            self.single_image_analysis(img, **kwargs)
+    Args:
+        serialized_analysis (bytes): pickled analysis object.
 
-            # Information to the user
-            if self.verbosity:
-                print(f"Elapsed time for {img.name}: {time.time() - tic}.")
+    """
+    global _worker_analysis
+    _worker_analysis = pickle.loads(serialized_analysis)
+
+
+def _worker_single_image_analysis(
+    img: Union[Path, darsia.Image], kwargs: dict
+) -> tuple[Any, dict[str, float]]:
+    """Single image analysis of a worker process.
+
+    Args:
+        img (Path or Image): path to single image.
+        kwargs: optional keyword arguments used in single_image_analysis.
+
+    Returns:
+        object: result of single_image_analysis.
+        dict: timings of the stages.
+
+    """
+    assert _worker_analysis is not None, "Worker not initialized."
+    return _worker_analysis._timed_single_image_analysis(img, **kwargs)
@@ -92,6 +92,18 @@ class CO2Analysis(ABC, darsia.ConcentrationAnalysisBase):
         else:
             warn("CO2(g) analysis not well-defined.")
 
+        # Evaluate stages shared by both analyses only once per image
+        self.multi_co2_analysis = darsia.MultiConcentrationAnalysis(
+            {
+                key: getattr(self, attr)
+                for key, attr in [
+                    ("co2", "co2_analysis"),
+                    ("co2(g)", "co2_gas_analysis"),
+                ]
+                if hasattr(self, attr)
+            }
+        )
+
     @abstractmethod
     def define_co2_analysis(self) -> darsia.ConcentrationAnalysis:
         """
@@ -114,14 +126,18 @@ class CO2Analysis(ABC, darsia.ConcentrationAnalysisBase):
         """
         Extract CO2 from currently loaded image, based on a reference image.
 
+        NOTE: Results of stages shared with the other analysis are cached for the
+        currently loaded image, and may alias work buffers of the analyses. Apply the
+        analyses only through self.multi_co2_analysis (or call its clear() method
+        after applying an analysis directly).
+
         Returns:
             darsia.Image: binary image of spatial CO2 distribution.
         """
-        # Make a copy of the current image
-        img = self.img.copy()
-
-        # Extract binary concentration
-        co2 = self.co2_analysis(img)
+        # Extract binary concentration; the analysis does not modify the image, and
+        # stages shared with the other analysis are evaluated once per image. An
+        # analysis overriding __call__ is applied directly.
+        co2 = self.multi_co2_analysis.analyze("co2", self.img)
 
         return co2
 
@@ -129,13 +145,17 @@ class CO2Analysis(ABC, darsia.ConcentrationAnalysisBase):
         """
         Extract CO2(g) from currently loaded image, based on a reference image.
 
+        NOTE: Results of stages shared with the other analysis are cached for the
+        currently loaded image, and may alias work buffers of the analyses. Apply the
+        analyses only through self.multi_co2_analysis (or call its clear() method
+        after applying an analysis directly).
+
         Returns:
             darsia.Image: binary image of spatial CO2(g) distribution.
         """
-        # Make a copy of the current image
-        img = self.img.copy()
-
-        # Extract binary concentration
-        co2 = self.co2_gas_analysis(img)
+        # Extract binary concentration; the analysis does not modify the image, and
+        # stages shared with the other analysis are evaluated once per image. An
+        # analysis overriding __call__ is applied directly.
+        co2 = self.multi_co2_analysis.analyze("co2(g)", self.img)
 
         return co2
@@ -78,11 +78,9 @@ class TracerAnalysis(ABC, darsia.ConcentrationAnalysisBase):
             darsia.Image: image array of spatial concentration map
             float, optional: occupied volume by the fluid in porous geometry
         """
-        # Make a copy of the current image
-        img = self.img.copy()
-
-        # Extract tracer map - includes rescaling
-        tracer = self.tracer_analysis(img)
+        # Extract tracer map - includes rescaling; the analysis does not modify the
+        # image
+        tracer = self.tracer_analysis(self.img)
 
         # Integrate concentration over porous domain and/or return concentration
         if return_volume:
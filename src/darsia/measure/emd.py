@@ -4,7 +4,11 @@
 
 from __future__ import annotations
 
-from typing import Optional, Union
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Optional, Union
 
 import cv2
 
@@ -205,38 +209,251 @@ class EMD:
 
         return sig
 
-    def distance_matrix(self, images: list[darsia.Image]) -> np.ndarray:
+    def distance_matrix(
+        self,
+        images: list[darsia.Image],
+        num_workers: int = 1,
+        warm_start: bool = False,
+        checkpoint: Optional[Union[str, Path]] = None,
+        start_method: str = "spawn",
+    ) -> np.ndarray:
         """
         Compute the distance between each iteam of a list.
 
+        The pairs are grouped in rows, i.e., all pairs (i, j) with j > i for fixed i.
+        Rows are solved in order of j, such that iterative methods can warm-start
+        from the previous pair, see warm_start. In parallel mode, the distance object
+        and the images are sent to each worker process once, and rows are solved in
+        parallel, longest rows first.
+
+        Completed rows are stored in the (optional) checkpoint file. If the file
+        exists already, the computed pairs are reused and only missing pairs are
+        computed.
+
         Args:
             images (list of images): N images
+            num_workers (int): number of worker processes; serial if 1.
+            warm_start (bool): flag controlling whether iterative methods are
+                initialized with the solution of the previous pair of the same row;
+                effective for images ordered in time. Defaults to False.
+            checkpoint (str or Path, optional): npz file for storing the partial
+                distance matrix, and for resuming a previous computation.
+            start_method (str): start method of the worker processes.
 
         Returns:
             np.ndarray: N x N matrix with distances between images.
 
         """
         num_images = len(images)
+        distance_matrix, computed = _read_checkpoint(checkpoint, num_images)
+
+        # Missing pairs, grouped in rows - longest rows first for load balancing
+        rows = [
+            (i, [j for j in range(i + 1, num_images) if not computed[i, j]])
+            for i in range(num_images)
+        ]
+        rows = sorted(
+            [row for row in rows if len(row[1]) > 0], key=lambda row: -len(row[1])
+        )
+
+        def _store(i: int, indices: list[int], distances: list[float]) -> None:
+            distance_matrix[i, indices] = distances
+            computed[i, indices] = True
+            if checkpoint is not None:
+                _write_checkpoint(checkpoint, distance_matrix, computed)
+
+        if len(rows) == 0:
+            # Nothing left to compute
+            pass
+
+        elif num_workers <= 1 or len(rows) == 1:
+            batch = self._setup_batch(images)
+            for i, indices in rows:
+                pairs = [(i, j) for j in indices]
+                distances, _ = self._pair_distances(images, pairs, batch, warm_start)
+                _store(i, indices, distances)
+
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=get_context(start_method),
+                initializer=_init_worker,
+                initargs=(pickle.dumps((self, images, warm_start)),),
+            ) as pool:
+                futures = {
+                    pool.submit(_worker_row_distances, i, indices): (i, indices)
+                    for i, indices in rows
+                }
+                for future in as_completed(futures):
+                    _store(*futures[future], future.result())
+
+        # Matrix symmetric, and each image has distance 0 to itself.
+        upper_distance_matrix = np.triu(distance_matrix, 1)
+        return upper_distance_matrix + upper_distance_matrix.T
+
+    def _setup_batch(self, images: list[darsia.Image]) -> Any:
+        """Setup shared by all pairs of a distance matrix.
+
+        Args:
+            images (list of images): images.
+
+        Returns:
+            object: data shared by all pairs; None for cv2.
+
+        """
+        return None
+
+    def distance_series(
+        self,
+        images: list[darsia.Image],
+        mode: str = "consecutive",
+        warm_start: bool = True,
+    ) -> tuple[np.ndarray, dict]:
+        """
+        Compute the distances along a time series of images.
 
-        distance_matrix = np.zeros((num_images, num_images), dtype=float)
-
-        # Matrix symmetric, so only compute one side of the diagonal.
-        for i, img_i in enumerate(images):
-            for j, img_j in enumerate(images):
-                # Each image has distance 0 to itself.
-                if i >= j:
-                    continue
-                distance_matrix[i, j] = self.__call__(img_i, img_j)
-
-        # Fill in remaining entries
-        for i, img_i in enumerate(images):
-            for j, img_j in enumerate(images):
-                # Each image has distance 0 to itself.
-                if i <= j:
-                    continue
-                distance_matrix[i, j] = distance_matrix[j, i]
-
-        return distance_matrix
+        The setup is shared by all pairs. Iterative methods are (optionally)
+        initialized with the solution of the previous pair, which is effective if
+        subsequent images differ little.
+
+        Args:
+            images (list of images): N images, ordered in time.
+            mode (str): "consecutive" for the distances between images i and i+1, or
+                "reference" for the distances between the first image and image i+1.
+            warm_start (bool): flag controlling whether iterative methods are
+                initialized with the solution of the previous pair. Defaults to True.
+
+        Returns:
+            np.ndarray: N-1 distances.
+            dict: pairs of image indices, and number of iterations and convergence
+                flags for each pair (for iterative methods only).
+
+        Raises:
+            ValueError: if mode is not supported.
+
+        """
+        if mode == "consecutive":
+            pairs = [(i, i + 1) for i in range(len(images) - 1)]
+        elif mode == "reference":
+            pairs = [(0, i) for i in range(1, len(images))]
+        else:
+            raise ValueError(f"Mode {mode} not supported.")
+
+        distances, pair_infos = self._pair_distances(
+            images, pairs, self._setup_batch(images), warm_start
+        )
+
+        info = {"pairs": pairs}
+        for key in ["number_iterations", "converged"]:
+            if all(key in pair_info for pair_info in pair_infos):
+                info[key] = np.array([pair_info[key] for pair_info in pair_infos])
+        return np.array(distances), info
+
+    def _pair_distances(
+        self,
+        images: list[darsia.Image],
+        pairs: list[tuple[int, int]],
+        batch: Any = None,
+        warm_start: bool = False,
+    ) -> tuple[list[float], list[dict]]:
+        """Distances between pairs of images.
+
+        Args:
+            images (list of images): images.
+            pairs (list of tuple of int): pairs of indices of source and destination
+                images, solved in the given order.
+            batch (object): output of _setup_batch.
+            warm_start (bool): flag controlling the use of warm starts.
+
+        Returns:
+            list of float: distances.
+            list of dict: solver information for each pair.
+
+        """
+        return [self.__call__(images[i], images[j]) for i, j in pairs], [
+            {} for _ in pairs
+        ]
+
+
+# ! ---- Auxiliary routines for distance matrices
+
+_worker_state: Optional[tuple] = None
+"""Distance object, images and shared setup of a worker process."""
+
+
+def _init_worker(serialized_state: bytes) -> None:
+    """Initialize worker process for parallel distance matrix computations.
+
+    Args:
+        serialized_state (bytes): pickled distance object, images and warm start flag.
+
+    """
+    global _worker_state
+    emd, images, warm_start = pickle.loads(serialized_state)
+    _worker_state = (emd, images, emd._setup_batch(images), warm_start)
+
+
+def _worker_row_distances(i: int, indices: list[int]) -> list[float]:
+    """Row of the distance matrix computed by a worker process.
+
+    Args:
+        i (int): index of the reference image.
+        indices (list of int): indices of the images to be compared to.
+
+    Returns:
+        list of float: distances.
+
+    """
+    assert _worker_state is not None, "Worker not initialized."
+    emd, images, batch, warm_start = _worker_state
+    pairs = [(i, j) for j in indices]
+    return emd._pair_distances(images, pairs, batch, warm_start)[0]
+
+
+def _read_checkpoint(
+    path: Optional[Union[str, Path]], num_images: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Read partial distance matrix and mask of computed pairs.
+
+    Args:
+        path (str or Path, optional): checkpoint file.
+        num_images (int): number of images.
+
+    Returns:
+        np.ndarray: partial distance matrix.
+        np.ndarray: boolean mask of computed pairs.
+
+    Raises:
+        ValueError: if the checkpoint does not match the number of images.
+
+    """
+    if path is None or not Path(path).exists():
+        return (
+            np.zeros((num_images, num_images), dtype=float),
+            np.zeros((num_images, num_images), dtype=bool),
+        )
+    with np.load(path) as data:
+        distance_matrix = data["distance_matrix"].astype(float)
+        computed = data["computed"].astype(bool)
+    if distance_matrix.shape != (num_images, num_images):
+        raise ValueError(f"Checkpoint {path} does not match the number of images.")
+    return distance_matrix, computed
+
+
+def _write_checkpoint(
+    path: Union[str, Path], distance_matrix: np.ndarray, computed: np.ndarray
+) -> None:
+    """Write partial distance matrix and mask of computed pairs.
+
+    The file is replaced atomically, such that an interrupted computation leaves a
+    valid checkpoint.
+
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, distance_matrix=distance_matrix, computed=computed)
+    tmp_path.replace(path)
 
 
 ## Determine EMD using ot
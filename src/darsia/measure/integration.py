@@ -126,20 +126,20 @@ class Geometry:
                 )
 
         else:
-            # Scalar case.
-            if not all([i == j for i, j in zip(fetched_shape, self.num_voxels)]):
-                self.cached_voxel_volume = self.voxel_volume * scaling
+            # Scalar case - cheap, thus updated for each call.
+            self.cached_voxel_volume = self.voxel_volume * scaling
 
         # ! ---- Perform spatial integration
-        if isinstance(data, np.ndarray):
-            weighted_sum = np.multiply(self.cached_voxel_volume, data)
-        elif isinstance(data, darsia.Image):
-            weighted_sum = np.multiply(self.cached_voxel_volume, data.img)
-        else:
+        if not isinstance(data, (np.ndarray, darsia.Image)):
             raise ValueError("Data type not supported.")
-        for i in range(self.space_dim):
-            weighted_sum = np.sum(weighted_sum, axis=0)
-        return weighted_sum
+
+        # Contract the spatial axes at once; remaining (time and data) axes are kept.
+        spatial_axes = tuple(range(self.space_dim))
+        if np.ndim(self.cached_voxel_volume) > 0:
+            return np.tensordot(
+                self.cached_voxel_volume, fetched_data, axes=self.space_dim
+            )
+        return self.cached_voxel_volume * np.sum(fetched_data, axis=spatial_axes)
 
     def normalize(
         self, img: darsia.Image, img_ref: darsia.Image, return_ratio: bool = False
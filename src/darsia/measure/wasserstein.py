@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import time
-import tracemalloc
 import warnings
 from abc import abstractmethod
 from enum import Enum
@@ -131,6 +130,17 @@ class VariationalWassersteinDistance(darsia.EMD):
                 - regularization (float): regularization parameter for avoiding division
                     by zero. Defaults to np.finfo(float).eps.
                 - lumping (bool): lump the mass matrix. Defaults to True.
+                - num_levels (int): number of levels of the multilevel initialization.
+                    Defaults to 1, i.e., initialization through the Darcy problem on
+                    the given grid. Otherwise, the problem is first solved on grids
+                    coarsened by a factor of 2 per level, and the solutions are
+                    prolongated to finer levels as initial guesses.
+                - level_options (list of dict): options updating the options on the
+                    coarse levels, coarsest first, e.g., for level-wise tolerances.
+                    Defaults to [].
+                - profiling (darsia.ProfilingLevel or str): level of profiling of the
+                    solver, "off", "timings", or "memory". Defaults to "off". The
+                    profile is returned as part of the info.
 
         """
         # Cache geometrical infos
@@ -150,6 +160,9 @@ class VariationalWassersteinDistance(darsia.EMD):
         self.verbose = self.options.get("verbose", False)
         """bool: verbosity"""
 
+        self.profiling = darsia.ProfilingLevel(self.options.get("profiling", "off"))
+        """darsia.ProfilingLevel: level of profiling"""
+
         self.l1_mode: L1Mode = self.options.get("l1_mode", L1Mode.RAVIART_THOMAS)
         """str: mode for computing the l1 dissipation"""
 
@@ -161,12 +174,16 @@ class VariationalWassersteinDistance(darsia.EMD):
         self.weight = weight
         """Weight defined on cells"""
 
+        self._buffers: dict[str, np.ndarray] = {}
+        """Preallocated work arrays, reused across iterations"""
+
         # Setup of method
         self._setup_dof_management()
         self._setup_face_weights()
         self._setup_discretization()
         self._setup_linear_solver()
         self._setup_acceleration()
+        self._setup_multilevel()
 
     def _setup_dof_management(self) -> None:
         """Setup of Raviart-Thomas-type DOF management.
@@ -700,20 +717,169 @@ class VariationalWassersteinDistance(darsia.EMD):
 
     # ! ---- Effective quantities ----
 
-    def cell_weighted_flux(self, cell_flux: np.ndarray) -> np.ndarray:
+    def _setup_multilevel(self) -> None:
+        """Setup of the next coarser level for the multilevel initialization.
+
+        The coarse level is a solver of the same type on a grid coarsened by a factor
+        of 2 in each dimension, and itself sets up the remaining coarser levels.
+
+        """
+        num_levels = self.options.get("num_levels", 1)
+        self.coarse_level: Optional[VariationalWassersteinDistance] = None
+        """Solver on the next coarser level, if any."""
+
+        if num_levels <= 1 or min(self.grid.shape) < 4:
+            return
+
+        # Coarse grid - pad odd numbers of cells by an empty cell
+        coarse_grid = darsia.Grid(
+            tuple((n + 1) // 2 for n in self.grid.shape),
+            (2 * self.grid.voxel_size).tolist(),
+        )
+        coarse_weight = (
+            None
+            if self.weight is None
+            else darsia.Image(
+                _coarsen_cells(self.weight.img, padding="edge"),
+                dimensions=(
+                    np.array(coarse_grid.shape) * coarse_grid.voxel_size
+                ).tolist(),
+                space_dim=self.grid.dim,
+                scalar=True,
+                series=False,
+            )
+        )
+
+        # Options of the coarse level (and coarser levels)
+        level_options = self.options.get("level_options", [])
+        coarse_options = self.options.copy()
+        coarse_options.update(
+            {"num_levels": num_levels - 1, "level_options": level_options[:-1]}
+        )
+        if len(level_options) > 0:
+            coarse_options.update(level_options[-1])
+
+        self.coarse_level = type(self)(coarse_grid, coarse_weight, coarse_options)
+
+    def _initial_solution(
+        self, flat_mass_diff: np.ndarray, rhs: np.ndarray
+    ) -> tuple[np.ndarray, list[dict]]:
+        """Initial guess for the nonlinear solvers.
+
+        Without coarse levels, the Darcy problem for unitary mobility is solved.
+        Otherwise, the problem is solved on the coarse level for the coarsened mass
+        difference. The coarse flux is prolongated through RT0 interpolation, the
+        pressure through injection. A Darcy correction restores mass conservation.
+
+        Args:
+            flat_mass_diff (np.ndarray): difference of mass distributions
+            rhs (np.ndarray): right hand side
+
+        Returns:
+            np.ndarray: initial guess
+            list of dict: convergence information of all coarse levels, coarsest
+                first.
+
+        """
+        if self.coarse_level is None:
+            solution = np.zeros_like(rhs, dtype=float)
+            solution, _ = self.linear_solve(
+                self.darcy_init.copy(), rhs.copy(), solution
+            )
+            return solution, []
+
+        # Solve on coarse level (and recursively coarser levels)
+        coarse = self.coarse_level
+        coarse_mass_diff = _coarsen_cells(
+            np.reshape(flat_mass_diff, self.grid.shape, order="F"), padding="constant"
+        )
+        coarse_distance, coarse_solution, coarse_info = coarse._solve(
+            np.ravel(coarse_mass_diff, "F")
+        )
+        level_infos = coarse_info.get(
+            "levels", [coarse._level_info(coarse_distance, coarse_info)]
+        )
+
+        # Prolongate to current level, with pressure constrained in the center cell
+        solution = np.zeros_like(rhs, dtype=float)
+        solution[self.flux_slice] = _prolongate_flux(
+            coarse.grid, self.grid, coarse_solution[coarse.flux_slice]
+        )
+        pressure = _prolongate_cells(
+            coarse.grid,
+            self.grid,
+            coarse_solution[coarse.pressure_slice],
+        )
+        solution[self.pressure_slice] = (
+            pressure - pressure[self.constrained_cell_flat_index]
+        )
+
+        # Restore mass conservation through a Darcy correction
+        correction_rhs = np.zeros_like(rhs, dtype=float)
+        correction_rhs[self.pressure_slice] = rhs[self.pressure_slice] - self.div.dot(
+            solution[self.flux_slice]
+        )
+        correction, _ = self.linear_solve(
+            self.darcy_init.copy(), correction_rhs, np.zeros_like(rhs)
+        )
+        solution += correction
+
+        return solution, level_infos
+
+    def _level_info(self, distance: float, info: dict) -> dict:
+        """Summary of the convergence on a single level.
+
+        Args:
+            distance (float): distance on the level
+            info (dict): info returned by _solve
+
+        Returns:
+            dict: shape of the grid, distance and convergence information
+
+        """
+        return {
+            "shape": tuple(self.grid.shape),
+            "distance": distance,
+            "converged": info["converged"],
+            "number_iterations": info["number_iterations"],
+            "convergence_history": info["convergence_history"],
+        }
+
+    def _buffer(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        """Fetch preallocated work array, allocated on first use.
+
+        Args:
+            name (str): name of the work array
+            shape (tuple of int): shape of the work array
+
+        Returns:
+            np.ndarray: uninitialized work array
+
+        """
+        if name not in self._buffers or self._buffers[name].shape != shape:
+            self._buffers[name] = np.empty(shape, dtype=float)
+        return self._buffers[name]
+
+    def cell_weighted_flux(
+        self, cell_flux: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """Compute the cell-weighted flux.
 
         Args:
-            cell_flux (np.ndarray): cell fluxes
+            cell_flux (np.ndarray): cell fluxes, possibly with leading axis of points
+            out (np.ndarray, optional): output array, may be cell_flux itself
 
         Returns:
             np.ndarray: cell-weighted flux
 
         """
         if self.weight is None:
-            return cell_flux
+            if out is None or out is cell_flux:
+                return cell_flux
+            np.copyto(out, cell_flux)
+            return out
         elif len(self.cell_weights.shape) == self.grid.dim:
-            return cell_flux * self.cell_weights[..., np.newaxis]
+            return np.multiply(cell_flux, self.cell_weights[..., np.newaxis], out=out)
 
         elif (
             len(self.cell_weights.shape) == self.grid.dim + 1
@@ -726,7 +892,7 @@ class VariationalWassersteinDistance(darsia.EMD):
             len(self.cell_weights.shape) == self.grid.dim + 1
             and self.cell_weights.shape[-1] == self.grid.dim
         ):
-            return cell_flux * self.cell_weights
+            return np.multiply(cell_flux, self.cell_weights, out=out)
 
         elif len(
             self.cell_weights.shape
@@ -791,21 +957,51 @@ class VariationalWassersteinDistance(darsia.EMD):
             raise ValueError(f"Mode {self.l1_mode} not supported.")
 
         # Integrate over reference cell (normalization not required)
-        transport_density = np.zeros(self.grid.shape, dtype=float)
-        for quad_pt, quad_weight in zip(quad_pts, quad_weights):
-            cell_flux = darsia.face_to_cell(self.grid, flat_flux, pt=quad_pt)
-            if weighted:
-                weighted_cell_flux = self.cell_weighted_flux(cell_flux)
-                cell_flux_norm = np.linalg.norm(weighted_cell_flux, 2, axis=-1)
-            else:
-                cell_flux_norm = np.linalg.norm(cell_flux, 2, axis=-1)
-            transport_density += quad_weight * cell_flux_norm
+        cell_flux_norm = self._cell_flux_norm(flat_flux, quad_pts, weighted)
+        transport_density = np.tensordot(quad_weights, cell_flux_norm, axes=1)
 
         if flatten:
             return np.ravel(transport_density, "F")
         else:
             return transport_density
 
+    def _cell_flux_norm(
+        self, flat_flux: np.ndarray, pts: np.ndarray, weighted: bool = True
+    ) -> np.ndarray:
+        """Pointwise norm of reconstructed cell fluxes at multiple points.
+
+        All points are evaluated in a single pass, and intermediate results are
+        stored in preallocated work arrays.
+
+        Args:
+            flat_flux (np.ndarray): face fluxes
+            pts (np.ndarray): points relative to the reference cell, one per row
+            weighted (bool): apply weighting. Defaults to True.
+
+        Returns:
+            np.ndarray: norms of shape (num_pts, *grid.shape); work array, which is
+                overwritten in the next call
+
+        """
+        reconstruction = self.grid.cell_reconstruction(pts)
+
+        # Store components contiguously for fast component-wise reductions
+        components = self._buffer(
+            "cell_flux", (self.grid.dim, *reconstruction.shape[:-1])
+        )
+        cell_flux = reconstruction(flat_flux, out=np.moveaxis(components, 0, -1))
+        if weighted:
+            self.cell_weighted_flux(cell_flux, out=cell_flux)
+
+        # Euclidean norm, accumulated over components
+        cell_flux_norm = np.square(
+            components[0], out=self._buffer("cell_flux_norm", components.shape[1:])
+        )
+        for component in components[1:]:
+            np.square(component, out=component)
+            cell_flux_norm += component
+        return np.sqrt(cell_flux_norm, out=cell_flux_norm)
+
     def l1_dissipation(self, flat_flux: np.ndarray) -> float:
         """Compute the l1 dissipation of the solution.
 
@@ -935,40 +1131,41 @@ class VariationalWassersteinDistance(darsia.EMD):
             )
             flat_weighted_flux_norm = np.zeros(self.grid.num_faces, dtype=float)
 
-            # Fetch cell corners
-            cell_corners = self.grid.cell_corners
+            # Evaluate |weight * flux| at all cell corners at once
+            corner_flux_norm = self._cell_flux_norm(flat_flux, self.grid.cell_corners)
 
             # Strategy: Follow the lead: 1. find all faces, 2. Visit their neighbouring
-            # cells, 3. find the corresponding corners, 4. compute the flux in each
+            # cells, 3. find the corresponding corners, 4. pick the flux in each
 
             # Iterate over all normal orientations
             for orientation in range(self.grid.dim):
                 # Fetch all faces with this orientations
-                faces = self.grid.faces[orientation]
+                faces = self.grid.face_slices[orientation]
 
                 # Pick the neighbouring cells (use left and right just for synonyms)
                 for i, side in enumerate(range(2)):
-                    # Fetch cells and respective corners corresponding to the faces.
-                    cells = self.grid.connectivity[faces, side]
-                    # Due to the structured nature, all faces have the same connectivity
-                    # and corner indices.
-                    cell_corner_indices = self.grid.cell_corner_indices[faces[0], side]
-
-                    # Pick the corresponding coordinates
-                    coordinates = cell_corners[cell_corner_indices]
-
-                    for j, pt in enumerate(coordinates):
-                        # Evaluate the norm of the flux at the coordinates
-                        subcell_flux = darsia.face_to_cell(self.grid, flat_flux, pt=pt)
-                        # Apply cell-based weighting
-                        weighted_subcell_flux = self.cell_weighted_flux(subcell_flux)
+                    # Fetch layer of cells and respective corners corresponding to the
+                    # faces, ordered as the faces. Due to the structured nature, all
+                    # faces have the same connectivity and corner indices.
+                    cells = tuple(
+                        (
+                            (slice(0, -1) if side == 0 else slice(1, None))
+                            if d == orientation
+                            else slice(None)
+                        )
+                        for d in range(self.grid.dim)
+                    )
+                    cell_corner_indices = self.grid.axis_corner_indices[
+                        orientation, side
+                    ]
 
+                    for j, corner in enumerate(cell_corner_indices):
                         # Store the norm of the subcell flux from the cell associated to
                         # the flux
-                        id = i * len(coordinates) + j
-                        subcell_flux_norm[faces, id] = np.linalg.norm(
-                            weighted_subcell_flux, 2, axis=-1
-                        ).ravel("F")[cells]
+                        id = i * len(cell_corner_indices) + j
+                        subcell_flux_norm[faces, id] = np.ravel(
+                            corner_flux_norm[corner][cells], "F"
+                        )
 
             # Average over the subcells using harmonic averaging
             flat_weighted_flux_norm = hmean(subcell_flux_norm, axis=1)
@@ -988,7 +1185,12 @@ class VariationalWassersteinDistance(darsia.EMD):
             # of continuous fluxes over cells evaluated at faces)
             if not hasattr(self, "face_reconstruction"):
                 self._setup_face_reconstruction()
-            full_face_flux = self.face_reconstruction(flat_flux)
+            full_face_flux = self.face_reconstruction(
+                flat_flux,
+                out=self._buffer(
+                    "full_face_flux", (self.grid.num_faces, self.grid.dim)
+                ),
+            )
 
             # Determine the l2 norm of the fluxes on the faces
             weighted_face_flux = self._product(harm_avg_face_weights, full_face_flux)
@@ -1328,11 +1530,15 @@ class VariationalWassersteinDistance(darsia.EMD):
     # ! ---- Main methods ----
 
     @abstractmethod
-    def _solve(self, rhs: np.ndarray) -> tuple:
+    def _solve(
+        self, flat_mass_diff: np.ndarray, initial_solution: Optional[np.ndarray] = None
+    ) -> tuple:
         """Solve for the Wasserstein distance.
 
         Args:
-            rhs (np.ndarray): right hand side
+            flat_mass_diff (np.ndarray): difference of mass distributions
+            initial_solution (np.ndarray, optional): initial guess; the Darcy solution
+                for unitary mobility is used if None.
 
         Returns:
             tuple: distance, solution, info
@@ -1409,6 +1615,106 @@ class VariationalWassersteinDistance(darsia.EMD):
         else:
             return distance
 
+    # ! ---- Distance matrices ----
+
+    def _setup_batch(self, images: list[darsia.Image]) -> dict:
+        """Setup shared by all pairs of a distance matrix.
+
+        The Darcy problem for unitary mobility, used as initial guess, is linear in
+        the mass difference. Thus, it is solved once for each image (relative to the
+        first image), with a single setup of the linear solver. The initial guess for
+        any pair is the difference of the respective solutions.
+
+        NOTE: The Darcy solutions of all images are kept in memory.
+
+        Args:
+            images (list of images): images.
+
+        Returns:
+            dict: flat mass distributions and Darcy solutions of all images.
+
+        """
+        flat_masses = [np.ravel(img.img, "F") for img in images]
+        darcy_solutions = [np.zeros(self.grid.num_faces + self.grid.num_cells + 1)]
+        for k, img in enumerate(images[1:], start=1):
+            assert img.scalar
+            self._compatibility_check(images[0], img)
+            rhs = np.concatenate(
+                [
+                    np.zeros(self.grid.num_faces, dtype=float),
+                    self.mass_matrix_cells.dot(flat_masses[k] - flat_masses[0]),
+                    np.zeros(1, dtype=float),
+                ]
+            )
+            solution, _ = self.linear_solve(
+                self.darcy_init.copy(), rhs, np.zeros_like(rhs), reuse_solver=k > 1
+            )
+            darcy_solutions.append(solution)
+        return {"flat_masses": flat_masses, "darcy_solutions": darcy_solutions}
+
+    def _pair_distances(
+        self,
+        images: list[darsia.Image],
+        pairs: list[tuple[int, int]],
+        batch: Optional[dict] = None,
+        warm_start: bool = False,
+    ) -> tuple[list[float], list[dict]]:
+        """Distances between pairs of images.
+
+        With warm start, each pair (i, j) is initialized with the solution of the
+        previous pair (k, l), corrected by the Darcy solution for the difference of
+        the mass differences of both pairs. This preserves mass conservation of the
+        initial guess.
+
+        Args:
+            images (list of images): images.
+            pairs (list of tuple of int): pairs of indices of source and destination
+                images, solved in the given order.
+            batch (dict, optional): output of _setup_batch.
+            warm_start (bool): flag controlling the use of warm starts.
+
+        Returns:
+            list of float: distances.
+            list of dict: solver information for each pair.
+
+        """
+        if batch is None:
+            batch = self._setup_batch(images)
+        flat_masses = batch["flat_masses"]
+        darcy_solutions = batch["darcy_solutions"]
+
+        distances = []
+        infos = []
+        solution = None
+        previous = None
+        for i, j in pairs:
+            if warm_start and solution is not None:
+                initial_solution = solution + (
+                    darcy_solutions[j]
+                    - darcy_solutions[i]
+                    - darcy_solutions[previous[1]]
+                    + darcy_solutions[previous[0]]
+                )
+            elif self.coarse_level is not None:
+                # Multilevel initialization
+                initial_solution = None
+            else:
+                initial_solution = darcy_solutions[j] - darcy_solutions[i]
+            distance, solution, info = self._solve(
+                flat_masses[j] - flat_masses[i], initial_solution
+            )
+            distances.append(distance)
+            infos.append(info)
+            previous = (i, j)
+        return distances, infos
+
+    def __getstate__(self) -> dict:
+        """Pickle without the cached linear solver, which is set up again on demand."""
+        state = self.__dict__.copy()
+        state.pop("linear_solver", None)
+        state["_buffers"] = {}
+        return state
+
     # ! ---- Utility methods ----
 
     def _analyze_timings(self, timings: dict) -> dict:
@@ -1512,19 +1818,23 @@ class WassersteinDistanceNewton(VariationalWassersteinDistance):
         )
         return approx_jacobian
 
-    def _solve(self, flat_mass_diff: np.ndarray) -> tuple[float, np.ndarray, dict]:
+    def _solve(
+        self, flat_mass_diff: np.ndarray, initial_solution: Optional[np.ndarray] = None
+    ) -> tuple[float, np.ndarray, dict]:
         """Solve the Beckman problem using Newton's method.
 
         Args:
             flat_mass_diff (np.ndarray): difference of mass distributions
+            initial_solution (np.ndarray, optional): initial guess; the Darcy solution
+                for unitary mobility is used if None.
 
         Returns:
             tuple: distance, solution, info
 
         """
         # Setup time and memory profiling
-        tic = time.time()
-        tracemalloc.start()
+        profile = darsia.SolverProfile(self.profiling)
+        profile.start()
 
         # Solver parameters. By default tolerances for increment and distance are
         # set, such that they do not affect the convergence.
@@ -1542,11 +1852,13 @@ class WassersteinDistanceNewton(VariationalWassersteinDistance):
             ]
         )
 
-        # Initialize Newton iteration with Darcy solution for unitary mobility
-        solution_i = np.zeros_like(rhs, dtype=float)
-        solution_i, _ = self.linear_solve(
-            self.darcy_init.copy(), rhs.copy(), solution_i
-        )
+        # Initialize Newton iteration with Darcy solution for unitary mobility, or
+        # through coarse levels
+        level_infos = []
+        if initial_solution is None:
+            solution_i, level_infos = self._initial_solution(flat_mass_diff, rhs)
+        else:
+            solution_i = initial_solution.copy()
 
         # Initialize distance in case below iteration fails
         new_distance = 0
@@ -1636,11 +1948,14 @@ class WassersteinDistanceNewton(VariationalWassersteinDistance):
                     abs(new_distance - old_distance)
                 )
                 convergence_history["timing"].append(stats_i)
+                profile.record(iter, stats_i)
 
-                # Extract current total run time
-                current_run_time = self._analyze_timings(convergence_history["timing"])[
-                    "total"
-                ]
+                # Extract current total run time - accumulate to avoid quadratic cost
+                current_run_time = self._analyze_timings([stats_i])["total"] + (
+                    convergence_history["run_time"][-1]
+                    if len(convergence_history["run_time"]) > 0
+                    else 0.0
+                )
                 convergence_history["run_time"].append(current_run_time)
 
                 # Print performance to screen
@@ -1691,8 +2006,8 @@ class WassersteinDistanceNewton(VariationalWassersteinDistance):
                 break
 
         # Summarize profiling (time in seconds, memory in GB)
+        profile.stop()
         total_timings = self._analyze_timings(convergence_history["timing"])
-        peak_memory_consumption = tracemalloc.get_traced_memory()[1] / 10**9
 
         # Define performance metric
         info = {
@@ -1700,8 +2015,13 @@ class WassersteinDistanceNewton(VariationalWassersteinDistance):
             "number_iterations": iter,
             "convergence_history": convergence_history,
             "timings": total_timings,
-            "peak_memory_consumption": peak_memory_consumption,
         }
+        if self.coarse_level is not None:
+            info["levels"] = level_infos + [self._level_info(new_distance, info)]
+        if profile.enabled:
+            info["profile"] = profile
+        if profile.trace_memory:
+            info["peak_memory_consumption"] = profile.peak_memory_consumption
 
         return new_distance, solution_i, info
 
@@ -1790,19 +2110,23 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
 
         return l_scheme_mixed_darcy, weight, shrink_factor
 
-    def _solve(self, flat_mass_diff: np.ndarray) -> tuple[float, np.ndarray, dict]:
+    def _solve(
+        self, flat_mass_diff: np.ndarray, initial_solution: Optional[np.ndarray] = None
+    ) -> tuple[float, np.ndarray, dict]:
         """Solve the Beckman problem using the Bregman method.
 
         Args:
             flat_mass_diff (np.ndarray): difference of mass distributions
+            initial_solution (np.ndarray, optional): initial guess; the Darcy solution
+                for unitary mobility is used if None.
 
         Returns:
             tuple: distance, solution, info
 
         """
         # Setup time and memory profiling
-        tic = time.time()
-        tracemalloc.start()
+        profile = darsia.SolverProfile(self.profiling)
+        profile.start()
 
         # Solver parameters
         num_iter = self.options.get("num_iter", 100)
@@ -1819,11 +2143,13 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
             ]
         )
 
-        # Initialize Newton iteration with Darcy solution for unitary mobility
-        solution_i = np.zeros_like(rhs, dtype=float)
-        solution_i, _ = self.linear_solve(
-            self.darcy_init.copy(), rhs.copy(), solution_i
-        )
+        # Initialize Newton iteration with Darcy solution for unitary mobility, or
+        # through coarse levels
+        level_infos = []
+        if initial_solution is None:
+            solution_i, level_infos = self._initial_solution(flat_mass_diff, rhs)
+        else:
+            solution_i = initial_solution.copy()
 
         # Initialize distance in case below iteration fails
         new_distance = 0
@@ -1957,6 +2283,7 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
 
                 # Catch nan values
                 if np.isnan(new_distance):
+                    profile.stop()
                     info = {
                         "converged": False,
                         "number_iterations": iter,
@@ -1996,11 +2323,14 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
                     np.linalg.norm(mass_conservation_residual, 2) / mass_ref
                 )
                 convergence_history["timing"].append(stats_i)
+                profile.record(iter, stats_i)
 
-                # Extract current total run time
-                current_run_time = self._analyze_timings(convergence_history["timing"])[
-                    "total"
-                ]
+                # Extract current total run time - accumulate to avoid quadratic cost
+                current_run_time = self._analyze_timings([stats_i])["total"] + (
+                    convergence_history["run_time"][-1]
+                    if len(convergence_history["run_time"]) > 0
+                    else 0.0
+                )
                 convergence_history["run_time"].append(current_run_time)
 
                 # Print status
@@ -2069,8 +2399,8 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
         solution_i[self.pressure_slice] = newton_update[self.pressure_slice]
 
         # Summarize profiling (time in seconds, memory in GB)
+        profile.stop()
         total_timings = self._analyze_timings(convergence_history["timing"])
-        peak_memory_consumption = tracemalloc.get_traced_memory()[1] / 10**9
 
         # Compute l1 norm of the flux
         unweighted_transport_density = self.transport_density(flux, weighted=False)
@@ -2084,12 +2414,101 @@ class WassersteinDistanceBregman(VariationalWassersteinDistance):
             "number_iterations": iter,
             "convergence_history": convergence_history,
             "timings": total_timings,
-            "peak_memory_consumption": peak_memory_consumption,
         }
+        if self.coarse_level is not None:
+            info["levels"] = level_infos + [self._level_info(new_distance, info)]
+        if profile.enabled:
+            info["profile"] = profile
+        if profile.trace_memory:
+            info["peak_memory_consumption"] = profile.peak_memory_consumption
 
         return new_distance, solution_i, info
 
 
+# ! ---- Transfer between levels ----
+
+
+def _coarsen_cells(array: np.ndarray, padding: str = "constant") -> np.ndarray:
+    """Conservative coarsening of cell values by a factor of 2 in each dimension.
+
+    Cell values are averaged over blocks of 2^d cells, such that integrals are
+    preserved for doubled voxel sizes. Odd numbers of cells are padded.
+
+    Args:
+        array (np.ndarray): cell values
+        padding (str): padding mode of np.pad, "constant" (zero) for conservation of
+            mass, "edge" for extending coefficients.
+
+    Returns:
+        np.ndarray: coarse cell values
+
+    """
+    padded_array = np.pad(array, [(0, n % 2) for n in array.shape], mode=padding)
+    blocks = []
+    for n in padded_array.shape:
+        blocks += [n // 2, 2]
+    return np.mean(
+        np.reshape(padded_array, blocks), axis=tuple(range(1, 2 * array.ndim, 2))
+    )
+
+
+def _prolongate_cells(
+    coarse_grid: darsia.Grid, fine_grid: darsia.Grid, coarse_values: np.ndarray
+) -> np.ndarray:
+    """Prolongation of flat cell values through injection.
+
+    Args:
+        coarse_grid (darsia.Grid): coarse grid
+        fine_grid (darsia.Grid): fine grid
+        coarse_values (np.ndarray): flat cell values on the coarse grid
+
+    Returns:
+        np.ndarray: flat cell values on the fine grid
+
+    """
+    values = np.reshape(coarse_values, coarse_grid.shape, order="F")
+    values = values[np.ix_(*[np.arange(n) // 2 for n in fine_grid.shape])]
+    return np.ravel(values, "F")
+
+
+def _prolongate_flux(
+    coarse_grid: darsia.Grid, fine_grid: darsia.Grid, coarse_flux: np.ndarray
+) -> np.ndarray:
+    """Prolongation of flat normal fluxes through RT0 interpolation.
+
+    Fine faces on coarse faces inherit the coarse flux, fine faces inside coarse
+    cells the average of the fluxes on the opposite coarse faces (zero on the
+    boundary). Thus, the divergence is preserved.
+
+    Args:
+        coarse_grid (darsia.Grid): coarse grid
+        fine_grid (darsia.Grid): fine grid
+        coarse_flux (np.ndarray): flat fluxes on the coarse grid
+
+    Returns:
+        np.ndarray: flat fluxes on the fine grid
+
+    """
+    fine_flux = np.zeros(fine_grid.num_faces, dtype=float)
+    for d in range(fine_grid.dim):
+        # Normal fluxes on all coarse faces with normal d, incl. the boundary
+        flux = np.pad(
+            coarse_flux[coarse_grid.face_index[d]],
+            [(1, 1) if e == d else (0, 0) for e in range(fine_grid.dim)],
+        )
+        # Fine face k is located at position (k + 1) / 2 in coarse face units
+        k = np.arange(fine_grid.shape[d] - 1)
+        flux = 0.5 * (
+            np.take(flux, (k + 1) // 2, axis=d) + np.take(flux, (k + 2) // 2, axis=d)
+        )
+        # Piecewise constant in tangential directions
+        for e in range(fine_grid.dim):
+            if e != d:
+                flux = np.take(flux, np.arange(fine_grid.shape[e]) // 2, axis=e)
+        fine_flux[fine_grid.face_index[d]] = flux
+    return fine_flux
+
+
 # Unified access
 def wasserstein_distance(
     mass_1: darsia.Image,
@@ -2107,14 +2526,38 @@ def wasserstein_distance(
         **kwargs: additional arguments (only for "newton" and "bregman")
             - options (dict): options for the method.
 
+    """
+    w1 = _wasserstein_method(mass_1, method, weight, **kwargs)
+
+    # Compute and return Wasserstein distance
+    return w1(mass_1, mass_2)
+
+
+def _wasserstein_method(
+    mass: darsia.Image,
+    method: str,
+    weight: Optional[darsia.Image] = None,
+    **kwargs,
+) -> darsia.EMD:
+    """Setup of the method for computing Wasserstein distances.
+
+    Args:
+        mass (darsia.Image): image defining the grid
+        method (str): method to use ("newton", "bregman", or "cv2.emd")
+        weight (darsia.Image, optional): weight
+        **kwargs: additional arguments, see wasserstein_distance.
+
+    Returns:
+        darsia.EMD: distance object
+
     """
     # Define method for computing 1-Wasserstein distance
 
     if method.lower() in ["newton", "bregman"]:
         # Use Finite Volume Iterative Method (Newton or Bregman)
 
-        # Extract grid - implicitly assume mass_2 to generate same grid
-        grid: darsia.Grid = darsia.generate_grid(mass_1)
+        # Extract grid - implicitly assume all images to generate same grid
+        grid: darsia.Grid = darsia.generate_grid(mass)
 
         # Fetch options and define Wasserstein method
         options = kwargs.get("options", {})
@@ -2134,8 +2577,45 @@ def wasserstein_distance(
     else:
         raise NotImplementedError(f"Method {method} not implemented.")
 
-    # Compute and return Wasserstein distance
-    return w1(mass_1, mass_2)
+    return w1
+
+
+def wasserstein_distance_series(
+    images: list[darsia.Image],
+    method: str,
+    weight: Optional[darsia.Image] = None,
+    mode: str = "consecutive",
+    warm_start: bool = True,
+    **kwargs,
+) -> tuple[np.ndarray, dict]:
+    """Unified access to Wasserstein distances along a time series of images.
+
+    In contrast to repeated calls of wasserstein_distance, the grid, discretization
+    and the Darcy initialization are set up once for all pairs. Iterative methods
+    are warm-started from the solution of the previous pair.
+
+    Example:
+        distances, info = darsia.wasserstein_distance_series(
+            images, method="newton", options=options
+        )
+        print(info["number_iterations"])
+
+    Args:
+        images (list of darsia.Image): images with same mass, ordered in time.
+        method (str): method to use ("newton", "bregman", or "cv2.emd")
+        weight (darsia.Image, optional): weight (only for "newton" and "bregman").
+        mode (str): "consecutive" or "reference", see darsia.EMD.distance_series.
+        warm_start (bool): flag controlling the use of warm starts.
+        **kwargs: additional arguments, see wasserstein_distance.
+
+    Returns:
+        np.ndarray: distances
+        dict: pairs of image indices, and number of iterations and convergence
+            flags for each pair (only for "newton" and "bregman").
+
+    """
+    w1 = _wasserstein_method(images[0], method, weight, **kwargs)
+    return w1.distance_series(images, mode=mode, warm_start=warm_start)
 
 
 def wasserstein_distance_to_vtk(
@@ -29,7 +29,7 @@ class AbstractBalancingCalibration:
     @abc.abstractmethod
     def optimize_balancing(
         self,
-        input_images: list[np.ndarray],
+        input_images: np.ndarray,
         images_diff: list[np.ndarray],
         relative_times: list[float],
         options: dict,
@@ -83,16 +83,17 @@ class AbstractBalancingCalibration:
             bool: success of the calibration study.
 
         """
-        # Apply the same steps as in __call__ to all images, until before balancing is applied.
-
-        # Prepare calibration and determine fixed data
-        images_diff = [self._subtract_background(img) for img in images]
-
-        # Extract monochromatic version and take difference wrt the baseline image
-        images_signal = [self._extract_scalar_information(diff) for diff in images_diff]
-
-        # Clean signal
-        images_clean_signal = [self._clean_signal(signal) for signal in images_signal]
+        # Apply the same steps as in __call__ to batches of images at once, until
+        # before balancing is applied. Only the clean signals are kept.
+        arrays = [img.img for img in images]
+        images_clean_signal = None
+        for batch in self._batches(arrays):
+            _, clean_signal = self._preprocess_frames(np.stack(arrays[batch]))
+            if images_clean_signal is None:
+                images_clean_signal = np.empty(
+                    (len(arrays),) + clean_signal.shape[1:], dtype=clean_signal.dtype
+                )
+            images_clean_signal[batch] = clean_signal
 
         # The missing steps: balancing, restoration, and the model are not applied.
         # Instead, the balancing and a lightweight restoration will be part of
@@ -130,7 +131,7 @@ class ContinuityBasedBalancingCalibrationMixin(AbstractBalancingCalibration):
 
     def optimize_balancing(
         self,
-        images: list[np.ndarray],
+        images: np.ndarray,
         options: dict,
     ) -> tuple[np.ndarray, bool]:
         """
@@ -328,13 +329,11 @@ class ContinuityBasedBalancingCalibrationMixin(AbstractBalancingCalibration):
 
         return contour_mask
 
-    def _least_squares_minimizer(
-        self, images: list[np.ndarray], options: dict
-    ) -> np.ndarray:
+    def _least_squares_minimizer(self, images: np.ndarray, options: dict) -> np.ndarray:
         """
 
         Args:
-            images (list of np.ndarray): signals which in principle went
+            images (np.ndarray): stack of signals which in principle went
                 through ConcentrationAnalysis.__call__() including
                 ConcentrationAnalysis._convert_signal()
 
@@ -8,13 +8,12 @@ import copy
 import logging
 from pathlib import Path
 from time import time
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 from warnings import warn
 
 import cv2
 import matplotlib.pyplot as plt
 import numpy as np
-import skimage
 
 import darsia
 
@@ -71,6 +70,14 @@ class ConcentrationAnalysis:
                     - 0: no intermediate results are displayed
                     - 1: only final result is displayed
                     - 2: intermediate results are displayed
+                - 'reuse buffers': if True, the input image is not copied, and the
+                    difference and cleaned signal are written into work arrays,
+                    which are reused for all images of the same shape.
+                - 'buffer dtype': floating point type of the work arrays (np.float32
+                    or np.float64, default).
+                - 'batch size': maximal number of pixels (summed over all frames)
+                    processed at once for frame-major stacks of images, see
+                    analyze_frames(); default 2**21.
 
         """
         self.base: Optional[darsia.Image] = None
@@ -114,6 +121,18 @@ class ConcentrationAnalysis:
         self.first_restoration_then_model = kwargs.get("restoration -> model", True)
         """Option for defining order of routines."""
 
+        self.reuse_buffers: bool = kwargs.get("reuse buffers", False)
+        """Flag controlling whether work arrays are reused."""
+
+        self.buffer_dtype = np.dtype(kwargs.get("buffer dtype", np.float64))
+        """Data type of the work arrays."""
+
+        self._buffers: dict[tuple[str, tuple[int, ...]], np.ndarray] = {}
+        """Work arrays, identified by name and shape."""
+
+        self.batch_size: int = kwargs.get("batch size", 2**21)
+        """Maximal number of pixels processed at once for frame-major stacks."""
+
         # Define a cleaning filter based on remaining images.
         self.find_cleaning_filter()
 
@@ -140,15 +159,13 @@ class ConcentrationAnalysis:
 
         """
         if base is not None:
-            self.base = base.copy()
             # Make sure that the image is converted to float for substraction
-            if any(
-                [img.img.dtype not in [float, np.float32, np.float64] for img in base]
-            ):
-                base = [img.img_as(float) for img in base]
+            if base.img.dtype not in [float, np.float32, np.float64]:
+                base = base.img_as(float)
                 warn(
                     "The baseline image needed to be converted to float for substraction."
                 )
+            self.base = base.copy()
         if mask is not None:
             self.mask = mask
 
@@ -182,23 +199,23 @@ class ConcentrationAnalysis:
 
         # Learn structural noise from collection of images
         if baseline_images is not None:
-            self.threshold_cleaning_filter = np.zeros(
-                self.base.img.shape[:2], dtype=float
-            )
-
-            # Combine the results of a series of images
-            for img in baseline_images:
-                probe_img = img.copy()
-
-                # Take (unsigned) difference
-                diff = self._subtract_background(probe_img)
-
-                # Extract scalar version
-                monochromatic_diff = self._reduce_signal(diff)
-
-                # Consider elementwise max
-                self.threshold_cleaning_filter = np.maximum(
-                    self.threshold_cleaning_filter, monochromatic_diff
+            # Combine the results of a series of images, through the elementwise max
+            # of the (unsigned) scalar differences. Only a batch of images is stacked
+            # at once. NOTE: No cleaning filter is applied at this point.
+            images = [img.img for img in baseline_images]
+            for batch in self._batches(images):
+                frames = np.stack(images[batch])
+                monochromatic_diff = self._reduce_frames(
+                    self._subtract_background(frames)
+                )
+                if self.threshold_cleaning_filter is None:
+                    self.threshold_cleaning_filter = np.zeros(
+                        monochromatic_diff.shape[1:], dtype=float
+                    )
+                np.maximum(
+                    self.threshold_cleaning_filter,
+                    np.max(monochromatic_diff, axis=0),
+                    out=self.threshold_cleaning_filter,
                 )
 
     def read_cleaning_filter_from_file(self, path: Union[str, Path]) -> None:
@@ -236,24 +253,21 @@ class ConcentrationAnalysis:
         """Extract concentration based on a reference image and rescaling.
 
         Args:
-            img (darsia.Image): probing image
+            img (darsia.Image): probing image; space-time images are analyzed as
+                a whole, see analyze_frames().
 
         Returns:
             darsia.Image: concentration
 
         """
-        # Make sure that the image is converted to float for substraction
-        if img.img.dtype not in [float, np.float32, np.float64]:
-            probe_img = copy.deepcopy(img).img_as(float)
-            warn(
-                "The input for concentration analysis needed to be converted to float."
-            )
-        else:
-            probe_img = copy.deepcopy(img)
+        if img.series:
+            return self._analyze_series(img)
+
+        probe_img = self._prepare_image(img)
 
         # Remove background image
         tic = time()
-        diff = self._subtract_background(probe_img)
+        diff = self._subtract_background(probe_img, out=self._buffer("diff", img.shape))
         logger.debug(f"subtraction: {time() - tic}")
 
         tic = time()
@@ -268,7 +282,9 @@ class ConcentrationAnalysis:
         self._inspect_scalar_signal(signal)
 
         # Clean signal
-        clean_signal = self._clean_signal(signal)
+        clean_signal = self._clean_signal(
+            signal, out=self._buffer("clean signal", signal.shape)
+        )
 
         # Provide possibility for tuning and inspection of intermediate results
         self._inspect_clean_signal(clean_signal)
@@ -291,10 +307,247 @@ class ConcentrationAnalysis:
             concentration = self._restore_signal(nonsmooth_concentration)
             logger.debug(f"restoration: {time() - tic}")
 
+        return self._finalize(concentration, img)
+
+    def analyze_frames(self, frames: np.ndarray) -> np.ndarray:
+        """Extract concentrations for a stack of images at once.
+
+        The stack is processed in batches of frames. Background subtraction, signal
+        reduction, cleaning, and pixelwise balancing and models are applied to each
+        batch through broadcasting. Only the restoration, and balancing and models
+        which are not pixelwise, are applied frame by frame. Intermediate results
+        are not inspected.
+
+        Args:
+            frames (np.ndarray): stack of images with leading frame axis, e.g., of
+                shape (T, H, W, C).
+
+        Returns:
+            np.ndarray: stack of concentrations, e.g., of shape (T, H, W).
+
+        """
+        concentration: Optional[np.ndarray] = None
+        for batch in self._batches(frames):
+            result = self._analyze_batch(frames[batch])
+            if concentration is None:
+                concentration = np.empty(
+                    (len(frames),) + result.shape[1:], dtype=result.dtype
+                )
+            concentration[batch] = result
+        return concentration
+
+    def _analyze_batch(self, frames: np.ndarray) -> np.ndarray:
+        """Extract concentrations for a batch of frames.
+
+        Args:
+            frames (np.ndarray): stack of images with leading frame axis.
+
+        Returns:
+            np.ndarray: stack of concentrations, possibly sharing memory with the
+                input or the work arrays.
+
+        """
+        diff, clean_signal = self._preprocess_frames(frames)
+        balanced_signal = self._balance_frames(clean_signal)
+
+        if self.first_restoration_then_model:
+            smooth_signal = self._restore_frames(balanced_signal)
+            return self._convert_frames(smooth_signal, diff)
+        else:
+            return self._restore_frames(self._convert_frames(balanced_signal, diff))
+
+    def _batches(self, frames: Union[np.ndarray, list[np.ndarray]]) -> Iterator[slice]:
+        """Split a stack of frames into batches of bounded number of pixels.
+
+        Only frame-major stacks (and lists of frames) are split. Batches of strided
+        frames (e.g., of space-time images with time-minor layout) would not
+        traverse the memory in order, such that these are processed at once.
+
+        Args:
+            frames (np.ndarray or list of arrays): stack of images with leading frame
+                axis, or list of images.
+
+        Yields:
+            slice: frames of a batch.
+
+        """
+        frame_size = int(np.prod(frames[0].shape[:2])) if len(frames) > 0 else 0
+        if (
+            isinstance(frames, np.ndarray)
+            and frames.ndim > 1
+            and frames.strides[0] < frames.strides[1]
+        ):
+            step = len(frames)
+        else:
+            step = max(self.batch_size // max(frame_size, 1), 1)
+        for start in range(0, len(frames), step):
+            yield slice(start, min(start + step, len(frames)))
+
+    def _analyze_series(self, img: darsia.Image) -> darsia.Image:
+        """Extract concentrations for a space-time image.
+
+        Args:
+            img (darsia.Image): probing space-time image
+
+        Returns:
+            darsia.Image: space-time concentration
+
+        """
+        # The time axis follows the spatial axes
+        frames = np.moveaxis(img.img, img.space_dim, 0)
+        concentration = self.analyze_frames(frames)
+        concentration = np.ascontiguousarray(
+            np.moveaxis(concentration, 0, img.space_dim)
+        )
+        return self._finalize(concentration, img)
+
+    def _preprocess_frames(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Subtract the background, reduce and clean a stack of images at once.
+
+        Args:
+            frames (np.ndarray): stack of images with leading frame axis.
+
+        Returns:
+            np.ndarray: stack of differences with the baseline image.
+            np.ndarray: stack of clean signals.
+
+        """
+        # Allocate the difference with the memory layout of the input, such that
+        # space-time images are traversed in memory order (time-minor).
+        out = self._buffer("diff", frames.shape)
+        if out is None:
+            if not np.issubdtype(frames.dtype, np.floating):
+                warn(
+                    "The input for concentration analysis needed to be converted to "
+                    "float."
+                )
+                dtype = np.dtype(float)
+            elif self.base is None:
+                dtype = frames.dtype
+            else:
+                dtype = np.result_type(frames.dtype, self.base.img.dtype)
+            out = np.empty_like(frames, dtype=dtype)
+        diff = self._subtract_background(frames, out=out)
+
+        signal = self._reduce_frames(diff)
+        clean_signal = self._clean_signal(
+            signal, out=self._buffer("clean signal", signal.shape)
+        )
+        return diff, clean_signal
+
+    def _reduce_frames(self, diff: np.ndarray) -> np.ndarray:
+        """Reduce a stack of images, at once if the reduction acts pixelwise.
+
+        Args:
+            diff (np.ndarray): stack of images
+
+        Returns:
+            np.ndarray: stack of monochromatic reductions
+
+        """
+        if self.signal_reduction is None or getattr(
+            self.signal_reduction, "pixelwise", False
+        ):
+            return self._reduce_signal(diff)
+        return np.stack([self._reduce_signal(d) for d in diff])
+
+    def _balance_frames(self, signal: np.ndarray) -> np.ndarray:
+        """Balance a stack of signals, at once if the balancing acts pixelwise.
+
+        Args:
+            signal (np.ndarray): stack of signals
+
+        Returns:
+            np.ndarray: stack of balanced signals
+
+        """
+        if self.balancing is None or getattr(self.balancing, "pixelwise", False):
+            return self._balance_signal(signal)
+        return np.stack([self._balance_signal(s) for s in signal])
+
+    def _restore_frames(self, signal: np.ndarray) -> np.ndarray:
+        """Apply restoration to each frame of a stack of signals.
+
+        Args:
+            signal (np.ndarray): stack of signals
+
+        Returns:
+            np.ndarray: stack of smooth signals
+
+        """
+        if self.restoration is None:
+            return signal
+        return np.stack([self._restore_signal(s) for s in signal])
+
+    def _convert_frames(self, signal: np.ndarray, diff: np.ndarray) -> np.ndarray:
+        """Convert a stack of signals, at once if the model acts pixelwise.
+
+        Args:
+            signal (np.ndarray): stack of signals
+            diff (np.ndarray): stack of differences of images
+
+        Returns:
+            np.ndarray: stack of physical data
+
+        """
+        if self._pixelwise_conversion:
+            return self._convert_signal(signal, diff)
+        return np.stack([self._convert_signal(s, d) for s, d in zip(signal, diff)])
+
+    @property
+    def _pixelwise_conversion(self) -> bool:
+        """Flag whether the conversion of signals acts on each pixel separately."""
+        return self.model is None or getattr(self.model, "pixelwise", False)
+
+    def _prepare_image(self, img: darsia.Image) -> darsia.Image:
+        """Prepare probing image for subtraction of the background.
+
+        Args:
+            img (darsia.Image): probing image
+
+        Returns:
+            darsia.Image: float copy of the image; the image itself if work arrays
+                are reused, which take care of the conversion.
+
+        """
+        if self.reuse_buffers:
+            return img
+        elif img.img.dtype not in [float, np.float32, np.float64]:
+            warn(
+                "The input for concentration analysis needed to be converted to float."
+            )
+            return copy.deepcopy(img).img_as(float)
+        else:
+            return copy.deepcopy(img)
+
+    def _finalize(
+        self,
+        concentration: np.ndarray,
+        img: darsia.Image,
+        buffers: Optional[list[np.ndarray]] = None,
+    ) -> darsia.Image:
+        """Convert concentration to image with the metadata of the probing image.
+
+        Args:
+            concentration (np.ndarray): concentration
+            img (darsia.Image): probing image
+            buffers (list of arrays, optional): work arrays, which may not be shared
+                with the result; the work arrays of the analysis if None.
+
+        Returns:
+            darsia.Image: concentration
+
+        """
         # Invoke plot
         if self.verbosity >= 1:
             plt.show()
 
+        # Decouple the result from the work arrays
+        if buffers is None:
+            buffers = list(self._buffers.values())
+        if any(np.may_share_memory(concentration, b) for b in buffers):
+            concentration = concentration.copy()
+
         metadata = img.metadata()
         is_scalar = len(concentration.shape) == len(img.shape) - 1
         if is_scalar:
@@ -302,6 +555,33 @@ class ConcentrationAnalysis:
         else:
             return type(img)(concentration, **metadata)
 
+    # ! ---- Work arrays
+
+    def _buffer(self, name: str, shape: tuple[int, ...]) -> Optional[np.ndarray]:
+        """Work array for given name and shape, if work arrays are reused.
+
+        Args:
+            name (str): name of the work array.
+            shape (tuple of int): shape of the work array.
+
+        Returns:
+            array, optional: work array with arbitrary content; None if work arrays
+                are not reused.
+
+        """
+        if not self.reuse_buffers:
+            return None
+        key = (name, tuple(shape))
+        if key not in self._buffers:
+            self._buffers[key] = np.empty(shape, dtype=self.buffer_dtype)
+        return self._buffers[key]
+
+    def __getstate__(self) -> dict:
+        """Do not serialize work arrays, e.g., when sending to worker processes."""
+        state = self.__dict__.copy()
+        state["_buffers"] = {}
+        return state
+
     # ! ---- Inspection routines
     def _inspect_diff(self, img: np.ndarray) -> None:
         """Routine allowing for plotting of intermediate results.
@@ -340,40 +620,56 @@ class ConcentrationAnalysis:
             plt.imshow(img)
 
     # ! ---- Pre- and post-processing methods
-    def _subtract_background(self, img: darsia.Image) -> np.ndarray:
+    def _subtract_background(
+        self, img: Union[darsia.Image, np.ndarray], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """Take difference between input image and baseline image, based
         on cached option.
 
         Args:
-            img (darsia.Image): test image.
+            img (darsia.Image or np.ndarray): test image, or array of such; stacks of
+                images with leading frame axis are broadcast against the baseline.
+            out (array, optional): work array for the difference; integer images are
+                converted to float within the work array.
 
         Returns:
             np.ndarray: difference with background image
 
         """
+        probe = img.img if isinstance(img, darsia.Image) else img
+        if out is not None and not np.issubdtype(probe.dtype, np.floating):
+            # Rescale to [0, 1] as skimage.img_as_float
+            np.multiply(probe, 1.0 / _dtype_range(probe.dtype), out=out)
+            probe = out
 
         if self.base is None:
             if self._diff_option == "positive":
-                diff = np.clip(img.img, 0, None)
+                diff = np.clip(probe, 0, None, out=out)
             elif self._diff_option == "negative":
-                diff = np.clip(-img.img, 0, None)
+                diff = np.negative(probe, out=out)
+                np.clip(diff, 0, None, out=diff)
             elif self._diff_option == "absolute":
-                diff = np.absolute(img.img)
+                diff = np.absolute(probe, out=out)
             elif self._diff_option == "plain":
-                diff = img.img
+                if out is None:
+                    diff = probe
+                else:
+                    diff = out
+                    diff[...] = probe
             else:
                 raise ValueError(f"Diff option {self._diff_option} not supported")
         else:
             if self._diff_option == "positive":
-                diff = np.clip(img.img - self.base.img, 0, None)
+                diff = np.subtract(probe, self.base.img, out=out)
+                np.clip(diff, 0, None, out=diff)
             elif self._diff_option == "negative":
-                diff = np.clip(self.base.img - img.img, 0, None)
+                diff = np.subtract(self.base.img, probe, out=out)
+                np.clip(diff, 0, None, out=diff)
             elif self._diff_option == "absolute":
-                diff = skimage.util.compare_images(
-                    img.img, self.base.img, method="diff"
-                )
+                diff = np.subtract(probe, self.base.img, out=out)
+                np.absolute(diff, out=diff)
             elif self._diff_option == "plain":
-                diff = img.img - self.base.img
+                diff = np.subtract(probe, self.base.img, out=out)
             else:
                 raise ValueError(f"Diff option {self._diff_option} not supported")
 
@@ -394,21 +690,23 @@ class ConcentrationAnalysis:
         else:
             return self.signal_reduction(img)
 
-    def _clean_signal(self, img: np.ndarray) -> np.ndarray:
+    def _clean_signal(
+        self, img: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """Apply cleaning thresholds.
 
         Args:
             img (np.ndarray): input image
+            out (array, optional): work array for the cleaned image
 
         Returns:
             np.ndarray: cleaned image
 
         """
-        return (
-            img
-            if self.threshold_cleaning_filter is None
-            else np.clip(img - self.threshold_cleaning_filter, 0, None)
-        )
+        if self.threshold_cleaning_filter is None:
+            return img
+        clean_img = np.subtract(img, self.threshold_cleaning_filter, out=out)
+        return np.clip(clean_img, 0, None, out=clean_img)
 
     def _balance_signal(self, img: np.ndarray) -> np.ndarray:
         """Routine responsible for rescaling wrt segments.
@@ -514,3 +812,15 @@ class PriorPosteriorConcentrationAnalysis(ConcentrationAnalysis):
             plt.imshow(posterior)
 
         return posterior
+
+    @property
+    def _pixelwise_conversion(self) -> bool:
+        """The prior is restricted to the mask of a single image."""
+        return False
+
+
+def _dtype_range(dtype: np.dtype) -> float:
+    """Maximal value of integer data types, used for scaling to [0, 1]."""
+    if np.issubdtype(dtype, np.integer):
+        return float(np.iinfo(dtype).max)
+    return 1.0
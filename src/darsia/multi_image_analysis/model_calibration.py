@@ -8,7 +8,8 @@ ConcentrationAnalysis.calibrate_model()
 from __future__ import annotations
 
 import abc
-from typing import Union
+import copy
+from typing import Optional, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -19,6 +20,166 @@ from sklearn.linear_model import LinearRegression, RANSACRegressor
 import darsia
 
 
+class CalibrationEngine:
+    """Evaluation of volumes of converted signals for varying model parameters.
+
+    All steps of the concentration analysis prior to the model are independent of
+    the model parameters, and are thus evaluated only once. For affine models (e.g.,
+    ScalingModel, LinearModel), the volumes are evaluated analytically from the
+    integrals of the signals, computed once at full resolution, and the signals are
+    not stored. For other models, the signals are stored, possibly with reduced
+    precision and resolution, and the model is applied in batches of frames.
+    Downsampling uses area averaging, while the geometry rescales its voxel volumes
+    accordingly, such that integrals of the signals are conserved.
+
+    NOTE: For models which are not affine, downsampling approximates the volumes.
+
+    Example:
+        engine = darsia.CalibrationEngine(
+            analysis, signals, diffs, geometry, dtype=np.float32, resize=0.25
+        )
+        for parameters in candidates:
+            analysis.model.update_model_parameters(parameters)
+            volumes = engine.volumes()
+
+    """
+
+    def __init__(
+        self,
+        analysis: darsia.ConcentrationAnalysis,
+        signals: np.ndarray,
+        diffs: np.ndarray,
+        geometry: darsia.Geometry,
+        dtype=None,
+        resize: Optional[Union[float, darsia.Resize]] = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            analysis (ConcentrationAnalysis): analysis providing the model.
+            signals (np.ndarray): stack of inputs for _convert_signal.
+            diffs (np.ndarray): stack of plain differences wrt background image.
+            geometry (darsia.Geometry): geometry for integration.
+            dtype: data type for storing the signals; unchanged if None.
+            resize (float or darsia.Resize, optional): downsampling of the stored
+                signals, either a resize factor for both axes (using area
+                averaging), or a resize object (should average, not sum).
+
+        """
+        self.analysis = analysis
+        """Concentration analysis."""
+
+        self.geometry = geometry
+        """Geometry for integration."""
+
+        self.signals: Optional[np.ndarray] = None
+        """Stored signals, only required for models which are not affine."""
+
+        self.diffs: Optional[np.ndarray] = None
+        """Stored differences, only required for models which are not affine."""
+
+        self.moments: Optional[tuple[np.ndarray, float]] = None
+        """Integrals of the signals (for each frame) and of unity, only for affine
+        models."""
+
+        if self._affine_coefficients() is not None:
+            self.moments = (
+                self._integrate(signals),
+                float(geometry.integrate(np.ones(signals.shape[1:3]))),
+            )
+        else:
+            if isinstance(resize, (int, float)):
+                resize = darsia.Resize(fx=resize, fy=resize, interpolation="inter_area")
+            if resize is not None:
+                # Integration of coarse data adapts the cached voxel volumes; keep
+                # the geometry of the caller untouched.
+                self.geometry = copy.deepcopy(geometry)
+            self.signals = _downsample(signals, dtype, resize)
+            self.diffs = _downsample(diffs, dtype, resize)
+
+    def volumes(self) -> np.ndarray:
+        """Volumes of the converted signals for the current model parameters.
+
+        Returns:
+            np.ndarray: volume for each frame.
+
+        Raises:
+            ValueError: if the model is not affine, and signals are not stored.
+
+        """
+        coefficients = self._affine_coefficients()
+        if coefficients is not None and self.moments is not None:
+            scaling, offset = coefficients
+            first_moments, zeroth_moment = self.moments
+            return scaling * first_moments + offset * zeroth_moment
+
+        if self.signals is None:
+            raise ValueError("Signals are only stored for models which are not affine.")
+        return self._integrate(self.signals, self.diffs, convert=True)
+
+    def _integrate(
+        self,
+        signals: np.ndarray,
+        diffs: Optional[np.ndarray] = None,
+        convert: bool = False,
+    ) -> np.ndarray:
+        """Integrate each frame of a stack, in batches of frames.
+
+        Args:
+            signals (np.ndarray): stack of signals.
+            diffs (np.ndarray, optional): stack of differences, required for
+                conversion.
+            convert (bool): flag controlling whether the signals are converted by
+                the model before integration.
+
+        Returns:
+            np.ndarray: integral of each frame.
+
+        """
+        volumes = []
+        for batch in self.analysis._batches(signals):
+            data = (
+                self.analysis._convert_frames(signals[batch], diffs[batch])
+                if convert
+                else signals[batch].astype(float)
+            )
+            volumes.append(self.geometry.integrate(np.moveaxis(data, 0, -1)))
+        return np.concatenate(volumes)
+
+    def _affine_coefficients(self) -> Optional[tuple[float, float]]:
+        """Coefficients of the conversion, if affine in the signal."""
+        if (
+            type(self.analysis)._convert_signal
+            is not darsia.ConcentrationAnalysis._convert_signal
+        ):
+            return None
+        model = self.analysis.model
+        if model is None:
+            return 1.0, 0.0
+        return model.affine_coefficients()
+
+
+def _downsample(
+    frames: np.ndarray, dtype=None, resize: Optional[darsia.Resize] = None
+) -> np.ndarray:
+    """Convert and resize a stack of frames.
+
+    Args:
+        frames (np.ndarray): stack of arrays with leading frame axis.
+        dtype: target data type; unchanged if None.
+        resize (darsia.Resize, optional): resize object; no resizing if None.
+
+    Returns:
+        np.ndarray: frame-major stack of converted arrays.
+
+    """
+    if dtype is not None:
+        frames = frames.astype(dtype, copy=False)
+    if resize is not None:
+        return np.stack([resize(frame) for frame in frames])
+    return np.ascontiguousarray(frames)
+
+
 class AbstractModelObjective:
     """
     Abstract class for defining an objective function
@@ -29,8 +190,8 @@ class AbstractModelObjective:
     @abc.abstractmethod
     def define_objective_function(
         self,
-        input_images: list[np.ndarray],
-        images_diff: list[np.ndarray],
+        input_images: np.ndarray,
+        images_diff: np.ndarray,
         times: list[float],
         options: dict,
     ):
@@ -60,6 +221,31 @@ class AbstractModelObjective:
         dofs = options.get("dofs", None)
         self.model.update_model_parameters(parameters, dofs)
 
+    def _calibration_engine(
+        self, input_images: np.ndarray, images_diff: np.ndarray, options: dict
+    ) -> CalibrationEngine:
+        """Engine evaluating volumes for varying model parameters.
+
+        Args:
+            input_images (np.ndarray): stack of inputs for _convert_signal
+            images_diff (np.ndarray): stack of plain differences wrt background image
+            options (dict): dictionary with the geometry for integration, and
+                optionally "cache dtype" and "cache resize" for storing the signals,
+                see CalibrationEngine.
+
+        Returns:
+            CalibrationEngine: calibration engine
+
+        """
+        return CalibrationEngine(
+            self,
+            input_images,
+            images_diff,
+            options["geometry"],
+            dtype=options.get("cache dtype"),
+            resize=options.get("cache resize"),
+        )
+
     def calibrate_model(
         self,
         images: Union[darsia.Image, list[darsia.Image]],
@@ -73,7 +259,8 @@ class AbstractModelObjective:
         model mixin via multiple inheritance.
 
         Args:
-            images (list of darsia.Image): calibration images
+            images (list of darsia.Image or darsia.Image): calibration images, or
+                space-time image
             options (dict): container holding tuning information for the numerical
                 calibration routine
             plot_result (bool): flag controlling whether the calibration is displayed
@@ -83,36 +270,27 @@ class AbstractModelObjective:
             bool: success of the calibration study.
 
         """
-        # Convert to list of images, if space time image provided.
-        if not isinstance(images, list):
+        # Stack all images along a leading frame axis.
+        if isinstance(images, list):
+            frames = np.stack([img.img for img in images])
+            times = [img.time for img in images]
+        else:
             assert images.series
-            image_series = images.copy()
-            images = [image_series.time_slice(i) for i in range(image_series.time_num)]
-
-        # Apply the same steps as in __call__ to all images.
-
-        # Prepare calibration and determine fixed data
-        images_diff = [self._subtract_background(img) for img in images]
-
-        # Extract monochromatic version and take difference wrt the baseline image
-        images_signal = [self._reduce_signal(diff) for diff in images_diff]
+            # Frame-major copy, as the objective is evaluated repeatedly
+            frames = np.ascontiguousarray(np.moveaxis(images.img, images.space_dim, 0))
+            times = list(images.time) if images.time is not None else [None]
 
-        # Clean signal
-        images_clean_signal = [self._clean_signal(signal) for signal in images_signal]
+        # Apply the same steps as in __call__ to all images at once.
+        assert (
+            self.first_restoration_then_model
+        ), "calibration only implemented for this"
+        images_diff, images_clean_signal = self._preprocess_frames(frames)
 
         # Balance signal (take into account possible heterogeneous effects)
-        images_balanced_signal = [
-            self._balance_signal(clean_signal) for clean_signal in images_clean_signal
-        ]
+        images_balanced_signal = self._balance_frames(images_clean_signal)
 
         # Smoothen/restore the signals
-        assert (
-            self.first_restoration_then_model
-        ), "calibration only implemented for this"
-        images_smooth_signal = [
-            self._restore_signal(balanced_signal)
-            for balanced_signal in images_balanced_signal
-        ]
+        images_smooth_signal = self._restore_frames(images_balanced_signal)
 
         # NOTE: The only step missing from __call__ is the conversion of the signal
         # applying the provided model. This step will be used to tune the
@@ -124,8 +302,7 @@ class AbstractModelObjective:
         maxiter = options.get("maxiter")
         method = options.get("method")
 
-        # Define reference time (not important which image serves as basis)
-        times = [img.time for img in images]
+        # Check the reference time (not important which image serves as basis)
         if any([time is None for time in times]):
             raise ValueError("Provide images with well-defined reference time.")
 
@@ -197,8 +374,8 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
 
     def define_objective_function(
         self,
-        input_images: list[np.ndarray],
-        images_diff: list[np.ndarray],
+        input_images: np.ndarray,
+        images_diff: np.ndarray,
         times: list[float],
         options: dict,
     ):
@@ -206,8 +383,8 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
         Define objective function such that the root is the min.
 
         Args:
-            input_images (list of np.ndarray): input for _convert_signal
-            images_diff (list of np.ndarray): plain differences wrt background image
+            input_images (np.ndarray): stack of inputs for _convert_signal
+            images_diff (np.ndarray): stack of plain differences wrt background image
             times (list of float): times (units assumed to be compatible)
             options (dict): dictionary with objective value, here the injection rate
 
@@ -216,9 +393,9 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
 
         """
 
-        # Fetch the injection rate and geometry
+        # Fetch the injection rate, and cache the signals for integration
         injection_rate = options["injection_rate"]  # in same units as geometry
-        geometry = options["geometry"]
+        engine = self._calibration_engine(input_images, images_diff, options)
         regression_type = options.get("regression_type", "ransac").lower()
         assert regression_type in ["ransac", "linear"]
 
@@ -238,10 +415,7 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
 
             # For each image, compute the total concentration, based on the currently
             # set tuning parameters, and compute the relative time.
-            volumes = [
-                geometry.integrate(self._convert_signal(img, diff))
-                for img, diff in zip(input_images, images_diff)
-            ]
+            volumes = engine.volumes()
 
             # Determine slope in time by linear regression. Allow for different
             # regression types.
@@ -272,8 +446,8 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
 
     def _visualize_model_calibration(
         self,
-        input_images: list[np.ndarray],
-        images_diff: list[np.ndarray],
+        input_images: np.ndarray,
+        images_diff: np.ndarray,
         times: list[float],
         options: dict,
     ) -> None:
@@ -281,21 +455,15 @@ class InjectionRateModelObjectiveMixin(AbstractModelObjective):
         Illustrate result of calibration.
 
         Args:
-            input_images (list of np.ndarray): input for _convert_signal
-            images_diff (list of np.ndarray): plain differences wrt background image
+            input_images (np.ndarray): stack of inputs for _convert_signal
+            images_diff (np.ndarray): stack of plain differences wrt background image
             times (list of float): times (unit assumed to be compatible)
             options (dict): dictionary with objective value, here the injection rate
 
         """
-        # Fetch the injection rate and geometry
-        geometry = options["geometry"]
-
         # For each image, compute the total concentration, based on the currently
         # set tuning parameters, and compute the relative time.
-        volumes = [
-            geometry.integrate(self._convert_signal(img, diff))
-            for img, diff in zip(input_images, images_diff)
-        ]
+        volumes = self._calibration_engine(input_images, images_diff, options).volumes()
 
         ## ! ---- Find intercept through RANSAC analysis
 
@@ -357,8 +525,8 @@ class AbsoluteVolumeModelObjectiveMixin(AbstractModelObjective):
 
     def define_objective_function(
         self,
-        input_images: list[np.ndarray],
-        images_diff: list[np.ndarray],
+        input_images: np.ndarray,
+        images_diff: np.ndarray,
         times: list[float],
         options: dict,
     ):
@@ -366,8 +534,8 @@ class AbsoluteVolumeModelObjectiveMixin(AbstractModelObjective):
         Define objective function such that the root is the min.
 
         Args:
-            input_images (list of np.ndarray): input for _convert_signal
-            images_diff (list of np.ndarray): plain differences wrt background image
+            input_images (np.ndarray): stack of inputs for _convert_signal
+            images_diff (np.ndarray): stack of plain differences wrt background image
             times (list of float): times
             options (dict): dictionary with objective value, here the injection rate
 
@@ -376,8 +544,8 @@ class AbsoluteVolumeModelObjectiveMixin(AbstractModelObjective):
 
         """
 
-        # Fetch the geometry for integration
-        geometry = options.get("geometry")
+        # Cache the signals for integration
+        engine = self._calibration_engine(input_images, images_diff, options)
 
         # Fetch input data
         input_times = np.array(options.get("times"))
@@ -409,10 +577,7 @@ class AbsoluteVolumeModelObjectiveMixin(AbstractModelObjective):
             # For each image, compute the total concentration, based on the currently
             # set tuning parameters, and compute the relative time.
             M3_TO_ML = 1e6
-            volumes = [
-                geometry.integrate(self._convert_signal(img, diff)) * M3_TO_ML
-                for img, diff in zip(input_images, images_diff)
-            ]
+            volumes = engine.volumes() * M3_TO_ML
 
             # Create interpolation
             estimated_data = interpolate.interp1d(times, volumes)
@@ -0,0 +1,357 @@
+"""Joint execution of multiple concentration analyses on the same images.
+
+Concentration analyses of different phases or components (e.g., CO2 and CO2(g)) are
+often applied to the same image and share parts of their pipeline, e.g., the
+baseline image, the option for taking differences, and the signal reduction. Here,
+the pipelines are merged into a tree of stages. Stages with identical configuration
+and identical input are evaluated once per image, and only the differing stages are
+evaluated for each analysis.
+
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Any, Optional
+
+import numpy as np
+
+import darsia
+
+_STAGES = ["diff", "signal", "clean signal", "balanced signal", "smooth signal"]
+"""Shareable stages of the pipeline of a concentration analysis, in order."""
+
+
+class MultiConcentrationAnalysis:
+    """Concentration analyses applied jointly, sharing identical upstream stages.
+
+    The pipeline of each analysis consists of the background subtraction, signal
+    reduction, cleaning, balancing and, if applied before the model, restoration. Two
+    analyses share a stage, if they share all previous stages and the configuration
+    of the stage is equivalent (same type and parameters). The model (and any
+    subsequent restoration) is applied per analysis. Results of shared stages are
+    cached for the last image, such that the analyses can also be applied one after
+    another, e.g., if the mask of one analysis depends on the result of another.
+
+    NOTE: Changes of the analyses through assignment (e.g., update of the baseline
+    image) are detected. Modifications in place (e.g., of the array of the baseline
+    image) are not detected; call update() after such modifications.
+
+    NOTE: Results of shared stages are cached by the identity of the image, and may
+    alias the work buffers of the analyses (if 'reuse buffers' is active). Calling
+    one of the analyses directly overwrites these buffers; call clear() afterwards,
+    or apply the analyses through this object only. Analyses overriding __call__
+    (e.g., with expert-knowledge post-processing) are not decomposed into stages,
+    but are applied directly.
+
+    Example:
+        analyses = darsia.MultiConcentrationAnalysis(
+            {"co2": co2_analysis, "co2(g)": co2_gas_analysis}
+        )
+        co2 = analyses.analyze("co2", img)
+        co2_gas_analysis.update(mask=co2.img)
+        co2_gas = analyses.analyze("co2(g)", img)
+
+    """
+
+    def __init__(self, analyses: dict[str, darsia.ConcentrationAnalysis]) -> None:
+        """Constructor.
+
+        Args:
+            analyses (dict): concentration analyses identified by name.
+
+        """
+        self.analyses = analyses
+        """Concentration analyses."""
+
+        self.update()
+
+    def update(self) -> None:
+        """Detect shared stages of the analyses, and reset the cached results."""
+
+        self.nodes: dict[str, list[Optional[int]]] = {}
+        """Node of each stage for each analysis; None for non-applicable stages."""
+
+        self.representatives: list[str] = []
+        """Name of the analysis evaluating each node."""
+
+        self._keys: dict[str, list[tuple]] = {}
+        """Configuration of the stages of each analysis at the time of the update."""
+
+        # Build the tree of stages, stage by stage
+        parents: dict[str, Optional[int]] = {name: None for name in self.analyses}
+        node_parents: list[Optional[int]] = []
+        for stage in _STAGES:
+            stage_nodes: list[int] = []
+            for name, analysis in self.analyses.items():
+                key = _stage_key(analysis, stage)
+                self._keys.setdefault(name, []).append(key)
+                node = None
+                if key is not None and (stage == "diff" or parents[name] is not None):
+                    # Share node with equivalent configuration and same input
+                    node = next(
+                        (
+                            other
+                            for other in stage_nodes
+                            if node_parents[other] == parents[name]
+                            and _equivalent(
+                                key, self._keys[self.representatives[other]][-1]
+                            )
+                        ),
+                        None,
+                    )
+                    if node is None:
+                        node = len(self.representatives)
+                        self.representatives.append(name)
+                        node_parents.append(parents[name])
+                        stage_nodes.append(node)
+                self.nodes.setdefault(name, []).append(node)
+                parents[name] = node
+
+        self.clear()
+
+    def clear(self) -> None:
+        """Reset the cached results of shared stages."""
+
+        self._img: Optional[darsia.Image] = None
+        """Image, for which results are cached."""
+
+        self._results: dict[int, np.ndarray] = {}
+        """Cached results of the nodes."""
+
+    @property
+    def num_shared_stages(self) -> int:
+        """Number of stage evaluations saved per image by sharing."""
+        num_stages = sum(
+            len([node for node in nodes if node is not None])
+            for nodes in self.nodes.values()
+        )
+        return num_stages - len(self.representatives)
+
+    # ! ---- Main methods
+
+    def __call__(
+        self, img: darsia.Image, names: Optional[list[str]] = None
+    ) -> dict[str, darsia.Image]:
+        """Apply all (or selected) analyses to an image.
+
+        Args:
+            img (darsia.Image): probing image.
+            names (list of str, optional): names of the analyses; all if None.
+
+        Returns:
+            dict: concentration for each analysis.
+
+        """
+        if names is None:
+            names = list(self.analyses.keys())
+        results = {name: self.analyze(name, img) for name in names}
+        self.clear()
+        return results
+
+    def analyze(self, name: str, img: darsia.Image) -> darsia.Image:
+        """Apply single analysis to an image, reusing cached results of shared stages.
+
+        Args:
+            name (str): name of the analysis.
+            img (darsia.Image): probing image; cached results are reused as long as
+                the same image object is provided.
+
+        Returns:
+            darsia.Image: concentration.
+
+        """
+        # Space-time images are vectorized within each analysis instead. Analyses
+        # with custom __call__ are applied as a whole. Both may overwrite buffers
+        # aliased by cached results.
+        analysis = self.analyses[name]
+        if (
+            img.series
+            or type(analysis).__call__ is not darsia.ConcentrationAnalysis.__call__
+        ):
+            self.clear()
+            return analysis(img)
+
+        if not self._is_up_to_date():
+            self.update()
+        if img is not self._img:
+            self.clear()
+            self._img = img
+
+        # Evaluate missing upstream stages
+        parent = None
+        for stage, node in zip(_STAGES, self.nodes[name]):
+            if node is None:
+                break
+            if node not in self._results:
+                representative = self.analyses[self.representatives[node]]
+                self._results[node] = _evaluate_stage(
+                    representative, stage, img, parent
+                )
+            parent = self._results[node]
+
+        # Fan out to the stages specific to the analysis
+        diff = self._results[self.nodes[name][0]]
+        if analysis.first_restoration_then_model:
+            smooth_signal = self._results[self.nodes[name][4]]
+            concentration = analysis._convert_signal(smooth_signal, diff)
+        else:
+            balanced_signal = self._results[self.nodes[name][3]]
+            concentration = analysis._restore_signal(
+                analysis._convert_signal(balanced_signal, diff)
+            )
+
+        # Decouple the result from cached results and work arrays, e.g., for models
+        # returning their input
+        buffers = list(self._results.values()) + [
+            buffer
+            for other in self.analyses.values()
+            for buffer in other._buffers.values()
+        ]
+        return analysis._finalize(concentration, img, buffers)
+
+    # ! ---- Auxiliary methods
+
+    def _is_up_to_date(self) -> bool:
+        """Check whether the configuration of all stages is unchanged.
+
+        Returns:
+            bool: True if no configuration has been reassigned since the last update.
+
+        """
+        for name, analysis in self.analyses.items():
+            if name not in self._keys:
+                return False
+            for stage, key in zip(_STAGES, self._keys[name]):
+                current_key = _stage_key(analysis, stage)
+                if (key is None) != (current_key is None):
+                    return False
+                if key is not None and not all(
+                    a is b for a, b in zip(key, current_key)
+                ):
+                    return False
+        return True
+
+
+def _stage_key(analysis: darsia.ConcentrationAnalysis, stage: str) -> Optional[tuple]:
+    """Configuration determining the result of a stage, given the previous stages.
+
+    The methods evaluating the stage are included, to distinguish subclasses.
+
+    Args:
+        analysis (ConcentrationAnalysis): concentration analysis.
+        stage (str): name of the stage.
+
+    Returns:
+        tuple, optional: configuration of the stage; None if not applicable.
+
+    """
+    cls = type(analysis)
+    if stage == "diff":
+        return (
+            cls._prepare_image,
+            cls._subtract_background,
+            cls._inspect_diff,
+            analysis.base,
+            analysis._diff_option,
+            analysis.reuse_buffers,
+            analysis.buffer_dtype,
+        )
+    elif stage == "signal":
+        return (
+            cls._reduce_signal,
+            cls._inspect_scalar_signal,
+            analysis.signal_reduction,
+        )
+    elif stage == "clean signal":
+        return (
+            cls._clean_signal,
+            cls._inspect_clean_signal,
+            analysis.threshold_cleaning_filter,
+        )
+    elif stage == "balanced signal":
+        return (cls._balance_signal, analysis.balancing)
+    elif stage == "smooth signal" and analysis.first_restoration_then_model:
+        return (cls._restore_signal, analysis.restoration)
+    return None
+
+
+def _evaluate_stage(
+    analysis: darsia.ConcentrationAnalysis,
+    stage: str,
+    img: darsia.Image,
+    parent: Optional[np.ndarray],
+) -> np.ndarray:
+    """Evaluate single stage of the pipeline of a concentration analysis.
+
+    Args:
+        analysis (ConcentrationAnalysis): concentration analysis.
+        stage (str): name of the stage.
+        img (darsia.Image): probing image.
+        parent (array, optional): result of the previous stage.
+
+    Returns:
+        array: result of the stage.
+
+    """
+    if stage == "diff":
+        probe_img = analysis._prepare_image(img)
+        diff = analysis._subtract_background(
+            probe_img, out=analysis._buffer("diff", img.shape)
+        )
+        analysis._inspect_diff(diff)
+        return diff
+    elif stage == "signal":
+        signal = analysis._reduce_signal(parent)
+        analysis._inspect_scalar_signal(signal)
+        return signal
+    elif stage == "clean signal":
+        clean_signal = analysis._clean_signal(
+            parent, out=analysis._buffer("clean signal", parent.shape)
+        )
+        analysis._inspect_clean_signal(clean_signal)
+        return clean_signal
+    elif stage == "balanced signal":
+        return analysis._balance_signal(parent)
+    else:
+        return analysis._restore_signal(parent)
+
+
+def _equivalent(a: Any, b: Any, depth: int = 0) -> bool:
+    """Check whether two configurations are equivalent.
+
+    Arrays and images are compared by value, containers and objects recursively by
+    their entries and attributes.
+
+    Args:
+        a, b: configurations.
+        depth (int): recursion depth; objects nested deeper are compared by identity.
+
+    Returns:
+        bool: True if the configurations are equivalent.
+
+    """
+    if a is b:
+        return True
+    if type(a) is not type(b) or depth > 8:
+        return False
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and np.array_equal(a, b)
+    if isinstance(a, darsia.Image):
+        return _equivalent(a.img, b.img, depth + 1)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(
+            _equivalent(x, y, depth + 1) for x, y in zip(a, b)
+        )
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(
+            _equivalent(a[key], b[key], depth + 1) for key in a
+        )
+    if inspect.isroutine(a) or isinstance(a, type):
+        return False
+    if hasattr(a, "__dict__"):
+        return _equivalent(vars(a), vars(b), depth + 1)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
@@ -4,7 +4,9 @@
 
 from __future__ import annotations
 
-from typing import Union
+import copy
+from typing import Optional, Union
+from warnings import warn
 
 import numpy as np
 import skimage
@@ -17,7 +19,8 @@ def _H1_regularization_array(
     mu: float,
     omega: float = 1.0,
     dim: int = 2,
-    solver: da.Solver = da.Jacobi(),
+    solver: Optional[da.Solver] = None,
+    x0: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     H1 regularization of numpy arrays.
@@ -32,7 +35,8 @@ def _H1_regularization_array(
         omega (float): weighting of the image term (Should account for denoising
             effects).
         dim (int): dimension of the image. Default is 2.
-        solver (da.Solver): solver to use. Default is da.Jacobi().
+        solver (da.Solver, optional): solver to use. Default is a new da.Jacobi().
+        x0 (np.ndarray, optional): initial guess. Default is the image.
 
     Returns:
         np.ndarray: regularized image
@@ -42,8 +46,11 @@ def _H1_regularization_array(
     # Keep track of input type and convert input image to float for further calculations
     img_dtype = img.dtype
     img_float = skimage.img_as_float(img)
+    x0_float = img_float if x0 is None else skimage.img_as_float(x0)
 
     # Setup the solver (L2-diffusion equation)
+    if solver is None:
+        solver = da.Jacobi()
     solver.update_params(
         mass_coeff=omega,
         diffusion_coeff=mu,
@@ -57,28 +64,129 @@ def _H1_regularization_array(
         img_reordered = np.moveaxis(
             img_float, np.arange(dim).tolist(), np.arange(-dim, 0).tolist()
         )
+        x0_reordered = np.moveaxis(
+            x0_float, np.arange(dim).tolist(), np.arange(-dim, 0).tolist()
+        )
         out_img_reordered = np.zeros_like(img_reordered)
         for idx in np.ndindex(img_reordered.shape[:-dim]):
             out_img_reordered[idx] = solver(
-                x0=img_reordered[idx], rhs=omega * img_reordered[idx]
+                x0=x0_reordered[idx], rhs=omega * img_reordered[idx]
             )
         out_img = np.moveaxis(
             out_img_reordered, np.arange(-dim, 0).tolist(), np.arange(dim).tolist()
         )
 
     else:
-        out_img = solver(x0=img, rhs=omega * img)
+        out_img = solver(x0=x0_float, rhs=omega * img_float)
 
     # Convert output image to the same type as the input image
     return da.convert_dtype(out_img, img_dtype)
 
 
+def _H1_regularization_tiled(
+    img: np.ndarray,
+    mu: Union[float, np.ndarray],
+    omega: Union[float, np.ndarray],
+    dim: int,
+    solver: Optional[da.Solver],
+    tile_shape: Union[int, tuple[int, ...]],
+    overlap: int,
+    num_workers: int,
+) -> np.ndarray:
+    """Tiled H1 regularization of numpy arrays, see da.TiledRestoration.
+
+    The tiles are regularized in floating point arithmetic, and the blended result
+    is converted to the type of the input image. Jacobi iterations are split into
+    rounds of at most 'overlap' iterations, between which the halos are exchanged.
+
+    Args:
+        img (np.ndarray): image to regularize
+        mu (float or array): regularization parameter
+        omega (float or array): weighting of the image term
+        dim (int): dimension of the image
+        solver (da.Solver, optional): solver to use; copied for each tile
+        tile_shape (int or tuple of int): shape of the tiles
+        overlap (int): width of halos and blending bands of the tiles
+        num_workers (int): number of threads regularizing tiles in parallel
+
+    Returns:
+        np.ndarray: regularized image
+
+    """
+    if solver is None:
+        solver = da.Jacobi()
+
+    def _regularize_tile(tile: np.ndarray, mu, omega) -> np.ndarray:
+        return _H1_regularization_array(
+            img=skimage.img_as_float(tile),
+            mu=mu,
+            omega=omega,
+            dim=dim,
+            solver=copy.copy(solver),
+        )
+
+    tiled_regularization = da.TiledRestoration(
+        _regularize_tile,
+        tile_shape=tile_shape,
+        overlap=overlap,
+        num_workers=num_workers,
+    )
+
+    if isinstance(solver, da.Jacobi):
+        # Each Jacobi iteration propagates information by one pixel. Split the
+        # iterations into equal rounds covered by the overlap.
+        iterations = max(
+            i
+            for i in range(1, min(max(overlap, 1), solver.maxiter) + 1)
+            if solver.maxiter % i == 0
+        )
+        round_solver = copy.copy(solver)
+        round_solver.maxiter = iterations
+
+        def _step(state: dict[str, np.ndarray], img, mu, omega) -> dict:
+            return {
+                "x": _H1_regularization_array(
+                    img=skimage.img_as_float(img),
+                    mu=mu,
+                    omega=omega,
+                    dim=dim,
+                    solver=copy.copy(round_solver),
+                    x0=state["x"],
+                )
+            }
+
+        state = tiled_regularization.iterate(
+            _step,
+            {"x": img},
+            num_rounds=solver.maxiter // iterations,
+            img=img,
+            mu=mu,
+            omega=omega,
+        )
+        out_img = state["x"]
+    else:
+        # The error at the interfaces decays with the length scale sqrt(mu / omega)
+        with np.errstate(divide="ignore"):
+            length_scale = np.sqrt(np.max(mu) / np.min(omega))
+        if overlap < 6 * length_scale:
+            warn(
+                f"Overlap {overlap} of the tiles is small compared to the length "
+                f"scale {length_scale:.1f} of the H1 regularization; the result may "
+                "differ from the regularization of the full image at the interfaces."
+            )
+        out_img = tiled_regularization(img, mu=mu, omega=omega)
+    return da.convert_dtype(out_img, img.dtype)
+
+
 def _H1_regularization_image(
     img: da.Image,
     mu: float,
     omega: float = 1.0,
     dim: int = 2,
-    solver: da.Solver = da.Jacobi(),
+    solver: Optional[da.Solver] = None,
+    tile_shape: Optional[Union[int, tuple[int, ...]]] = None,
+    overlap: int = 16,
+    num_workers: int = 1,
 ) -> da.Image:
     """H1 regularization of darsia.Image.
 
@@ -88,20 +196,35 @@ def _H1_regularization_image(
         omega (float): weighting of the image term (Should account for denoising
             effects).
         dim (int): dimension of the image. Default is 2.
-        solver (da.Solver): solver to use. Default is da.Jacobi().
+        solver (da.Solver, optional): solver to use. Default is a new da.Jacobi().
+        tile_shape (int or tuple of int, optional): shape of tiles; no tiling if None.
+        overlap (int): width of halos and blending bands of the tiles.
+        num_workers (int): number of threads regularizing tiles in parallel.
 
     Returns:
         darsia.Image: regularized image
 
     """
     regularized_img = img.copy()
-    regularized_img.img = _H1_regularization_array(
-        img=img.img,
-        mu=mu,
-        omega=omega,
-        dim=dim,
-        solver=solver,
-    )
+    if tile_shape is None:
+        regularized_img.img = _H1_regularization_array(
+            img=img.img,
+            mu=mu,
+            omega=omega,
+            dim=dim,
+            solver=solver,
+        )
+    else:
+        regularized_img.img = _H1_regularization_tiled(
+            img=img.img,
+            mu=mu,
+            omega=omega,
+            dim=dim,
+            solver=solver,
+            tile_shape=tile_shape,
+            overlap=overlap,
+            num_workers=num_workers,
+        )
     return regularized_img
 
 
@@ -110,23 +233,39 @@ def H1_regularization(
     mu: float,
     omega: float = 1.0,
     dim: int = 2,
-    solver: da.Solver = da.Jacobi(),
+    solver: Optional[da.Solver] = None,
+    tile_shape: Optional[Union[int, tuple[int, ...]]] = None,
+    overlap: int = 16,
+    num_workers: int = 1,
 ) -> Union[np.ndarray, da.Image]:
     """Inline application of H1 regularization.
 
+    NOTE: When tiling with a Jacobi solver, the iterations are performed in rounds
+    of at most 'overlap' iterations, exchanging the halos of the tiles in between.
+    The tiled result then agrees with the regularization of the full image up to
+    round-off. Other solvers (e.g., darsia.GeometricMG) are applied to the extended
+    tiles as a whole; the error decays exponentially in overlap / sqrt(mu / omega),
+    and is about 1e-4 (relative to the image range) for an overlap of
+    6 * sqrt(mu / omega) pixels.
+
     Args:
         img (np.ndarray or Image): image
         mu (float): regularization parameter
         omega (float): weighting of the image term (Should account for denoising
             effects).
         dim (int): dimension of the image. Default is 2.
-        solver (da.Solver): solver to use. Default is da.Jacobi().
+        solver (da.Solver, optional): solver to use. Default is a new da.Jacobi().
+        tile_shape (int or tuple of int, optional): shape of tiles, for regularizing
+            large images tile by tile; no tiling if None.
+        overlap (int): width of halos and blending bands of the tiles; see the note
+            above on choosing it.
+        num_workers (int): number of threads regularizing tiles in parallel.
 
     Returns:
         np.ndarray or Image: regularized image (same type as input)
 
     """
-    if isinstance(img, np.ndarray):
+    if isinstance(img, np.ndarray) and tile_shape is None:
         return _H1_regularization_array(
             img=img,
             mu=mu,
@@ -134,6 +273,17 @@ def H1_regularization(
             dim=dim,
             solver=solver,
         )
+    elif isinstance(img, np.ndarray):
+        return _H1_regularization_tiled(
+            img=img,
+            mu=mu,
+            omega=omega,
+            dim=dim,
+            solver=solver,
+            tile_shape=tile_shape,
+            overlap=overlap,
+            num_workers=num_workers,
+        )
     elif isinstance(img, da.Image):
         return _H1_regularization_image(
             img=img,
@@ -141,6 +291,9 @@ def H1_regularization(
             omega=omega,
             dim=dim,
             solver=solver,
+            tile_shape=tile_shape,
+            overlap=overlap,
+            num_workers=num_workers,
         )
     else:
         raise TypeError(f"Type {type(img)} not supported.")
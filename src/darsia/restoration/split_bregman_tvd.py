@@ -1,15 +1,112 @@
-"""TV denoising for numpy arrays allowing for heterogeneous weights."""
+"""TV denoising for numpy arrays allowing for heterogeneous weights.
+
+The shrinkage steps of the split Bregman iteration are evaluated by compiled (numba)
+kernels defined on module level, such that they are compiled (or loaded from cache)
+once per process and data type. The kernels operate on flat views of the split
+Bregman variables (cells x components), and thus apply to images of any dimension.
+
+"""
 
 from __future__ import annotations
 
 from typing import Optional, Union
 
+import numba
 import numpy as np
 import skimage
-from numba import njit
 
 import darsia as da
 
+# ! ---- Compiled kernels
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _isotropic_shrinkage(d: np.ndarray, b: np.ndarray, quot: np.ndarray) -> None:
+    """Isotropic shrinkage of flat split Bregman variables, in place.
+
+    Equivalent to (with dub = b + grad stored in b on input):
+
+        s = np.linalg.norm(dub, 2, axis=-1)
+        shrinkage_factor = np.maximum(s - quot, 0) / (s + 1e-18)
+        d = dub * shrinkage_factor[..., None]
+        b = dub - d
+
+    Args:
+        d (array): split variable (num_cells x dim), overwritten
+        b (array): Bregman variable plus gradient (num_cells x dim), overwritten
+        quot (array): threshold, either for each cell or a single value
+
+    """
+    scalar = quot.shape[0] == 1
+    for i in numba.prange(b.shape[0]):
+        s = 0.0
+        for k in range(b.shape[1]):
+            s += b[i, k] ** 2
+        s = s**0.5
+        threshold = quot[0] if scalar else quot[i]
+        shrinkage = max(s - threshold, 0.0) / (s + 1e-18)
+        for k in range(b.shape[1]):
+            d[i, k] = b[i, k] * shrinkage
+            b[i, k] = b[i, k] - d[i, k]
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _anisotropic_shrinkage(d: np.ndarray, b: np.ndarray, quot: np.ndarray) -> None:
+    """Anisotropic (component-wise) shrinkage of flat split Bregman variables.
+
+    Equivalent to (with dub = b + grad stored in b on input):
+
+        d = np.maximum(np.abs(dub) - quot, 0) * np.sign(dub)
+        b = dub - d
+
+    Args:
+        d (array): split variable (num_cells x dim), overwritten
+        b (array): Bregman variable plus gradient (num_cells x dim), overwritten
+        quot (array): threshold, either for each cell or a single value
+
+    """
+    scalar = quot.shape[0] == 1
+    for i in numba.prange(b.shape[0]):
+        threshold = quot[0] if scalar else quot[i]
+        for k in range(b.shape[1]):
+            value = b[i, k]
+            if value > threshold:
+                d[i, k] = value - threshold
+            elif value < -threshold:
+                d[i, k] = value + threshold
+            else:
+                d[i, k] = 0.0
+            b[i, k] = value - d[i, k]
+
+
+def _flat_threshold(
+    mu: Union[float, np.ndarray],
+    ell: Union[float, np.ndarray],
+    shape: tuple[int, ...],
+    dtype: np.dtype,
+) -> np.ndarray:
+    """Threshold mu / ell of the shrinkage, flat for each cell or a single value."""
+    quot = np.asarray(np.divide(mu, ell))
+    if quot.size == 1:
+        return quot.astype(dtype).reshape(1)
+    return np.ascontiguousarray(np.broadcast_to(quot, shape), dtype=dtype).ravel()
+
+
+def _add_backward_diff(
+    img: np.ndarray, axis: int, out: np.ndarray, buffer: np.ndarray
+) -> None:
+    """Add backward difference of img along axis to out, without temporary arrays.
+
+    Equivalent to out += da.backward_diff(img, axis), using buffer (same shape as img)
+    as work array.
+
+    """
+    lower = da.array_slice(img, axis, 0, -1, 1)
+    upper = da.array_slice(img, axis, 1, None, 1)
+    np.subtract(upper, lower, out=da.array_slice(buffer, axis, 0, -1, 1))
+    da.array_slice(buffer, axis, -1, None, 1)[...] = 0
+    out += buffer
+
 
 def split_bregman_tvd(
     img: np.ndarray,
@@ -22,9 +119,10 @@ def split_bregman_tvd(
     x0: Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
     isotropic: bool = False,
     verbose: Union[bool, int] = False,
-    solver: da.Solver = da.Jacobi(),
+    solver: Optional[da.Solver] = None,
     adaptive=None,
-) -> np.ndarray:
+    return_state: bool = False,
+) -> Union[np.ndarray, tuple[np.ndarray, np.ndarray, np.ndarray]]:
     """Split Bregman algorithm for TV denoising.
 
     The Bregman iteration introduces a regularization term to the TV denoising allowing
@@ -44,11 +142,15 @@ def split_bregman_tvd(
             variables
         isotropic (bool): whether to use isotropic TV denoising
         verbose (bool, int): verbosity (frequency if int)
-        solver (da.Solver): solver to use for the inner linear system
+        solver (da.Solver, optional): solver to use for the inner linear system;
+            a new Jacobi solver if None
         adaptive (lambda, Optional): adaptivity schedule
+        return_state (bool): flag controlling whether the split Bregman variables
+            are returned as well; can be used as x0 to continue the iteration
 
     Returns:
-        array: denoised image
+        array: denoised image; if return_state, in floating point arithmetic and
+            together with the split Bregman variables
 
     """
     # Keep track of input type and convert input image to float for further calculations
@@ -61,6 +163,8 @@ def split_bregman_tvd(
     # for the diffusion coefficient if no value is provided.
     if ell is None:
         ell = 2 * mu
+    if solver is None:
+        solver = da.Jacobi()
     solver.update_params(
         mass_coeff=omega,
         diffusion_coeff=ell,
@@ -76,10 +180,6 @@ def split_bregman_tvd(
             ]
         )
 
-    # Define shrinkage operator (shrinks element-wise by k)
-    def _shrink(x: np.ndarray, k: Union[float, np.ndarray]) -> np.ndarray:
-        return np.maximum(np.abs(x) - k, 0) * np.sign(x)
-
     # Define right hand side function
     def _rhs_function(dt: np.ndarray, bt: np.ndarray, ellt) -> np.ndarray:
         result = np.multiply(omega, img)
@@ -89,42 +189,30 @@ def split_bregman_tvd(
         return result
 
     # Define initial guess if provided, otherwise start with input image and allovate
-    # zero arrays for the split Bregman variables.
+    # zero arrays for the split Bregman variables. The split Bregman variables are
+    # updated in place and thus copied into contiguous arrays, leaving x0 unchanged.
     if x0 is not None:
         img0, d0, b0 = x0
         img_iter = skimage.img_as_float(img0)
-        d = d0
-        b = b0
+        d = np.array(d0, order="C", copy=True)
+        b = np.array(b0, order="C", copy=True)
     else:
         img_iter = skimage.img_as_float(img.copy())
         d = np.zeros((*img.shape, dim), dtype=img.dtype)
         b = np.zeros((*img.shape, dim), dtype=img.dtype)
 
+    # Flat views (cells x components) of the split Bregman variables, shrinkage
+    # threshold, and work arrays
+    flat_d = d.reshape(-1, dim)
+    flat_b = b.reshape(-1, dim)
+    quot = _flat_threshold(mu, ell, img.shape, b.dtype)
+    diff_buffer = np.empty(img.shape, dtype=float)
+    grad = None
+    shrinkage = _isotropic_shrinkage if isotropic else _anisotropic_shrinkage
+
     if verbose if isinstance(verbose, bool) else verbose > 0:
         print(f"The energy functional starts at {_functional(img)}")
 
-    # Numba version of performing shrinkage
-    @njit("void(f8[:,:,:],f8[:,:,:], f8[:,:,:], f8)", fastmath=True)
-    def numba_shrinkage(input_dub, output_d, output_b, quot):
-        """Numba implementation (6 x faster) for:
-
-        s = np.linalg.norm(dub, 2, axis=-1)
-        shrinkage_factor = np.maximum(s - mu / ell, 0) / (s + 1e-18)
-        d = dub * shrinkage_factor[..., None]
-        b = dub - d
-
-        """
-        for i in range(input_dub.shape[0]):
-            for j in range(input_dub.shape[1]):
-                s = 0
-                for k in range(input_dub.shape[2]):
-                    s += input_dub[i, j, k] ** 2
-                s = s**0.5
-                shrinkage = max(s - quot, 0) / (s + 1e-18)
-                for k in range(input_dub.shape[2]):
-                    output_d[i, j, k] = input_dub[i, j, k] * shrinkage
-                    output_b[i, j, k] = input_dub[i, j, k] * (1 - shrinkage)
-
     # Bregman iterations
     for iter in range(max_num_iter):
 
@@ -132,25 +220,20 @@ def split_bregman_tvd(
         # TODO: Moderate bottleneck - takes ca. 75% CPU time per iteration
         img_new = solver(x0=img_iter, rhs=_rhs_function(d, b, ell))
 
-        # Second step - shrinkage.
-        if isotropic:
-            dub = b.copy()
-            for j in range(dim):
-                dub[..., j] += da.backward_diff(img=img_new, axis=j, dim=dim)
-            numba_shrinkage(dub, d, b, mu / ell)
-
-        else:
-            for j in range(dim):
-                dub = da.backward_diff(img=img_new, axis=j, dim=dim) + b[..., j]
-                d[..., j] = _shrink(dub, mu / ell)
-                b[..., j] = dub - d[..., j]
+        # Second step - shrinkage, with b + grad(img_new) assembled in b.
+        for j in range(dim):
+            _add_backward_diff(img_new, j, b[..., j], diff_buffer)
+        shrinkage(flat_d, flat_b, quot)
 
         # Update ell
         if adaptive is not None and adaptive(iter):
-            grad = np.zeros((*img.shape, dim), dtype=img.dtype)
+            if grad is None:
+                grad = np.empty((*img.shape, dim), dtype=float)
+            grad.fill(0)
             for j in range(dim):
-                grad[..., j] = da.backward_diff(img=img_new, axis=j, dim=dim)
+                _add_backward_diff(img_new, j, grad[..., j], diff_buffer)
             ell = 1.0 / np.maximum(np.linalg.norm(grad, ord=1, axis=-1), 1e-12)
+            quot = _flat_threshold(mu, ell, img.shape, b.dtype)
             solver.update_params(
                 mass_coeff=omega,
                 diffusion_coeff=ell,
@@ -174,4 +257,6 @@ def split_bregman_tvd(
             if relative_increment < eps:
                 break
 
+    if return_state:
+        return img_iter, d, b
     return da.convert_dtype(img_iter, img_dtype)
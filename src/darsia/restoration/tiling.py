@@ -0,0 +1,427 @@
+"""Tiled application of restoration methods to large images.
+
+Variational restoration methods (TVD, H1 regularization) require several auxiliary
+arrays of the size of the image. For stitched high-resolution images, these may not
+fit into memory. Here, the image is instead split into tiles along the leading
+(spatial) axes. Each tile is restored together with a halo of neighboring pixels,
+and the restored tiles are blended into the output using a partition of unity.
+Iterative methods can instead be advanced tile-synchronously, exchanging the halos
+of their state between rounds of iterations. Only a bounded number of tiles is held
+in memory at once, such that the memory footprint of the auxiliaries is independent
+of the image size. Input and output arrays (and the exchanged state) may be
+memory-mapped, in which case the image itself does not need to fit into memory
+either.
+
+"""
+
+from __future__ import annotations
+
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import product
+from multiprocessing import get_context
+from typing import Any, Callable, ContextManager, Iterator, Optional, Union
+
+import numpy as np
+
+
+class TiledRestoration:
+    """Restoration applied tile by tile, with halos and smooth blending.
+
+    Each tile consists of a core region, extended by a halo of 'overlap' pixels on
+    each side (truncated at the boundary of the image). The restoration is applied
+    to the extended tile, which in particular mimics the neighborhood of the core
+    region. Across each interface between two cores, the results of the two tiles
+    are blended linearly over a band of 'overlap' pixels centered at the interface.
+    The blending weights sum up to one, such that constant images are preserved.
+
+    When applied as a whole (__call__), halos are read once from the input. The
+    result agrees with the restoration of the full image only if the domain of
+    dependence of the restoration is covered by half the overlap. Iterative methods
+    should instead be advanced by iterate(), which exchanges the halos of the state
+    (e.g., the iterate and auxiliary variables) between rounds. The result then
+    agrees with the full image if the domain of dependence of a single round is
+    covered by the overlap, independent of the number of rounds.
+
+    NOTE: With a thread pool, the restoration is called concurrently and has to be
+    thread-safe. In particular, stateful objects like linear solvers should not be
+    shared among calls.
+
+    Example:
+        tiled = darsia.TiledRestoration(
+            functools.partial(darsia.split_bregman_tvd, max_num_iter=50),
+            tile_shape=(1024, 1024),
+            overlap=32,
+            num_workers=4,
+        )
+        denoised = tiled(array, mu=heterogeneous_weight, omega=1.0)
+
+    """
+
+    def __init__(
+        self,
+        restoration: Callable[..., np.ndarray],
+        tile_shape: Union[int, tuple[int, ...]],
+        overlap: int = 16,
+        num_workers: int = 1,
+        executor: str = "thread",
+        prefetch: Optional[int] = None,
+        workspace: Optional[str] = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            restoration (callable): restoration of arrays, returning an array of the
+                same shape; additional fields are passed as keyword arguments.
+            tile_shape (int or tuple of int): shape of the core of the tiles; the
+                number of entries determines the number of tiled (leading) axes. An
+                integer refers to two tiled axes.
+            overlap (int): width of the halo in pixels, also used as width of the
+                blending band.
+            num_workers (int): number of workers; serial restoration if 1.
+            executor (str): type of the pool, either "thread" or "process".
+            prefetch (int, optional): number of tiles processed ahead of the
+                assembly; defaults to twice the number of workers.
+            workspace (str, optional): folder for memory-mapping the state exchanged
+                by iterate(); kept in memory if None.
+
+        Raises:
+            ValueError: if executor type is not supported, or the overlap is negative.
+
+        """
+        if executor not in ["thread", "process"]:
+            raise ValueError(f"Executor type {executor} not supported.")
+        if overlap < 0:
+            raise ValueError("Overlap has to be non-negative.")
+
+        self.restoration = restoration
+        """Restoration applied to each tile."""
+
+        self.tile_shape: tuple[int, ...] = (
+            (tile_shape, tile_shape)
+            if isinstance(tile_shape, int)
+            else tuple(tile_shape)
+        )
+        """Shape of the cores of the tiles."""
+
+        self.overlap = overlap
+        """Width of halos and blending bands."""
+
+        self.num_workers = num_workers
+        """Number of workers."""
+
+        self.executor = executor
+        """Type of the pool of workers."""
+
+        self.prefetch = max(prefetch or 2 * num_workers, 1)
+        """Maximal number of tiles in process."""
+
+        self.workspace = workspace
+        """Folder for memory-mapped state."""
+
+    @property
+    def dim(self) -> int:
+        """Number of tiled axes."""
+        return len(self.tile_shape)
+
+    def tiles(self, shape: tuple[int, ...]) -> Iterator[tuple[slice, ...]]:
+        """Cores of all tiles for given image shape.
+
+        Args:
+            shape (tuple of int): shape of the image.
+
+        Yields:
+            tuple of slices: core of a tile in the tiled axes.
+
+        """
+        ranges = [
+            [slice(start, min(start + size, n)) for start in range(0, n, max(size, 1))]
+            for n, size in zip(shape[: self.dim], self.tile_shape)
+        ]
+        yield from product(*ranges)
+
+    def window(
+        self, core: tuple[slice, ...], shape: tuple[int, ...]
+    ) -> tuple[slice, ...]:
+        """Core of a tile extended by the halo.
+
+        Args:
+            core (tuple of slices): core of the tile.
+            shape (tuple of int): shape of the image.
+
+        Returns:
+            tuple of slices: extended tile in the tiled axes.
+
+        """
+        return tuple(
+            slice(max(s.start - self.overlap, 0), min(s.stop + self.overlap, n))
+            for s, n in zip(core, shape)
+        )
+
+    def weight(
+        self, core: tuple[slice, ...], window: tuple[slice, ...], shape: tuple[int, ...]
+    ) -> np.ndarray:
+        """Blending weight of a tile, defined on the extended tile.
+
+        In each axis, the weight is the difference of two ramps centered at the lower
+        and upper interfaces of the core. The weights of all tiles thus telescope to
+        one, and the tensor product carries this over to multiple axes.
+
+        Args:
+            core (tuple of slices): core of the tile.
+            window (tuple of slices): extended tile.
+            shape (tuple of int): shape of the image.
+
+        Returns:
+            array: weight with the shape of the extended tile in the tiled axes.
+
+        """
+        weight = np.ones((), dtype=float)
+        for s, w, n in zip(core, window, shape):
+            positions = np.arange(w.start, w.stop)
+            profile = np.ones(len(positions), dtype=float)
+            if s.start > 0:
+                profile = _ramp(positions, s.start, self.overlap)
+            if s.stop < n:
+                profile -= _ramp(positions, s.stop, self.overlap)
+            weight = np.multiply.outer(weight, profile)
+        return weight
+
+    def __call__(
+        self,
+        img: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        **fields,
+    ) -> np.ndarray:
+        """Tiled application of the restoration.
+
+        Args:
+            img (array): image, possibly memory-mapped; tiles are only read on demand.
+            out (array, optional): output array with the shape of the image, possibly
+                memory-mapped; allocated with a floating point data type of the
+                restored tiles if not provided.
+            **fields: additional arguments of the restoration; arrays with the shape
+                of the image in the tiled axes (e.g., heterogeneous weights) are
+                restricted to the extended tiles.
+
+        Returns:
+            array: restored image
+
+        """
+        shape = img.shape[: self.dim]
+
+        def _tasks() -> Iterator[tuple]:
+            for core in self.tiles(shape):
+                window = self.window(core, shape)
+                tile_fields = {
+                    key: _restrict(value, window, shape)
+                    for key, value in fields.items()
+                }
+                yield core, window, (np.array(img[window]),), tile_fields
+
+        if out is not None:
+            out[...] = 0
+
+        with self._pool() as pool:
+            for core, window, restored_tile in self._map(
+                pool, self.restoration, _tasks()
+            ):
+                if out is None:
+                    dtype = np.result_type(restored_tile.dtype, np.float32)
+                    out = np.zeros(img.shape, dtype=dtype)
+                weight = self.weight(core, window, shape)
+                weight = weight.reshape(
+                    weight.shape + (1,) * (restored_tile.ndim - self.dim)
+                )
+                out[window] += weight * restored_tile
+
+        return out
+
+    def iterate(
+        self,
+        step: Callable[..., dict[str, np.ndarray]],
+        state: dict[str, np.ndarray],
+        num_rounds: int,
+        eps: Optional[float] = None,
+        increment: Optional[str] = None,
+        **fields,
+    ) -> dict[str, np.ndarray]:
+        """Tile-synchronous iteration, exchanging halos of the state between rounds.
+
+        In each round, all tiles read the state on their extended tiles, advance it
+        by a step, and write the cores of the result into the next state. Since the
+        cores partition the image, no blending is required. Reading and writing use
+        separate arrays, such that all tiles of a round start from the same state.
+        The core of a tile is exact, if the domain of dependence of a step is
+        covered by the overlap.
+
+        Args:
+            step (callable): advancement of the state of a tile, mapping a dict of
+                arrays (and the fields as keyword arguments) to a dict of arrays of
+                the same shape.
+            state (dict of arrays): initial state, with the shape of the image in
+                the tiled axes; only read (e.g., broadcast zeros are allowed).
+            num_rounds (int): maximal number of rounds.
+            eps (float, optional): tolerance for the increment of the state in a
+                round, relative to the norm of the initial state; all rounds are
+                performed if None.
+            increment (str, optional): key of the state monitored for convergence.
+            **fields: additional arguments of the step; arrays with the shape of the
+                image in the tiled axes are restricted to the extended tiles.
+
+        Returns:
+            dict of arrays: final state, possibly memory-mapped.
+
+        """
+        shape = next(iter(state.values())).shape[: self.dim]
+        check = eps is not None and increment is not None
+        if check:
+            reference_norm = np.sqrt(
+                sum(
+                    np.sum(np.square(state[increment][core], dtype=float))
+                    for core in self.tiles(shape)
+                )
+            )
+
+        def _tasks(current: dict[str, np.ndarray]) -> Iterator[tuple]:
+            for core in self.tiles(shape):
+                window = self.window(core, shape)
+                tile_state = {
+                    key: np.array(value[window]) for key, value in current.items()
+                }
+                tile_fields = {
+                    key: _restrict(value, window, shape)
+                    for key, value in fields.items()
+                }
+                yield core, window, (tile_state,), tile_fields
+
+        # Alternate between two sets of arrays, allocated with the first results
+        buffers: list[dict[str, np.ndarray]] = [{}, {}]
+        current = state
+        with self._pool() as pool:
+            for index in range(num_rounds):
+                new_state = buffers[index % 2]
+                squared_increment = 0.0
+                for core, window, tile_state in self._map(pool, step, _tasks(current)):
+                    local_core = tuple(
+                        slice(s.start - w.start, s.stop - w.start)
+                        for s, w in zip(core, window)
+                    )
+                    for key, value in tile_state.items():
+                        if key not in new_state:
+                            new_state[key] = self._allocate(
+                                shape + value.shape[self.dim :], value.dtype
+                            )
+                        new_state[key][core] = value[local_core]
+                    if check:
+                        squared_increment += np.sum(
+                            np.square(
+                                tile_state[increment][local_core]
+                                - current[increment][core],
+                                dtype=float,
+                            )
+                        )
+                current = new_state
+
+                # Convergence check
+                if check and np.sqrt(squared_increment) / reference_norm < eps:
+                    break
+
+        return current
+
+    # ! ---- Auxiliary methods
+
+    def _pool(self) -> ContextManager[Optional[Executor]]:
+        """Pool of workers, None for serial execution.
+
+        Returns:
+            context manager: pool of workers.
+
+        """
+        if self.num_workers <= 1:
+            return nullcontext()
+        elif self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.num_workers)
+        else:
+            return ProcessPoolExecutor(
+                max_workers=self.num_workers, mp_context=get_context("spawn")
+            )
+
+    def _map(
+        self,
+        pool: Optional[Executor],
+        function: Callable,
+        tasks: Iterator[tuple],
+    ) -> Iterator[tuple[tuple[slice, ...], tuple[slice, ...], Any]]:
+        """Apply function to the tiles, with a bounded number of pending tiles.
+
+        Args:
+            pool (Executor, optional): pool of workers; serial execution if None.
+            function (callable): function applied to each tile.
+            tasks (iterator): core, extended tile, positional and keyword arguments
+                of the function for each tile.
+
+        Yields:
+            tuple: core, extended tile and result for each tile, in order.
+
+        """
+        if pool is None:
+            for core, window, args, kwargs in tasks:
+                yield core, window, function(*args, **kwargs)
+            return
+
+        queue: deque = deque()
+        for core, window, args, kwargs in tasks:
+            queue.append((core, window, pool.submit(function, *args, **kwargs)))
+            if len(queue) >= self.prefetch:
+                core, window, future = queue.popleft()
+                yield core, window, future.result()
+        while queue:
+            core, window, future = queue.popleft()
+            yield core, window, future.result()
+
+    def _allocate(self, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Allocate array, memory-mapped to an anonymous file in the workspace.
+
+        Args:
+            shape (tuple of int): shape of the array.
+            dtype (dtype): data type of the array.
+
+        Returns:
+            array: uninitialized array.
+
+        """
+        if self.workspace is None:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            tempfile.TemporaryFile(dir=self.workspace),
+            dtype=dtype,
+            mode="w+",
+            shape=shape,
+        )
+
+
+def _ramp(positions: np.ndarray, interface: int, width: int) -> np.ndarray:
+    """Linear ramp from 0 to 1 across an interface between two pixels.
+
+    Args:
+        positions (array): pixel indices.
+        interface (int): index of the first pixel above the interface.
+        width (int): width of the ramp in pixels; step function if 0.
+
+    Returns:
+        array: values of the ramp at the pixel centers.
+
+    """
+    if width == 0:
+        return (positions >= interface).astype(float)
+    return np.clip((positions + 0.5 - interface) / width + 0.5, 0, 1)
+
+
+def _restrict(value, window: tuple[slice, ...], shape: tuple[int, ...]):
+    """Restrict fields with the shape of the image to a tile; others are kept."""
+    if isinstance(value, np.ndarray) and value.shape[: len(shape)] == shape:
+        return np.array(value[window])
+    return value
@@ -4,7 +4,9 @@ definition of a restoration object.
 
 """
 
+import copy
 from typing import Union
+from warnings import warn
 
 import numpy as np
 import skimage
@@ -18,6 +20,19 @@ class TVD:
     Connects to skimage.restoration.denoise_tv_* methods as well as to the DarSIA
     implementation of the split Bregman method (:mod:'split_bregman_tvd.py').
 
+    For large images, the denoising can be applied tile by tile, see
+    :class:`darsia.TiledRestoration`, by providing a tile shape.
+
+    NOTE: For the heterogeneous Bregman method, the tiles are advanced
+    synchronously, exchanging the halos of the image and the split Bregman variables
+    after each iteration. With a Jacobi solver with n iterations, the tiled result
+    agrees with the denoising of the full image up to round-off if tile_overlap is at
+    least n + 1. For other solvers (e.g., darsia.GeometricMG), the tiles solve the
+    linear systems with natural boundary conditions on the extended tiles; the
+    resulting error decays exponentially with the overlap. The skimage methods, and
+    the heterogeneous Bregman method with adaptive regularization, are applied to
+    the extended tiles as a whole, without exchange of halos.
+
     """
 
     def __init__(self, key: str = "", **kwargs) -> None:
@@ -25,6 +40,13 @@ class TVD:
 
         Args:
             key (str): Prefix for kwargs arguments.
+            **kwargs: method and its parameters, and optional tiling:
+                - tile_shape (int or tuple of int): shape of tiles; no tiling if None.
+                - tile_overlap (int): width of halos and blending bands of tiles;
+                    see the note above on choosing it.
+                - num_workers (int): number of threads restoring tiles in parallel.
+                - tile_workspace (str): folder for memory-mapping the state of
+                    the heterogeneous Bregman method; kept in memory if None.
 
         """
         # Determine method
@@ -40,6 +62,13 @@ class TVD:
         self.weight = kwargs.pop(key + "weight", 0.1)
         self.max_num_iter = kwargs.pop(key + "max_num_iter", 200)
         self.eps = kwargs.pop(key + "eps", 2e-4)
+
+        # Tiling
+        self.tile_shape = kwargs.pop(key + "tile_shape", None)
+        self.tile_overlap = kwargs.pop(key + "tile_overlap", 16)
+        self.num_workers = kwargs.pop(key + "num_workers", 1)
+        self.tile_workspace = kwargs.pop(key + "tile_workspace", None)
+
         self.kwargs = kwargs
 
     def __call__(
@@ -71,13 +100,87 @@ class TVD:
         Returns:
             np.ndarray: upscaled image
 
+        """
+        # Parameters, possibly heterogeneous
+        parameters = {"weight": self.weight}
+        if self.method == "heterogeneous bregman":
+            parameters.update({"omega": self.omega, "ell": self.regularization})
+
+        if self.tile_shape is None:
+            return self._tvd_tile(img, **parameters)
+
+        # Restrict heterogeneous parameters to the tiles, and use private solvers
+        tiled_tvd = darsia.TiledRestoration(
+            self._tvd_tile,
+            tile_shape=self.tile_shape,
+            overlap=self.tile_overlap,
+            num_workers=self.num_workers,
+            workspace=self.tile_workspace,
+        )
+
+        if self.method == "heterogeneous bregman" and "adaptive" not in self.kwargs:
+            # Exchange halos of the image and split Bregman variables after each
+            # iteration, starting from the image and zero split Bregman variables
+            dim = self.kwargs.get("dim", 2)
+            solver = self.kwargs.get("solver", darsia.Jacobi())
+            if (
+                isinstance(solver, darsia.Jacobi)
+                and self.tile_overlap <= solver.maxiter
+            ):
+                warn(
+                    f"Overlap {self.tile_overlap} of the tiles does not cover the "
+                    f"domain of dependence of {solver.maxiter} Jacobi iterations; "
+                    "the result may differ from the denoising of the full image."
+                )
+            zeros = np.broadcast_to(np.zeros((), dtype=img.dtype), (*img.shape, dim))
+            state = tiled_tvd.iterate(
+                self._bregman_step,
+                {"img": skimage.img_as_float(img), "d": zeros, "b": zeros},
+                num_rounds=self.max_num_iter,
+                eps=self.eps,
+                increment="img",
+                img=img,
+                **parameters,
+            )
+            return darsia.convert_dtype(state["img"], img.dtype)
+
+        warn(
+            f"Tiled TVD with method {self.method} does not exchange halos; "
+            "the result may differ from the denoising of the full image at the "
+            "interfaces of the tiles."
+        )
+        return tiled_tvd(img, private_solver=True, **parameters)
+
+    def _tvd_tile(
+        self,
+        img: np.ndarray,
+        weight: Union[float, np.ndarray],
+        omega: Union[float, np.ndarray, None] = None,
+        ell: Union[float, np.ndarray, None] = None,
+        private_solver: bool = False,
+    ) -> np.ndarray:
+        """Application of tv denoising to a single numpy array.
+
+        Args:
+            img (np.ndarray): image
+            weight (float or array): weight, restricted to the image
+            omega (float or array, optional): data fidelity weight, restricted to the
+                image (only for heterogeneous bregman)
+            ell (float or array, optional): regularization parameter, restricted to
+                the image (only for heterogeneous bregman)
+            private_solver (bool): flag controlling whether a copy of the solver is
+                used, allowing for concurrent calls
+
+        Returns:
+            np.ndarray: denoised image
+
         """
 
         # Apply TVD
         if self.method == "chambolle":
             return skimage.restoration.denoise_tv_chambolle(
                 img,
-                weight=self.weight,
+                weight=weight,
                 max_num_iter=self.max_num_iter,
                 eps=self.eps,
             )
@@ -85,7 +188,7 @@ class TVD:
         elif self.method == "anisotropic bregman":
             return skimage.restoration.denoise_tv_bregman(
                 img,
-                weight=self.weight,
+                weight=weight,
                 max_num_iter=self.max_num_iter,
                 eps=self.eps,
                 isotropic=False,
@@ -94,26 +197,66 @@ class TVD:
         elif self.method == "isotropic bregman":
             return skimage.restoration.denoise_tv_bregman(
                 img,
-                weight=self.weight,
+                weight=weight,
                 max_num_iter=self.max_num_iter,
                 eps=self.eps,
                 isotropic=True,
             )
 
         elif self.method == "heterogeneous bregman":
+            kwargs = self.kwargs.copy()
+            if private_solver and "solver" in kwargs:
+                kwargs["solver"] = copy.copy(kwargs["solver"])
             return darsia.split_bregman_tvd(
                 img,
-                mu=self.weight,
-                omega=self.omega,
-                ell=self.regularization,
+                mu=weight,
+                omega=omega,
+                ell=ell,
                 max_num_iter=self.max_num_iter,
                 eps=self.eps,
-                **self.kwargs,
+                **kwargs,
             )
 
         else:
             raise ValueError(f"Method {self.method} not supported.")
 
+    def _bregman_step(
+        self,
+        state: dict[str, np.ndarray],
+        img: np.ndarray,
+        weight: Union[float, np.ndarray],
+        omega: Union[float, np.ndarray],
+        ell: Union[float, np.ndarray],
+    ) -> dict[str, np.ndarray]:
+        """Single iteration of the heterogeneous Bregman method on a tile.
+
+        Args:
+            state (dict of arrays): image and split Bregman variables "d" and "b",
+                restricted to the tile
+            img (np.ndarray): input image, restricted to the tile
+            weight (float or array): weight, restricted to the tile
+            omega (float or array): data fidelity weight, restricted to the tile
+            ell (float or array): regularization parameter, restricted to the tile
+
+        Returns:
+            dict of arrays: updated state
+
+        """
+        kwargs = self.kwargs.copy()
+        if "solver" in kwargs:
+            kwargs["solver"] = copy.copy(kwargs["solver"])
+        img_iter, d, b = darsia.split_bregman_tvd(
+            img,
+            mu=weight,
+            omega=omega,
+            ell=ell,
+            max_num_iter=1,
+            x0=(state["img"], state["d"], state["b"]),
+            return_state=True,
+            **kwargs,
+        )
+        return {"img": img_iter, "d": d, "b": b}
+
     def _tvd_image(self, img: darsia.Image) -> darsia.Image:
         """Application of anisotropic resizing and tv denoising to darsia.Image.
 
@@ -15,6 +15,10 @@ import darsia
 
 class Model:
 
+    pixelwise: bool = False
+    """Flag whether the model acts on each pixel separately, and can thus be applied
+    to stacks of signals at once."""
+
     @abc.abstractmethod
     @overload
     def __call__(self, signal: np.ndarray) -> np.ndarray: ...
@@ -30,6 +34,15 @@ class Model:
         """
         pass
 
+    def affine_coefficients(self) -> Optional[tuple[float, float]]:
+        """Scaling and offset, if the model is an affine map of the signal.
+
+        Returns:
+            tuple of float, optional: scaling and offset; None if not affine.
+
+        """
+        return None
+
     @abc.abstractmethod
     def calibrate(self) -> None:
         """
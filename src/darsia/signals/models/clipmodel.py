@@ -17,6 +17,8 @@ class ClipModel(darsia.Model):
 
     """
 
+    pixelwise = True
+
     def __init__(self, key: str = "", **kwargs) -> None:
         """
         Constructor.
@@ -27,6 +27,24 @@ class CombinedModel(darsia.Model):
             ]
         )
 
+    @property
+    def pixelwise(self) -> bool:
+        """Flag whether all models act on each pixel separately."""
+        return all(getattr(model, "pixelwise", False) for model in self.models)
+
+    def affine_coefficients(self) -> Optional[tuple[float, float]]:
+        """Scaling and offset of the composition, if all models are affine."""
+        scaling, offset = 1.0, 0.0
+        for model in self.models:
+            coefficients = model.affine_coefficients()
+            if coefficients is None:
+                return None
+            scaling, offset = (
+                coefficients[0] * scaling,
+                coefficients[0] * offset + coefficients[1],
+            )
+        return scaling, offset
+
     def __call__(self, img: np.ndarray, *args) -> np.ndarray:
         """
         concatenate the application of the models
@@ -16,6 +16,7 @@ from typing import Literal, Optional, Union
 from warnings import warn
 
 import numpy as np
+import scipy.linalg
 
 import darsia
 
@@ -23,6 +24,8 @@ import darsia
 class KernelInterpolation(darsia.Model):
     """General kernel-based interpolation."""
 
+    pixelwise = True
+
     def __init__(
         self,
         kernel: darsia.BaseKernel,
@@ -51,6 +54,11 @@ class KernelInterpolation(darsia.Model):
         """Number of support points."""
         self.interpolation_weights = None
         """Interpolation weights."""
+        self.factorization: Optional[tuple[str, tuple]] = None
+        """Factorization of the kernel matrix - type ("cholesky" or "lu") and
+        factors."""
+        self.factorized_supports: Optional[np.ndarray] = None
+        """Supports underlying the factorization."""
         self.update(kernel=kernel, supports=supports, values=values)
 
     def update(
@@ -84,8 +92,6 @@ class KernelInterpolation(darsia.Model):
             else:
                 self.supports = np.vstack((self.supports, supports)).astype(np.float32)
             self.num_supports = self.supports.shape[0]
-            if hasattr(self, "Xinv"):
-                del self.Xinv
         if values is not None:
             if self.values is None or not append:
                 self.values = values
@@ -104,6 +110,12 @@ class KernelInterpolation(darsia.Model):
 
         """
         self.kernel = kernel
+        self.reset_factorization()
+
+    def reset_factorization(self) -> None:
+        """Request a full factorization of the kernel matrix."""
+        self.factorization = None
+        self.factorized_supports = None
 
     def setup_kernel_problem(self) -> None:
         """Setup of linear kernel problem."""
@@ -111,29 +123,109 @@ class KernelInterpolation(darsia.Model):
             len(self.values) == self.num_supports
         ), f"Input data not compatible: {len(self.values)} != {self.num_supports}."
 
-        # Reduce to unique supports for unique solvability
-        self.supports, indices, counts = np.unique(
-            np.round(self.supports, decimals=5),
+        # Reduce to unique supports for unique solvability. Keep the order of first
+        # occurrence, such that appended supports remain at the end.
+        rounded_supports = np.round(self.supports, decimals=5)
+        _, indices, counts = np.unique(
+            rounded_supports,
             return_index=True,
             return_counts=True,
             axis=0,
         )
+        indices = np.sort(indices)
         # Warn the user that some supports were removed
         if not np.allclose(counts, 1):
             warn(
                 f"Supports are not unique. {np.sum(counts - 1)} supports were removed."
             )
         # Adapt the remaining values
+        self.supports = rounded_supports[indices]
         self.num_supports = self.supports.shape[0]
         self.values = self.values[indices]
 
-        # Solve the interpolation problem, i.e., set up the kernel matrix, and solve
-        # for the interpolation weights
-        self.X = np.ones((self.num_supports, self.num_supports))  # kernel matrix
-        for i in range(self.num_supports):
-            for j in range(self.num_supports):
-                self.X[i, j] = self.kernel(self.supports[i], self.supports[j])
-        self.Xinv = np.linalg.inv(self.X)
+        # Set up the kernel matrix and its factorization. Reuse the factorization for
+        # previous supports if only supports have been appended.
+        num_factorized_supports = (
+            0 if self.factorized_supports is None else len(self.factorized_supports)
+        )
+        if (
+            self.factorization is not None
+            and self.factorization[0] == "cholesky"
+            and 0 < num_factorized_supports <= self.num_supports
+            and np.array_equal(
+                self.supports[:num_factorized_supports], self.factorized_supports
+            )
+        ):
+            self._extend_factorization(num_factorized_supports)
+        else:
+            self.X = self.kernel.gram_matrix(self.supports)
+            self._factorize()
+        self.factorized_supports = self.supports.copy()
+
+    def _factorize(self) -> None:
+        """Factorize the kernel matrix.
+
+        Cholesky factorization is used for positive definite kernel matrices, LU
+        factorization otherwise.
+
+        """
+        try:
+            self.factorization = (
+                "cholesky",
+                (scipy.linalg.cholesky(self.X, lower=True), True),
+            )
+        except np.linalg.LinAlgError:
+            self.factorization = ("lu", scipy.linalg.lu_factor(self.X))
+
+    def _extend_factorization(self, num_factorized_supports: int) -> None:
+        """Update Cholesky factorization for appended supports.
+
+        With the kernel matrix partitioned into blocks wrt. previous and appended
+        supports, only the blocks of the appended supports are factorized.
+
+        Args:
+            num_factorized_supports (int): number of previous supports.
+
+        """
+        if num_factorized_supports == self.num_supports:
+            return
+
+        old_supports = self.supports[:num_factorized_supports]
+        new_supports = self.supports[num_factorized_supports:]
+        X12 = self.kernel.gram_matrix(old_supports, new_supports)
+        X22 = self.kernel.gram_matrix(new_supports)
+        self.X = np.block([[self.X, X12], [X12.T, X22]])
+
+        L11 = self.factorization[1][0]
+        L21 = scipy.linalg.solve_triangular(L11, X12, lower=True).T
+        try:
+            L22 = scipy.linalg.cholesky(X22 - L21 @ L21.T, lower=True)
+        except np.linalg.LinAlgError:
+            self._factorize()
+            return
+        L = np.block(
+            [
+                [L11, np.zeros((num_factorized_supports, len(new_supports)))],
+                [L21, L22],
+            ]
+        )
+        self.factorization = ("cholesky", (L, True))
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """Solve kernel problem using the cached factorization.
+
+        Args:
+            rhs (np.ndarray): right hand side, e.g., values
+
+        Returns:
+            np.ndarray: solution
+
+        """
+        factorization_type, factors = self.factorization
+        if factorization_type == "cholesky":
+            return scipy.linalg.cho_solve(factors, rhs)
+        else:
+            return scipy.linalg.lu_solve(factors, rhs)
 
     def update_interpolation(self) -> None:
         """Update interpolation weights.
@@ -143,9 +235,11 @@ class KernelInterpolation(darsia.Model):
                 supports and values does not match.
 
         """
-        if not hasattr(self, "Xinv"):
+        if self.factorization is None or not np.array_equal(
+            self.supports, self.factorized_supports
+        ):
             self.setup_kernel_problem()
-        self.interpolation_weights = self.Xinv @ self.values
+        self.interpolation_weights = self.solve(self.values)
 
     def update_model_parameters(
         self,
@@ -181,8 +275,9 @@ class KernelInterpolation(darsia.Model):
             # NOTE: Currently only scalar output supported - forced here.
             return np.zeros(signal.shape[:1], dtype=np.float32)
         else:
+            # NOTE: Conversion to float32 is left to the kernel, possibly chunkwise.
             return self.kernel.linear_combination(
-                signal.astype(np.float32),
+                signal,
                 self.supports,
                 self.interpolation_weights.astype(np.float32),
             )
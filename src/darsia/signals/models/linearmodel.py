@@ -15,6 +15,8 @@ import darsia
 class ScalingModel(darsia.Model):
     """Linear model (plain scaling)."""
 
+    pixelwise = True
+
     def __init__(
         self,
         key: str = "",
@@ -60,6 +62,10 @@ class ScalingModel(darsia.Model):
         else:
             raise ValueError(f"Unknown dof {dofs}.")
 
+    def affine_coefficients(self) -> tuple[float, float]:
+        """Scaling and vanishing offset."""
+        return self._scaling, 0.0
+
     def __call__(self, img: np.ndarray) -> np.ndarray:
         """
         Application of linear model.
@@ -80,6 +86,8 @@ class ScalingModel(darsia.Model):
 class LinearModel(darsia.Model):
     """Linear model, applying an affine conversion for signals to data."""
 
+    pixelwise = True
+
     def __init__(
         self,
         key: str = "",
@@ -137,6 +145,10 @@ class LinearModel(darsia.Model):
         else:
             raise ValueError(f"Unknown dof {dofs}.")
 
+    def affine_coefficients(self) -> tuple[float, float]:
+        """Scaling and offset."""
+        return self._scaling, self._offset
+
     def __call__(self, img: np.ndarray) -> np.ndarray:
         """
         Application of linear model.
@@ -25,12 +25,18 @@ class MonochromaticReduction(darsia.SignalReduction):
         if self.color == "hsv-after":
             raise ValueError("Rename to 'hsv'.")
 
+    @property
+    def pixelwise(self) -> bool:
+        """Flag whether the reduction acts on each pixel separately; user-defined
+        reductions are assumed to act on single images."""
+        return not callable(self.color)
+
     def __call__(self, img: np.ndarray) -> np.ndarray:
         """
         Make a mono-colored image from potentially multi-colored image.
 
         Args:
-            img (np.ndarray): image
+            img (np.ndarray): image, or stack of images with leading frame axis
 
         Returns:
             np.ndarray: monochromatic reduction of the array
@@ -43,46 +49,49 @@ class MonochromaticReduction(darsia.SignalReduction):
             # the concentration analysis.
             if self.verbosity >= 2:
                 plt.figure("hue")
-                plt.imshow(hsv[:, :, 0])
+                plt.imshow(hsv[..., 0])
                 plt.figure("saturation")
-                plt.imshow(hsv[:, :, 1])
+                plt.imshow(hsv[..., 1])
 
             # Restrict to user-defined thresholded hue and saturation values.
             mask_hue = np.logical_and(
-                hsv[:, :, 0] > self.hue_lower_bound,
-                hsv[:, :, 0] < self.hue_upper_bound,
+                hsv[..., 0] > self.hue_lower_bound,
+                hsv[..., 0] < self.hue_upper_bound,
             )
             mask_saturation = np.logical_and(
-                hsv[:, :, 1] > self.saturation_lower_bound,
-                hsv[:, :, 1] < self.saturation_upper_bound,
+                hsv[..., 1] > self.saturation_lower_bound,
+                hsv[..., 1] < self.saturation_upper_bound,
             )
             mask = np.logical_and(mask_hue, mask_saturation)
 
             # Consider value
-            img_v = hsv[:, :, 2]
+            img_v = hsv[..., 2]
             img_v[~mask] = 0
             return img_v
 
         elif self.color == "gray":
             # Assume RGB input. NOTE: Make sure that the input is in correct
             # format (CV2 requires np.float32).
-            return cv2.cvtColor(img.astype(np.float32), cv2.COLOR_RGB2GRAY)
+            rgb = img.astype(np.float32, copy=False)
+            if rgb.ndim > 3:
+                return _convert_stack(rgb, cv2.COLOR_RGB2GRAY)
+            return cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
 
         elif self.color == "red":
-            return img[:, :, 0]
+            return img[..., 0]
 
         elif self.color == "green":
-            return img[:, :, 1]
+            return img[..., 1]
 
         elif self.color == "blue":
-            return img[:, :, 2]
+            return img[..., 2]
 
         elif self.color == "red+green":
-            return img[:, :, 0] + img[:, :, 1]
+            return img[..., 0] + img[..., 1]
 
         elif self.color == "negative-key":
             cmy = 1 - img
-            key = np.min(cmy, axis=2)
+            key = np.min(cmy, axis=-1)
             return 1 - key
 
         elif callable(self.color):
@@ -93,3 +102,23 @@ class MonochromaticReduction(darsia.SignalReduction):
 
         else:
             raise ValueError(f"Mono-colored space {self.color} not supported.")
+
+
+def _convert_stack(img: np.ndarray, code: int) -> np.ndarray:
+    """Pixelwise color conversion of a stack of images at once.
+
+    The pixels are passed to cv2 as a single column in memory order, such that no
+    copy is required for stacks with strided frames (e.g., of space-time images).
+
+    Args:
+        img (np.ndarray): stack of images with color channels as last axis.
+        code (int): cv2 color conversion code.
+
+    Returns:
+        np.ndarray: converted stack with the layout of the input.
+
+    """
+    order = sorted(range(img.ndim - 1), key=lambda axis: -img.strides[axis])
+    pixels = np.transpose(img, order + [img.ndim - 1])
+    converted = cv2.cvtColor(np.reshape(pixels, (-1, 1, img.shape[-1])), code)
+    return np.transpose(np.reshape(converted, pixels.shape[:-1]), np.argsort(order))
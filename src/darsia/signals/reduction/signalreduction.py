@@ -7,6 +7,11 @@ import numpy as np
 
 
 class SignalReduction:
+
+    pixelwise: bool = True
+    """Flag whether the reduction acts on each pixel separately, and can thus be
+    applied to stacks of images at once."""
+
     def __call__(self, img: np.ndarray) -> np.ndarray:
         """
         Method defining the conversion to a scalar signal.
@@ -66,16 +66,11 @@ class FeatureDetection:
 
         # Exclude features outside the restricted mask
         if mask is not None and len(kps_all) > 0:
-            include_ids = np.zeros(len(kps_all), dtype=bool)
-            kps_list: list = []
-            for i, kp in enumerate(kps_all):
-                pt = np.array(kp.pt).astype(np.int32)
-                if mask_roi[pt[1], pt[0]]:
-                    include_ids[i] = True
-                    kps_list.append(kp)
+            pts = cv2.KeyPoint_convert(kps_all).astype(np.int32)
+            include_ids = np.asarray(mask_roi[pts[:, 1], pts[:, 0]], dtype=bool)
 
             # Convert to right format
-            kps = tuple(kps_list)
+            kps = tuple(kp for kp, include in zip(kps_all, include_ids) if include)
             descs = descs_all[include_ids, :] if len(kps) > 0 else None
         else:
             kps = kps_all
@@ -86,6 +81,64 @@ class FeatureDetection:
 
         return (kps, descs), found_features
 
+    @classmethod
+    def serialize_features(cls, features: tuple) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Convert features to arrays, e.g., for storing them in npz files.
+
+        Args:
+            features (tuple): features given as tuple of keypoints and descriptors
+
+        Returns:
+            np.ndarray: keypoints, one row (x, y, size, angle, response, octave,
+                class_id) per keypoint
+            np.ndarray: descriptors; empty if no features are provided
+        """
+        kps, descs = features
+        kps_array = np.array(
+            [
+                (*kp.pt, kp.size, kp.angle, kp.response, kp.octave, kp.class_id)
+                for kp in kps
+            ],
+            dtype=float,
+        ).reshape(-1, 7)
+        descs_array = (
+            np.zeros((0, 32), dtype=np.uint8) if descs is None else np.asarray(descs)
+        )
+        return kps_array, descs_array
+
+    @classmethod
+    def deserialize_features(
+        cls, kps_array: np.ndarray, descs_array: np.ndarray
+    ) -> tuple:
+        """
+        Convert arrays to features, inverse of serialize_features.
+
+        Args:
+            kps_array (np.ndarray): keypoints, one row per keypoint
+            descs_array (np.ndarray): descriptors
+
+        Returns:
+            tuple: tuple of
+                kps: keypoints of the features
+                np.ndarray: descriptors of the features
+            bool: flag indicating whether features are available
+        """
+        kps = tuple(
+            cv2.KeyPoint(
+                x=float(x),
+                y=float(y),
+                size=float(size),
+                angle=float(angle),
+                response=float(response),
+                octave=int(octave),
+                class_id=int(class_id),
+            )
+            for x, y, size, angle, response, octave, class_id in kps_array
+        )
+        descs = descs_array if len(descs_array) > 0 else None
+        return (kps, descs), descs is not None
+
     @classmethod
     def match_features(
         cls,
@@ -4,7 +4,6 @@ from typing import Optional
 
 import numpy as np
 import scipy.sparse as sps
-from scipy.stats import hmean
 
 import darsia
 
@@ -29,7 +28,7 @@ class FVDivergence:
             ]
         )
         div_row = np.concatenate(
-            [np.ravel(grid.connectivity[grid.faces[d]]) for d in range(grid.dim)]
+            [np.ravel(grid.connectivity[grid.face_slices[d]]) for d in range(grid.dim)]
         )
         div_col = np.repeat(np.arange(grid.num_faces, dtype=int), 2)
         div = sps.csc_matrix(
@@ -201,7 +200,7 @@ class FVTangentialFaceReconstruction:
                     np.ravel(
                         grid.reverse_connectivity[
                             d_perp,
-                            np.ravel(grid.connectivity[grid.faces[d]]),
+                            np.ravel(grid.connectivity[grid.face_slices[d]]),
                         ]
                     )
                     for d in range(grid.dim)
@@ -224,6 +223,10 @@ class FVTangentialFaceReconstruction:
             for col in cols
         ]
 
+        # Stack all tangential directions to apply them in a single matrix-vector
+        # product
+        self.stacked_mat = sps.vstack(self.mat, format="csr")
+
         # Cache some informatio
         self.num_tangential_directions = grid.dim - 1
         self.grid = grid
@@ -241,12 +244,10 @@ class FVTangentialFaceReconstruction:
             np.ndarray or list of arrays: tangential fluxes
 
         """
-        # Apply the operator to the normal fluxes
-        tangential_flux = [
-            self.mat[d].dot(normal_flux) for d in range(self.num_tangential_directions)
-        ]
-        if concatenate:
-            tangential_flux = np.concatenate(tangential_flux, axis=0)
+        # Apply the operator to the normal fluxes, all directions at once
+        tangential_flux = self.stacked_mat.dot(normal_flux)
+        if not concatenate:
+            tangential_flux = np.split(tangential_flux, self.num_tangential_directions)
 
         return tangential_flux
 
@@ -256,11 +257,14 @@ class FVFullFaceReconstruction:
         self.grid = grid
         self.tangential_reconstruction = FVTangentialFaceReconstruction(grid)
 
-    def __call__(self, normal_flux: np.ndarray) -> np.ndarray:
+    def __call__(
+        self, normal_flux: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """Reconstruct the full fluxes from the normal and tangential fluxes.
 
         Args:
             normal_flux (np.ndarray): normal fluxes
+            out (np.ndarray, optional): preallocated output of shape (num_faces, dim)
 
         Returns:
             np.ndarray: full fluxes
@@ -269,24 +273,136 @@ class FVFullFaceReconstruction:
         # Apply the operator to the normal fluxes
         tangential_fluxes = self.tangential_reconstruction(normal_flux, False)
 
-        # Reconstruct the full fluxes
+        # Reconstruct the full fluxes - faces of each axis form contiguous ranges
         dim = self.grid.dim
-        full_flux = np.zeros((self.grid.num_faces, dim), dtype=float)
+        if out is None:
+            out = np.empty((self.grid.num_faces, dim), dtype=float)
         for d in range(dim):
-            full_flux[self.grid.faces[d], d] = normal_flux[self.grid.faces[d]]
+            faces = self.grid.face_slices[d]
+            out[faces, d] = normal_flux[faces]
             for i, d_perp in enumerate(np.delete(range(dim), d)):
-                full_flux[self.grid.faces[d], d_perp] = tangential_fluxes[i][
-                    self.grid.faces[d]
-                ]
+                out[faces, d_perp] = tangential_fluxes[i][faces]
+
+        return out
+
+
+class FVCellReconstruction:
+    """Raviart-Thomas reconstruction of cell fluxes at fixed points of all cells.
+
+    Matrix-free implementation evaluating all points in a single pass over the normal
+    fluxes of each axis. The face fluxes are accessed through views, and the result
+    can be written to a preallocated output. Instances are meant to be reused, e.g.,
+    for all quadrature points within an iterative solver, and are best accessed
+    through darsia.Grid.cell_reconstruction.
+
+    Example:
+        reconstruction = grid.cell_reconstruction(quad_pts)
+        cell_flux = np.empty(reconstruction.shape)
+        for iter in range(num_iter):
+            reconstruction(flat_flux, out=cell_flux)
+
+    """
+
+    def __init__(self, grid: darsia.Grid, pts: np.ndarray) -> None:
+        """Initialize the reconstruction operator.
+
+        Args:
+            grid (darsia.Grid): grid
+            pts (np.ndarray): points relative to the reference cell [0,1]**dim, in
+                matrix-indexing, one per row.
+
+        """
+        if grid.dim > 3:
+            raise NotImplementedError(f"Dimension {grid.dim} not supported.")
+
+        self.grid = grid
+        """Grid."""
+
+        self.pts = np.reshape(np.asarray(pts, dtype=float), (-1, grid.dim))
+        """Points of evaluation relative to the reference cell."""
+
+        self.num_pts = self.pts.shape[0]
+        """Number of points."""
+
+        # Interpolation weights of the faces on the upper side of the cells,
+        # broadcastable to the shape of the cells
+        weight_shape = (self.num_pts,) + (1,) * grid.dim
+        self._weights = [
+            np.reshape(self.pts[:, d], weight_shape) for d in range(grid.dim)
+        ]
+        """Interpolation weights for each axis."""
+
+        self._padded_flux: list[Optional[np.ndarray]] = [None] * grid.dim
+        """Work arrays for normal fluxes padded with zero boundary fluxes."""
+
+        self._jump: list[Optional[np.ndarray]] = [None] * grid.dim
+        """Work arrays for differences of normal fluxes across cells."""
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Shape of the reconstructed fluxes: points x cells x components."""
+        return (self.num_pts, *self.grid.shape, self.grid.dim)
+
+    def __call__(
+        self, flat_flux: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Evaluate the reconstructed fluxes at all points.
+
+        In each cell and along each axis, the fluxes are linearly interpolated between
+        the faces on the lower and upper side. Per axis, the fluxes on the lower side
+        and the jumps are computed once and shared by all points.
+
+        NOTE: If no output is provided, the components are stored contiguously, and a
+        view with the components as last axis is returned.
+
+        Args:
+            flat_flux (np.ndarray): flat fluxes (normal fluxes on the faces)
+            out (np.ndarray, optional): preallocated output of shape self.shape
+
+        Returns:
+            np.ndarray: cell-based vectorial fluxes for each point
+
+        """
+        dim = self.grid.dim
+        if out is None:
+            out = np.moveaxis(np.empty((dim, *self.shape[:-1]), dtype=float), 0, -1)
+
+        for d in range(dim):
+            # Slices of the lower and upper sides of cells along axis d
+            lower, upper = [
+                tuple(s if e == d else slice(None) for e in range(dim))
+                for s in [slice(0, -1), slice(1, None)]
+            ]
+
+            # Pad normal fluxes of axis d with zero fluxes on the boundary
+            if self._padded_flux[d] is None:
+                padded_shape = np.array(self.grid.shape) + np.eye(dim, dtype=int)[d]
+                self._padded_flux[d] = np.zeros(tuple(padded_shape), dtype=float)
+                self._jump[d] = np.empty(self.grid.shape, dtype=float)
+            padded_flux = self._padded_flux[d]
+            padded_flux[upper][lower] = np.reshape(
+                flat_flux[self.grid.face_slices[d]],
+                tuple(self.grid.faces_shape[d]),
+                order="F",
+            )
+            np.subtract(padded_flux[upper], padded_flux[lower], out=self._jump[d])
 
-        return full_flux
+            # Linear interpolation, for all points at once
+            component = out[..., d]
+            np.multiply(self._jump[d], self._weights[d], out=component)
+            component += padded_flux[lower]
+
+        return out
 
 
 # ! ---- Finite volume projection operators ----
 
 
 def face_to_cell(
-    grid: darsia.Grid, flat_flux: np.ndarray, pt: Optional[np.ndarray] = None
+    grid: darsia.Grid,
+    flat_flux: np.ndarray,
+    pt: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Reconstruct the vector fluxes on the cells from normal fluxes on the faces.
 
@@ -295,7 +411,8 @@ def face_to_cell(
     equivalent with the L2 projection of the fluxes on the faces to the fluxes on
     the cells.
 
-    Matrix-free implementation.
+    Matrix-free implementation, see FVCellReconstruction for evaluating multiple
+    points at once.
 
     Args:
         grid (darsia.Grid): grid
@@ -303,51 +420,26 @@ def face_to_cell(
         pt (np.ndarray, optional): points at which to evaluate the fluxes, relative to
             the reference cell [0,1]**dim, in matrix-indexing. Uses Defaults to None.
             Then the center of the reference cell is used.
+        out (np.ndarray, optional): preallocated output of shape (*grid.shape, dim)
 
     Returns:
         np.ndarray: cell-based vectorial fluxes
 
     """
-    # Initialize the cell-based fluxes
-    cell_flux = np.zeros((*grid.shape, grid.dim), dtype=float)
-
     # Pick the cell center if no pt provided
     if pt is None:
         pt = np.ones(grid.dim) / 2
 
-    # Make pt an array - needed for 1d case
-    if grid.dim == 1:
-        pt = np.array([pt])
-
-    if grid.dim >= 1:
-        cell_flux[:-1, ..., 0] += pt[0] * flat_flux[grid.faces[0]].reshape(
-            grid.faces_shape[0], order="F"
-        )
-        cell_flux[1:, ..., 0] += (1 - pt[0]) * flat_flux[grid.faces[0]].reshape(
-            grid.faces_shape[0], order="F"
-        )
-    if grid.dim >= 2:
-        cell_flux[:, :-1, ..., 1] += pt[1] * flat_flux[grid.faces[1]].reshape(
-            grid.faces_shape[1], order="F"
-        )
-        cell_flux[:, 1:, ..., 1] += (1 - pt[1]) * flat_flux[grid.faces[1]].reshape(
-            grid.faces_shape[1], order="F"
-        )
-    if grid.dim >= 3:
-        cell_flux[:, :, :-1, ..., 2] += pt[2] * flat_flux[grid.faces[2]].reshape(
-            grid.faces_shape[2], order="F"
-        )
-        cell_flux[:, :, 1:, ..., 2] += (1 - pt[2]) * flat_flux[grid.faces[2]].reshape(
-            grid.faces_shape[2], order="F"
-        )
-    if grid.dim > 3:
-        raise NotImplementedError(f"Dimension {grid.dim} not supported.")
-
-    return cell_flux
+    reconstruction = grid.cell_reconstruction(pt)
+    cell_flux = reconstruction(flat_flux, out=None if out is None else out[np.newaxis])
+    return cell_flux[0]
 
 
 def cell_to_face_average(
-    grid: darsia.Grid, cell_qty: np.ndarray, mode: str
+    grid: darsia.Grid,
+    cell_qty: np.ndarray,
+    mode: str,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Project scalar cell quantity to scalar face quantity via averaging.
 
@@ -360,67 +452,66 @@ def cell_to_face_average(
         cell_qty (np.ndarray): scalar-valued cell-based quantity
         mode (str): mode of projection, either "arithmetic" or "harmonic"
             (averaging)
+        out (np.ndarray, optional): preallocated output of shape (num_faces,)
 
     Returns:
         np.ndarray: face-based quantity
 
     """
 
-    # Prepare arrays
-    neighbouring_cell_values = np.zeros((grid.num_faces, 2), dtype=float)
-    face_qty = np.zeros(grid.num_faces, dtype=float)
-
     # Apply normal projection of cell values onto face orientations (axis-aligned)
     if len(cell_qty.shape) == grid.dim or (
         len(cell_qty.shape) == grid.dim + 1 and cell_qty.shape[-1] == 1
     ):
-
-        # Flatten cell quantities
-        single_flat_cell_qty = cell_qty.ravel("F")
-        flat_cell_qty = [single_flat_cell_qty for _ in range(grid.dim)]
+        single_cell_qty = np.reshape(cell_qty, grid.shape)
+        oriented_cell_qty = [single_cell_qty for _ in range(grid.dim)]
 
     elif len(cell_qty.shape) == grid.dim + 1 and cell_qty.shape[-1] == grid.dim:
-
-        # Flatten each component of the cell quantities
-        flat_cell_qty = [cell_qty[..., i].ravel("F") for i in range(grid.dim)]
+        # Pick each component of the cell quantities
+        oriented_cell_qty = [cell_qty[..., i] for i in range(grid.dim)]
 
     elif len(cell_qty.shape) == grid.dim + 2 and cell_qty.shape[-2:] == (
         grid.dim,
         grid.dim,
     ):
-        # Flatten each diagonal component of the cell quantities (from normal projection)
-        flat_cell_qty = [cell_qty[..., i, i].ravel("F") for i in range(grid.dim)]
+        # Pick each diagonal component of the cell quantities (from normal projection)
+        oriented_cell_qty = [cell_qty[..., i, i] for i in range(grid.dim)]
 
     else:
-
         raise NotImplementedError("Dimension not supported.")
 
-    # Collect neighbouring cell quantities
-    for orientation in range(grid.dim):
-
-        # Fetch faces
-        faces = grid.faces[orientation]
+    if mode not in ["arithmetic", "harmonic"]:
+        raise ValueError(f"Mode {mode} not supported.")
 
-        # Fetch neighbouring cells
-        neighbouring_cells = grid.connectivity[faces]
+    if out is None:
+        out = np.empty(grid.num_faces, dtype=float)
 
-        # Fetch cell quantities
-        neighbouring_cell_values[faces, 0] = flat_cell_qty[orientation][
-            neighbouring_cells[:, 0]
+    # Average the cells on both sides of the faces; the faces of each orientation
+    # are ordered as the cells with a right neighbour (Fortran order).
+    for orientation in range(grid.dim):
+        left = oriented_cell_qty[orientation][
+            tuple(
+                slice(0, -1) if e == orientation else slice(None)
+                for e in range(grid.dim)
+            )
         ]
-        neighbouring_cell_values[faces, 1] = flat_cell_qty[orientation][
-            neighbouring_cells[:, 1]
+        right = oriented_cell_qty[orientation][
+            tuple(
+                slice(1, None) if e == orientation else slice(None)
+                for e in range(grid.dim)
+            )
         ]
+        if mode == "arithmetic":
+            face_qty = 0.5 * (left + right)
+        else:
+            # Harmonic mean, vanishing if one of the values vanishes
+            with np.errstate(divide="ignore", invalid="ignore"):
+                face_qty = np.where(
+                    left * right == 0, 0.0, 2.0 * left * right / (left + right)
+                )
+        out[grid.face_slices[orientation]] = np.ravel(face_qty, "F")
 
-    # Perform averaging
-    if mode == "arithmetic":
-        face_qty = 0.5 * np.sum(neighbouring_cell_values, axis=1)
-    elif mode == "harmonic":
-        face_qty = hmean(neighbouring_cell_values, axis=1)
-    else:
-        raise ValueError(f"Mode {mode} not supported.")
-
-    return face_qty
+    return out
 
 
 # NOTE: Currently not in use. TODO rm?
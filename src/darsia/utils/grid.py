@@ -1,5 +1,6 @@
 """Grid utilities for tensor grids."""
 
+from functools import cached_property
 from typing import Union
 
 import numpy as np
@@ -8,6 +9,19 @@ import darsia
 
 # TODO make nested lits to arrays for faster access.
 
+_LAZY_ATTRIBUTES = [
+    "cell_index",
+    "faces",
+    "face_index",
+    "interior_faces",
+    "exterior_faces",
+    "connectivity",
+    "reverse_connectivity",
+    "inner_cells_with_inner_faces",
+    "cell_corner_indices",
+]
+"""Index arrays of grids, which are materialized on first access."""
+
 
 class Grid:
     """Tensor grid.
@@ -45,8 +59,19 @@ class Grid:
         # Define cell and face numbering
         self._setup()
 
+        self._cell_reconstructions: dict = {}
+        """dict: Cached cell reconstruction operators, see cell_reconstruction."""
+
     def _setup(self) -> None:
-        """Define cell and face numbering."""
+        """Define cell and face numbering.
+
+        Only sizes and slices are set up here. Index arrays (cell and face indices,
+        interior and exterior faces, connectivities) are derived from index arithmetic
+        and materialized on first access, such that large 3d grids can be constructed
+        at negligible cost. See memory_footprint() for the memory occupied by
+        materialized arrays.
+
+        """
 
         # ! ---- Grid management ----
 
@@ -55,11 +80,6 @@ class Grid:
         self.num_cells = np.prod(self.shape)
         """int: Number of cells."""
 
-        self.cell_index = np.arange(self.num_cells, dtype=int).reshape(
-            self.shape, order="F"
-        )
-        """np.ndarray: cell indices, following the matrix indexing convention."""
-
         # Determine number of inner faces in each axis
         self.faces_shape = [
             np.array(self.shape) - np.eye(self.dim, dtype=int)[d]
@@ -74,48 +94,14 @@ class Grid:
         """int: Number of faces."""
 
         # Define indexing and ordering of inner faces. Horizontal -> vertical -> depth.
-        # TODO replace with slices
-        self.faces = [
-            sum(self.num_faces_per_axis[:d])
-            + np.arange(self.num_faces_per_axis[d], dtype=int)
-            for d in range(self.dim)
-        ]
-        """list: Indices of inner faces in each axis."""
-
-        self.face_index = [
-            self.faces[d].reshape(self.faces_shape[d], order="F")
-            for d in range(self.dim)
-        ]
-        """list: Indices of inner faces in each axis, using matrix indexing."""
-
-        # Identify inner faces (full cube)
-        self.interior_faces = []
-        """list: Indices of interior faces."""
-
-        if self.dim == 1:
-            self.interior_faces = [
-                np.ravel(self.face_index[0][1:-1], "F"),
-            ]
-        elif self.dim == 2:
-            self.interior_faces = [
-                np.ravel(self.face_index[0][:, 1:-1], "F"),
-                np.ravel(self.face_index[1][1:-1, :], "F"),
-            ]
-        elif self.dim == 3:
-            self.interior_faces = [
-                np.ravel(self.face_index[0][:, 1:-1, 1:-1], "F"),
-                np.ravel(self.face_index[1][1:-1, :, 1:-1], "F"),
-                np.ravel(self.face_index[2][1:-1, 1:-1, :], "F"),
-            ]
-        else:
-            raise NotImplementedError(f"Grid of dimension {self.dim} not implemented.")
-
-        # Identify all faces on the outer boundary of the grid. Need to use hardcoded
-        # knowledge of the orientation of axes and grid indexing.
-        self.exterior_faces = [
-            np.sort(np.array(list(set(self.faces[d]) - set(self.interior_faces[d]))))
+        self.face_slices = [
+            slice(
+                int(sum(self.num_faces_per_axis[:d])),
+                int(sum(self.num_faces_per_axis[: d + 1])),
+            )
             for d in range(self.dim)
         ]
+        """list: Contiguous ranges of inner faces in each axis, as slices."""
 
         # ! ---- Reference element ----
 
@@ -157,131 +143,173 @@ class Grid:
                     [0.0, 1.0, 1.0],
                 ]
             )
+        else:
+            raise NotImplementedError(f"Grid of dimension {self.dim} not implemented.")
 
-        # ! ---- Connectivity ----
+        # Info about cell corners for each face, referring to the reference cell. The
+        # order of the corners is the same as the one of the reference cell, and it is
+        # not taken into account the orientation of the face. Due to the structured
+        # nature, all faces of one orientation share the same corner indices.
+        if self.dim == 1:
+            self.axis_corner_indices = np.array([[[1], [0]]])
+        elif self.dim == 2:
+            self.axis_corner_indices = np.array([[[1, 2], [0, 3]], [[3, 2], [0, 1]]])
+        elif self.dim == 3:
+            self.axis_corner_indices = np.array(
+                [
+                    [[1, 2, 5, 6], [0, 3, 4, 7]],
+                    [[3, 2, 7, 6], [0, 1, 4, 5]],
+                    [[4, 5, 6, 7], [0, 1, 2, 3]],
+                ]
+            )
+        """np.ndarray: Indices of neighbouring cell corners for faces of each axis."""
 
-        self.connectivity = np.zeros((self.num_faces, 2), dtype=int)
-        """np.ndarray: Connectivity (and direction) of faces to cells."""
+    # ! ---- Lazy index arrays ----
 
-        if self.dim >= 1:
-            self.connectivity[self.faces[0], 0] = np.ravel(
-                self.cell_index[:-1, ...], "F"
-            )
-            self.connectivity[self.faces[0], 1] = np.ravel(
-                self.cell_index[1:, ...], "F"
-            )
-        if self.dim >= 2:
-            self.connectivity[self.faces[1], 0] = np.ravel(
-                self.cell_index[:, :-1, ...], "F"
-            )
-            self.connectivity[self.faces[1], 1] = np.ravel(
-                self.cell_index[:, 1:, ...], "F"
-            )
-        if self.dim >= 3:
-            self.connectivity[self.faces[2], 0] = np.ravel(
-                self.cell_index[:, :, :-1, ...], "F"
-            )
-            self.connectivity[self.faces[2], 1] = np.ravel(
-                self.cell_index[:, :, 1:, ...], "F"
-            )
-        if self.dim > 3:
-            raise NotImplementedError(f"Grid of dimension {self.dim} not implemented.")
+    @cached_property
+    def cell_index(self) -> np.ndarray:
+        """np.ndarray: cell indices, following the matrix indexing convention."""
+        return np.arange(self.num_cells, dtype=int).reshape(self.shape, order="F")
+
+    @cached_property
+    def faces(self) -> list[np.ndarray]:
+        """list: Indices of inner faces in each axis."""
+        return [np.arange(s.start, s.stop, dtype=int) for s in self.face_slices]
+
+    @cached_property
+    def face_index(self) -> list[np.ndarray]:
+        """list: Indices of inner faces in each axis, using matrix indexing."""
+        return [
+            self.faces[d].reshape(self.faces_shape[d], order="F")
+            for d in range(self.dim)
+        ]
 
-        self.reverse_connectivity = -np.ones((self.dim, self.num_cells, 2), dtype=int)
-        """np.ndarray: Reverse connectivity (and direction) of cells to faces."""
+    def _interior_face_mask(self, d: int) -> np.ndarray:
+        """Mask of interior faces of axis d, using matrix indexing.
 
-        # NOTE: The first components addresses the normal direction of the face,
-        # the second the cell, the third the relative position of the face in the
-        # cell.
+        Interior faces are those not touching the boundary of the grid in tangential
+        directions (full cube). In 1d, the first and last face are excluded.
 
-        if self.dim >= 1:
-            self.reverse_connectivity[0, np.ravel(self.cell_index[1:, ...], "F"), 0] = (
-                self.faces[0]
-            )
-            self.reverse_connectivity[
-                0, np.ravel(self.cell_index[:-1, ...], "F"), 1
-            ] = self.faces[0]
-
-        if self.dim >= 2:
-            self.reverse_connectivity[
-                1, np.ravel(self.cell_index[:, 1:, ...], "F"), 0
-            ] = self.faces[1]
-            self.reverse_connectivity[
-                1, np.ravel(self.cell_index[:, :-1, ...], "F"), 1
-            ] = self.faces[1]
-
-        if self.dim >= 3:
-            self.reverse_connectivity[
-                2, np.ravel(self.cell_index[:, :, 1:, ...], "F"), 0
-            ] = self.faces[2]
-            self.reverse_connectivity[
-                2, np.ravel(self.cell_index[:, :, :-1, ...], "F"), 1
-            ] = self.faces[2]
-
-        # Info about inner cells
-        # TODO rm?
-        self.inner_cells_with_inner_faces = (
-            [] + [np.ravel(self.cell_index[1:-1, ...], "F")]
-            if self.dim >= 1
-            else (
-                [] + [np.ravel(self.cell_index[:, 1:-1, ...], "F")]
-                if self.dim >= 2
-                else (
-                    [] + [np.ravel(self.cell_index[:, :, 1:-1, ...], "F")]
-                    if self.dim >= 3
-                    else []
-                )
-            )
+        """
+        mask = np.zeros(tuple(self.faces_shape[d]), dtype=bool)
+        interior = tuple(
+            slice(1, -1) if e != d or self.dim == 1 else slice(None)
+            for e in range(self.dim)
         )
-        """list: Indices of inner cells with inner faces."""
+        mask[interior] = True
+        return mask
 
-        # Info about cell corners for each face, referring to the reference cell. The
-        # order of the corners is the same as the one of the reference cell, and it is
-        # not taken into account the orientation of the face.
-        self.cell_corner_indices = np.zeros(
-            (self.num_faces, 2, 2 ** (self.dim - 1)), dtype=int
+    @cached_property
+    def interior_faces(self) -> list[np.ndarray]:
+        """list: Indices of interior faces."""
+        return [
+            self.face_slices[d].start
+            + np.flatnonzero(np.ravel(self._interior_face_mask(d), "F"))
+            for d in range(self.dim)
+        ]
+
+    @cached_property
+    def exterior_faces(self) -> list[np.ndarray]:
+        """list: Indices of faces on the outer boundary of the grid, sorted."""
+        return [
+            self.face_slices[d].start
+            + np.flatnonzero(np.ravel(~self._interior_face_mask(d), "F"))
+            for d in range(self.dim)
+        ]
+
+    def _cell_layer(self, d: int, side: int) -> np.ndarray:
+        """Flat indices of cells with a face on the upper (0) or lower (1) side.
+
+        The order coincides with the ordering of the faces of axis d.
+
+        """
+        layer = tuple(
+            (slice(0, -1) if side == 0 else slice(1, None)) if e == d else slice(None)
+            for e in range(self.dim)
         )
-        """np.ndarray: Indices of neighbouring cell corners for each face."""
+        return np.ravel(self.cell_index[layer], "F")
 
-        if self.dim == 1:
-            self.cell_corner_indices[self.faces[0], 0, 0] = 1
-            self.cell_corner_indices[self.faces[0], 1, 0] = 0
+    @cached_property
+    def connectivity(self) -> np.ndarray:
+        """np.ndarray: Connectivity (and direction) of faces to cells."""
+        connectivity = np.empty((self.num_faces, 2), dtype=int)
+        for d in range(self.dim):
+            for side in range(2):
+                connectivity[self.face_slices[d], side] = self._cell_layer(d, side)
+        return connectivity
+
+    @cached_property
+    def reverse_connectivity(self) -> np.ndarray:
+        """np.ndarray: Reverse connectivity (and direction) of cells to faces.
+
+        NOTE: The first components addresses the normal direction of the face, the
+        second the cell, the third the relative position of the face in the cell.
+
+        """
+        reverse_connectivity = -np.ones((self.dim, self.num_cells, 2), dtype=int)
+        for d in range(self.dim):
+            reverse_connectivity[d, self._cell_layer(d, 1), 0] = self.faces[d]
+            reverse_connectivity[d, self._cell_layer(d, 0), 1] = self.faces[d]
+        return reverse_connectivity
+
+    @cached_property
+    def inner_cells_with_inner_faces(self) -> list[np.ndarray]:
+        """list: Indices of inner cells with inner faces."""
+        # TODO rm?
+        return [np.ravel(self.cell_index[1:-1, ...], "F")]
 
-        elif self.dim == 2:
-            self.cell_corner_indices[self.faces[0], 0, 0] = 1
-            self.cell_corner_indices[self.faces[0], 0, 1] = 2
-            self.cell_corner_indices[self.faces[0], 1, 0] = 0
-            self.cell_corner_indices[self.faces[0], 1, 1] = 3
-            self.cell_corner_indices[self.faces[1], 0, 0] = 3
-            self.cell_corner_indices[self.faces[1], 0, 1] = 2
-            self.cell_corner_indices[self.faces[1], 1, 0] = 0
-            self.cell_corner_indices[self.faces[1], 1, 1] = 1
+    @cached_property
+    def cell_corner_indices(self) -> np.ndarray:
+        """np.ndarray: Indices of neighbouring cell corners for each face.
 
-        elif self.dim == 3:
-            self.cell_corner_indices[self.faces[0], 0, 0] = 1
-            self.cell_corner_indices[self.faces[0], 0, 1] = 2
-            self.cell_corner_indices[self.faces[0], 0, 2] = 5
-            self.cell_corner_indices[self.faces[0], 0, 3] = 6
-            self.cell_corner_indices[self.faces[0], 1, 0] = 0
-            self.cell_corner_indices[self.faces[0], 1, 1] = 3
-            self.cell_corner_indices[self.faces[0], 1, 2] = 4
-            self.cell_corner_indices[self.faces[0], 1, 3] = 7
-            self.cell_corner_indices[self.faces[1], 0, 0] = 3
-            self.cell_corner_indices[self.faces[1], 0, 1] = 2
-            self.cell_corner_indices[self.faces[1], 0, 2] = 7
-            self.cell_corner_indices[self.faces[1], 0, 3] = 6
-            self.cell_corner_indices[self.faces[1], 1, 0] = 0
-            self.cell_corner_indices[self.faces[1], 1, 1] = 1
-            self.cell_corner_indices[self.faces[1], 1, 2] = 4
-            self.cell_corner_indices[self.faces[1], 1, 3] = 5
-            self.cell_corner_indices[self.faces[2], 0, 0] = 4
-            self.cell_corner_indices[self.faces[2], 0, 1] = 5
-            self.cell_corner_indices[self.faces[2], 0, 2] = 6
-            self.cell_corner_indices[self.faces[2], 0, 3] = 7
-            self.cell_corner_indices[self.faces[2], 1, 0] = 0
-            self.cell_corner_indices[self.faces[2], 1, 1] = 1
-            self.cell_corner_indices[self.faces[2], 1, 2] = 2
-            self.cell_corner_indices[self.faces[2], 1, 3] = 3
+        NOTE: Prefer the compact axis_corner_indices.
+
+        """
+        return np.concatenate(
+            [
+                np.broadcast_to(
+                    self.axis_corner_indices[d],
+                    (self.num_faces_per_axis[d], *self.axis_corner_indices[d].shape),
+                )
+                for d in range(self.dim)
+            ]
+        )
+
+    def memory_footprint(self) -> dict:
+        """Memory occupied by the materialized index arrays of the grid.
+
+        Returns:
+            dict: size in bytes of each materialized array, and the total size
+                ("total"). Arrays not accessed so far are not listed.
+
+        """
+        footprint = {}
+        for name in _LAZY_ATTRIBUTES:
+            if name in self.__dict__:
+                value = self.__dict__[name]
+                arrays = value if isinstance(value, list) else [value]
+                footprint[name] = sum(array.nbytes for array in arrays)
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    # ! ---- Operators ----
+
+    def cell_reconstruction(self, pts: np.ndarray) -> "darsia.FVCellReconstruction":
+        """Cached reconstruction of cell fluxes from face fluxes at fixed points.
+
+        Args:
+            pts (np.ndarray): points relative to the reference cell [0,1]**dim, in
+                matrix-indexing, one per row.
+
+        Returns:
+            FVCellReconstruction: reconstruction operator, shared for identical pts.
+
+        """
+        pts = np.reshape(np.asarray(pts, dtype=float), (-1, self.dim))
+        key = pts.tobytes()
+        if key not in self._cell_reconstructions:
+            self._cell_reconstructions[key] = darsia.FVCellReconstruction(self, pts)
+        return self._cell_reconstructions[key]
 
 
 def generate_grid(image: darsia.Image) -> Grid:
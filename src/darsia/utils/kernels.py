@@ -4,13 +4,155 @@ Provided:
     * Linear kernel
     * Gaussian kernel
 
+Linear combinations of kernels, as used for kernel-based interpolation of signals,
+are evaluated by compiled (numba) kernels defined on module level, such that they
+are compiled (or loaded from cache) once per process. Compilation is triggered on
+first use, explicitly through warmup_kernels(), or at import if the environment
+variable DARSIA_PRECOMPILE_KERNELS is set.
+
 """
 
+import os
 from abc import ABC, abstractmethod
+from typing import Optional
 
 import numba
 import numpy as np
 
+# ! ---- Compiled kernels
+
+
+@numba.njit(fastmath=True, cache=True)
+def _linear_value(
+    signal: np.ndarray, effective_support: np.ndarray, shift: float
+) -> float:
+    """Linear combination of linear kernels for a single pixel."""
+    value = shift
+    for k in range(signal.shape[0]):
+        value += signal[k] * effective_support[k]
+    return value
+
+
+@numba.njit(fastmath=True, cache=True)
+def _linear_combination_serial(
+    signal: np.ndarray,
+    effective_support: np.ndarray,
+    shift: float,
+    output: np.ndarray,
+) -> None:
+    """Linear combination of linear kernels for flat signal (num_pixels x dim)."""
+    for i in range(signal.shape[0]):
+        output[i] = _linear_value(signal[i], effective_support, shift)
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _linear_combination_parallel(
+    signal: np.ndarray,
+    effective_support: np.ndarray,
+    shift: float,
+    output: np.ndarray,
+) -> None:
+    """Linear combination of linear kernels for flat signal, parallel over pixels."""
+    for i in numba.prange(signal.shape[0]):
+        output[i] = _linear_value(signal[i], effective_support, shift)
+
+
+@numba.njit(fastmath=True, cache=True)
+def _gaussian_value(
+    signal: np.ndarray,
+    supports: np.ndarray,
+    interpolation_weights: np.ndarray,
+    gamma: float,
+) -> float:
+    """Linear combination of Gaussian kernels for a single pixel."""
+    value = 0.0
+    for n in range(supports.shape[0]):
+        distance = 0.0
+        for k in range(signal.shape[0]):
+            diff = signal[k] - supports[n, k]
+            distance += diff * diff
+        value += interpolation_weights[n] * np.exp(-gamma * distance)
+    return value
+
+
+@numba.njit(fastmath=True, cache=True)
+def _gaussian_combination_serial(
+    signal: np.ndarray,
+    supports: np.ndarray,
+    interpolation_weights: np.ndarray,
+    gamma: float,
+    output: np.ndarray,
+) -> None:
+    """Linear combination of Gaussian kernels for flat signal (num_pixels x dim)."""
+    for i in range(signal.shape[0]):
+        output[i] = _gaussian_value(signal[i], supports, interpolation_weights, gamma)
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _gaussian_combination_parallel(
+    signal: np.ndarray,
+    supports: np.ndarray,
+    interpolation_weights: np.ndarray,
+    gamma: float,
+    output: np.ndarray,
+) -> None:
+    """Linear combination of Gaussian kernels for flat signal, parallel over pixels."""
+    for i in numba.prange(signal.shape[0]):
+        output[i] = _gaussian_value(signal[i], supports, interpolation_weights, gamma)
+
+
+def _evaluate_chunked(
+    compiled_kernel,
+    signal: np.ndarray,
+    arguments: tuple,
+    chunk_size: Optional[int] = None,
+) -> np.ndarray:
+    """Evaluate compiled kernel for signal of arbitrary shape, chunk by chunk.
+
+    Only chunks of the signal are converted to contiguous float32 arrays, bounding
+    the temporary memory for large signals.
+
+    Args:
+        compiled_kernel (callable): compiled kernel, operating on flat signals.
+        signal (np.ndarray): signal with data dimension as last axis.
+        arguments (tuple): further arguments of the compiled kernel.
+        chunk_size (int, optional): number of pixels per chunk; all at once if None.
+
+    Returns:
+        np.ndarray: float32 values with the shape of the signal without last axis.
+
+    """
+    flat_signal = np.reshape(signal, (-1, signal.shape[-1]))
+    num_pixels = flat_signal.shape[0]
+    output = np.empty(num_pixels, dtype=np.float32)
+    chunk_size = num_pixels if chunk_size is None else max(chunk_size, 1)
+    for start in range(0, num_pixels, chunk_size):
+        stop = min(start + chunk_size, num_pixels)
+        compiled_kernel(
+            np.ascontiguousarray(flat_signal[start:stop], dtype=np.float32),
+            *arguments,
+            output[start:stop],
+        )
+    return output.reshape(signal.shape[:-1])[()]
+
+
+def warmup_kernels(parallel: bool = True) -> None:
+    """Compile (or load from cache) the compiled kernels, e.g., before timing.
+
+    Args:
+        parallel (bool): flag controlling whether the parallel or serial kernels are
+            compiled.
+
+    """
+    signal = np.zeros((1, 3), dtype=np.float32)
+    for kernel in [LinearKernel(parallel=parallel), GaussianKernel(parallel=parallel)]:
+        kernel.linear_combination(
+            signal, np.zeros((1, 3), dtype=np.float32), np.ones(1, dtype=np.float32)
+        )
+
+
+# ! ---- Kernels
+
 
 class BaseKernel(ABC):
     """Abstract base class for kernel."""
@@ -29,6 +171,21 @@ class BaseKernel(ABC):
         """
         pass
 
+    def gram_matrix(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute kernel matrix between two sets of points at once.
+
+        Args:
+            x (np.ndarray): first set of points, shape (n, d)
+            y (np.ndarray, optional): second set of points, shape (m, d); x if None
+
+        Returns:
+            np.ndarray: kernel matrix of shape (n, m)
+
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = x if y is None else np.asarray(y, dtype=np.float64)
+        return self.__call__(x[:, np.newaxis, :], y[np.newaxis, :, :])
+
     def linear_combination(self, signal: np.ndarray, supports, interpolation_weights):
         num_supports = len(supports)
         if num_supports == 0:
@@ -48,9 +205,15 @@ class LinearKernel(BaseKernel):
 
     """
 
-    def __init__(self, a: float = 0):
+    def __init__(
+        self, a: float = 0, parallel: bool = True, chunk_size: Optional[int] = None
+    ):
         self.a = a
         """Shift of the kernel."""
+        self.parallel = parallel
+        """Flag controlling whether linear combinations are evaluated in parallel."""
+        self.chunk_size = chunk_size
+        """Number of pixels evaluated at once in linear combinations."""
 
     def __call__(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
         """Compute kernel between two arrays.
@@ -65,13 +228,31 @@ class LinearKernel(BaseKernel):
         """
         return np.sum(np.multiply(x, y), axis=-1) + self.a
 
+    def gram_matrix(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute kernel matrix between two sets of points at once.
+
+        Args:
+            x (np.ndarray): first set of points, shape (n, d)
+            y (np.ndarray, optional): second set of points, shape (m, d); x if None
+
+        Returns:
+            np.ndarray: kernel matrix of shape (n, m)
+
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = x if y is None else np.asarray(y, dtype=np.float64)
+        return x @ y.T + self.a
+
     def linear_combination(
         self,
         signal: np.ndarray,
         supports: np.ndarray,
         interpolation_weights: np.ndarray,
     ) -> np.ndarray:
-        """Linear combination using a numba version of the Gaussian kernel.
+        """Linear combination using a compiled version of the linear kernel.
+
+        The linear combination of linear kernels reduces to a single inner product
+        with the weighted sum of the supports.
 
         Args:
             signal (np.ndarray): signal to be interpolated
@@ -82,46 +263,36 @@ class LinearKernel(BaseKernel):
             np.ndarray: interpolated signal
 
         """
-
-        @numba.jit(
-            [
-                "float32(float32[:], float32[:,:], float32[:], float32)",
-                "float32[:](float32[:,:], float32[:,:], float32[:], float32)",
-                "float32[:,:](float32[:,:,:], float32[:,:], float32[:], float32)",
-            ],
-            nopython=True,
-            parallel=True,
-            fastmath=True,
-            cache=True,
+        effective_support = np.ascontiguousarray(
+            np.asarray(interpolation_weights, dtype=np.float32)
+            @ np.asarray(supports, dtype=np.float32)
+        )
+        shift = np.float32(self.a * np.sum(interpolation_weights))
+        compiled_kernel = (
+            _linear_combination_parallel
+            if self.parallel
+            else _linear_combination_serial
         )
-        def _linear_combination_numba(
-            signal: np.ndarray,
-            supports: np.ndarray,
-            interpolation_weights: np.ndarray,
-            a: float,
-        ):
-            """Linear combination of the linear kernel."""
-            num_supports = len(supports)
-            output = interpolation_weights[0] * (
-                np.sum(np.multiply(signal, supports[0]), axis=-1) + a
-            )
-            for n in range(1, num_supports):
-                output += interpolation_weights[n] * (
-                    np.sum(np.multiply(signal, supports[n]), axis=-1) + a
-                )
-            return output
-
-        return _linear_combination_numba(
-            signal, supports, interpolation_weights, self.a
+        return _evaluate_chunked(
+            compiled_kernel, signal, (effective_support, shift), self.chunk_size
         )
 
 
 class GaussianKernel(BaseKernel):
     """Gaussian kernel."""
 
-    def __init__(self, gamma: float = 1.0):
+    def __init__(
+        self,
+        gamma: float = 1.0,
+        parallel: bool = True,
+        chunk_size: Optional[int] = None,
+    ):
         self.gamma = np.float32(gamma)
         """Gamma parameter of the kernel."""
+        self.parallel = parallel
+        """Flag controlling whether linear combinations are evaluated in parallel."""
+        self.chunk_size = chunk_size
+        """Number of pixels evaluated at once in linear combinations."""
 
     def __call__(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
         """Compute kernel between two arrays.
@@ -135,13 +306,37 @@ class GaussianKernel(BaseKernel):
         """
         return np.exp(-self.gamma * np.sum(np.multiply(x - y, x - y), axis=-1))
 
+    def gram_matrix(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute kernel matrix between two sets of points at once.
+
+        Squared distances are computed through inner products, avoiding the
+        allocation of all pairwise differences.
+
+        Args:
+            x (np.ndarray): first set of points, shape (n, d)
+            y (np.ndarray, optional): second set of points, shape (m, d); x if None
+
+        Returns:
+            np.ndarray: kernel matrix of shape (n, m)
+
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = x if y is None else np.asarray(y, dtype=np.float64)
+        squared_distances = (
+            np.sum(x**2, axis=1)[:, np.newaxis]
+            + np.sum(y**2, axis=1)[np.newaxis, :]
+            - 2 * x @ y.T
+        )
+        np.maximum(squared_distances, 0, out=squared_distances)
+        return np.exp(-float(self.gamma) * squared_distances)
+
     def linear_combination(
         self,
         signal: np.ndarray,
         supports: np.ndarray,
         interpolation_weights: np.ndarray,
     ) -> np.ndarray:
-        """Linear combination using a numba version of the Gaussian kernel.
+        """Linear combination using a compiled version of the Gaussian kernel.
 
         Args:
             signal (np.ndarray): signal to be interpolated
@@ -152,37 +347,18 @@ class GaussianKernel(BaseKernel):
             np.ndarray: interpolated signal
 
         """
-
-        @numba.jit(
-            [
-                "float32(float32[:], float32[:,:], float32[:], float32)",
-                "float32[:](float32[:,:], float32[:,:], float32[:], float32)",
-                "float32[:,:](float32[:,:,:], float32[:,:], float32[:], float32)",
-            ],
-            nopython=True,
-            parallel=True,
-            fastmath=True,
-            cache=True,
+        compiled_kernel = (
+            _gaussian_combination_parallel
+            if self.parallel
+            else _gaussian_combination_serial
         )
-        def _linear_combination_numba(
-            signal: np.ndarray,
-            supports: np.ndarray,
-            interpolation_weights: np.ndarray,
-            gamma: float,
-        ):
-            """Linear combination of the Gaussian kernel."""
-            num_supports = len(supports)
-            diff = signal - supports[0]
-            output = interpolation_weights[0] * np.exp(
-                -gamma * np.sum(np.multiply(diff, diff), axis=-1)
-            )
-            for n in range(1, num_supports):
-                diff = signal - supports[n]
-                output += interpolation_weights[n] * np.exp(
-                    -gamma * np.sum(np.multiply(diff, diff), axis=-1)
-                )
-            return output
-
-        return _linear_combination_numba(
-            signal, supports, interpolation_weights, self.gamma
+        arguments = (
+            np.ascontiguousarray(supports, dtype=np.float32),
+            np.ascontiguousarray(interpolation_weights, dtype=np.float32),
+            self.gamma,
         )
+        return _evaluate_chunked(compiled_kernel, signal, arguments, self.chunk_size)
+
+
+if os.environ.get("DARSIA_PRECOMPILE_KERNELS"):
+    warmup_kernels()
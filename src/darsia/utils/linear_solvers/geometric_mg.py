@@ -0,0 +1,554 @@
+"""Geometric multigrid for heterogeneous diffusion problems on Cartesian grids.
+
+The problem mass_coeff * x - div(diffusion_coeff * grad(x)) = rhs is discretized by
+cell-centered finite volumes with homogeneous Neumann boundary conditions. Cell-based
+diffusion coefficients are averaged to faces. For constant coefficients, the
+discretization coincides with the one used by darsia.Jacobi.
+
+Coarse cells are blocks of 2**dim fine cells (fewer at odd boundaries). Corrections
+are prolongated piecewise constant (P), and residuals are restricted by summation
+over blocks (R = P^T), such that coarse operators are assembled from sums of fine
+quantities, in the spirit of a Galerkin operator R A P: the mass is summed over
+blocks, and coarse transmissibilities are summed over the fine faces forming the
+coarse faces. Normal to the coarse faces, the fine transmissibilities between the
+coarse cell centers (the faces inside both blocks and the face in between) are
+combined in series, such that layers of low diffusivity inside blocks are seen by
+the coarse operator. For constant coefficients, this coincides with
+rediscretization, and amounts to half the Galerkin transmissibility (a classical
+over-correction of piecewise constant prolongation). Coarse transmissibilities are
+bounded from below by half the Galerkin transmissibility; the coarse operator thus
+lies between half the Galerkin operator and the Galerkin operator, which guarantees
+that coarse grid corrections do not increase the energy norm of the error.
+Symmetric red-black Gauss-Seidel is used for smoothing, and the coarsest problem is
+solved directly. As piecewise constant prolongation cannot resolve all
+heterogeneities, cycles are by default accelerated by the conjugate gradient method.
+
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numba
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg
+
+import darsia as da
+
+# ! ---- Compiled smoothers
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _red_black_sweep_2d(
+    x: np.ndarray,
+    rhs: np.ndarray,
+    diag: np.ndarray,
+    t0: np.ndarray,
+    t1: np.ndarray,
+    color: int,
+) -> None:
+    """Gauss-Seidel update of all cells of one color ((i + j) % 2), in place."""
+    n0, n1 = x.shape
+    for i in numba.prange(n0):
+        for j in range((i + color) % 2, n1, 2):
+            s = rhs[i, j]
+            if i > 0:
+                s += t0[i - 1, j] * x[i - 1, j]
+            if i < n0 - 1:
+                s += t0[i, j] * x[i + 1, j]
+            if j > 0:
+                s += t1[i, j - 1] * x[i, j - 1]
+            if j < n1 - 1:
+                s += t1[i, j] * x[i, j + 1]
+            x[i, j] = s / diag[i, j]
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _red_black_sweep_3d(
+    x: np.ndarray,
+    rhs: np.ndarray,
+    diag: np.ndarray,
+    t0: np.ndarray,
+    t1: np.ndarray,
+    t2: np.ndarray,
+    color: int,
+) -> None:
+    """Gauss-Seidel update of all cells of one color ((i + j + k) % 2), in place."""
+    n0, n1, n2 = x.shape
+    for i in numba.prange(n0):
+        for j in range(n1):
+            for k in range((i + j + color) % 2, n2, 2):
+                s = rhs[i, j, k]
+                if i > 0:
+                    s += t0[i - 1, j, k] * x[i - 1, j, k]
+                if i < n0 - 1:
+                    s += t0[i, j, k] * x[i + 1, j, k]
+                if j > 0:
+                    s += t1[i, j - 1, k] * x[i, j - 1, k]
+                if j < n1 - 1:
+                    s += t1[i, j, k] * x[i, j + 1, k]
+                if k > 0:
+                    s += t2[i, j, k - 1] * x[i, j, k - 1]
+                if k < n2 - 1:
+                    s += t2[i, j, k] * x[i, j, k + 1]
+                x[i, j, k] = s / diag[i, j, k]
+
+
+class _MGLevel:
+    """Discrete operator and work arrays of a single multigrid level."""
+
+    def __init__(self, mass: np.ndarray, transmissibilities: list[np.ndarray]) -> None:
+        """Setup of the level.
+
+        Args:
+            mass (array): cell-based mass coefficient (scaled by the cell volume
+                relative to the finest level).
+            transmissibilities (list of arrays): transmissibilities of inner faces of
+                each axis (shape reduced by one along the axis).
+
+        """
+        self.shape = mass.shape
+        """Shape of the grid."""
+
+        self.dim = mass.ndim
+        """Dimension of the grid."""
+
+        self.mass = mass
+        """Mass coefficient."""
+
+        self.transmissibilities = transmissibilities
+        """Transmissibilities of the faces."""
+
+        self.slices = [
+            (
+                da.array_slice_argument(mass, d, 0, -1),
+                da.array_slice_argument(mass, d, 1, None),
+            )
+            for d in range(self.dim)
+        ]
+        """Slices of cells on the lower and upper side of the faces of each axis."""
+
+        self.diag = mass.copy()
+        """Diagonal of the operator."""
+
+        for d, (lower, upper) in enumerate(self.slices):
+            self.diag[lower] += self.transmissibilities[d]
+            self.diag[upper] += self.transmissibilities[d]
+
+        parity = np.sum(np.indices(self.shape), axis=0) % 2
+        self.colors = [parity == 0, parity == 1]
+        """Red and black cells for vectorized Gauss-Seidel smoothing."""
+
+        self._neighbor_sum = np.empty(self.shape)
+        """Work array for the accumulation of weighted neighbors."""
+
+        self._residual = np.empty(self.shape)
+        """Work array for residuals."""
+
+        self._face_work = [np.empty(t.shape) for t in self.transmissibilities]
+        """Work arrays for fluxes."""
+
+        self.coarse_solve = None
+        """Direct solver, only set up for the coarsest level."""
+
+    def neighbor_sum(self, x: np.ndarray) -> np.ndarray:
+        """Accumulation of neighbors weighted by transmissibilities (work array)."""
+        out = self._neighbor_sum
+        out.fill(0.0)
+        for d, (lower, upper) in enumerate(self.slices):
+            work = self._face_work[d]
+            np.multiply(self.transmissibilities[d], x[upper], out=work)
+            out[lower] += work
+            np.multiply(self.transmissibilities[d], x[lower], out=work)
+            out[upper] += work
+        return out
+
+    def residual(self, x: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """Residual rhs - A x (work array)."""
+        np.multiply(self.diag, x, out=self._residual)
+        np.subtract(self.neighbor_sum(x), self._residual, out=self._residual)
+        self._residual += rhs
+        return self._residual
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        """Operator applied to x (work array)."""
+        out = self.neighbor_sum(x)
+        np.subtract(self.diag * x, out, out=out)
+        return out
+
+    def smooth(
+        self, x: np.ndarray, rhs: np.ndarray, iterations: int, reverse: bool = False
+    ) -> None:
+        """Red-black Gauss-Seidel sweeps, in place.
+
+        Compiled for 2d and 3d (x and rhs contiguous), vectorized otherwise.
+
+        Args:
+            x (array): approximation, updated in place
+            rhs (array): right hand side
+            iterations (int): number of sweeps
+            reverse (bool): flag controlling whether black cells are updated first;
+                used for postsmoothing, such that cycles are symmetric.
+
+        """
+        colors = [1, 0] if reverse else [0, 1]
+        if self.dim in [2, 3]:
+            sweep = _red_black_sweep_2d if self.dim == 2 else _red_black_sweep_3d
+            for _ in range(iterations):
+                for color in colors:
+                    sweep(x, rhs, self.diag, *self.transmissibilities, color)
+            return
+
+        for _ in range(iterations):
+            for color in [self.colors[c] for c in colors]:
+                update = self.neighbor_sum(x)
+                update += rhs
+                update /= self.diag
+                np.copyto(x, update, where=color)
+
+    def setup_coarse_solve(self) -> None:
+        """Assemble the operator as sparse matrix and factorize it."""
+        index = np.arange(np.prod(self.shape)).reshape(self.shape)
+        rows = [index.ravel()]
+        cols = [index.ravel()]
+        data = [self.diag.ravel()]
+        for d, (lower, upper) in enumerate(self.slices):
+            t = -self.transmissibilities[d].ravel()
+            rows += [index[lower].ravel(), index[upper].ravel()]
+            cols += [index[upper].ravel(), index[lower].ravel()]
+            data += [t, t]
+        mat = sps.csc_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(index.size, index.size),
+        )
+        self.coarse_solve = scipy.sparse.linalg.factorized(mat)
+
+
+def _block_sum(array: np.ndarray, axes: list[int]) -> np.ndarray:
+    """Sum over pairs of cells along axes; odd sizes leave single cells."""
+    for ax in axes:
+        if array.shape[ax] % 2 == 1:
+            pad_width = [(0, 1 if a == ax else 0) for a in range(array.ndim)]
+            array = np.pad(array, pad_width)
+        array = da.array_slice(array, ax, 0, None, 2) + da.array_slice(
+            array, ax, 1, None, 2
+        )
+    return array
+
+
+def _coarse_transmissibilities(t: np.ndarray, axis: int) -> np.ndarray:
+    """Transmissibilities of coarse faces normal to an axis.
+
+    Normal to the coarse faces, the fine faces 2I, 2I+1, 2I+2 between the centers of
+    the coarse cells I and I+1 are combined in series (the outer faces contribute
+    with half their extent), bounded from below by half the Galerkin
+    transmissibility (face 2I+1 only). Tangentially, fine faces are summed.
+
+    Args:
+        t (array): transmissibilities of fine faces normal to the axis.
+        axis (int): axis.
+
+    Returns:
+        array: transmissibilities of coarse faces normal to the axis.
+
+    """
+    num_faces = t.shape[axis]
+    num_coarse_faces = (num_faces + 2) // 2 - 1
+    if 2 * num_coarse_faces + 1 > num_faces:
+        # The last coarse cell consists of a single fine cell
+        pad_width = [(0, 1 if a == axis else 0) for a in range(t.ndim)]
+        t = np.pad(t, pad_width, mode="edge")
+    t0 = da.array_slice(t, axis, 0, 2 * num_coarse_faces, 2)
+    t1 = da.array_slice(t, axis, 1, 2 * num_coarse_faces, 2)
+    t2 = da.array_slice(t, axis, 2, 2 * num_coarse_faces + 1, 2)
+    with np.errstate(divide="ignore"):
+        series = np.where(
+            (t0 == 0) | (t1 == 0) | (t2 == 0),
+            0.0,
+            1.0 / (0.5 / t0 + 1.0 / t1 + 0.5 / t2),
+        )
+    return _block_sum(
+        np.maximum(series, 0.5 * t1), [a for a in range(t.ndim) if a != axis]
+    )
+
+
+def _prolongate(coarse: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    """Piecewise constant interpolation onto the fine grid of given shape."""
+    x = coarse
+    for ax, n in enumerate(shape):
+        x = da.array_slice(np.repeat(x, 2, axis=ax), ax, 0, n)
+    return x
+
+
+class GeometricMG(da.Solver):
+    """Geometric multigrid for the problem:
+    mass_coeff * x - div(diffusion_coeff * grad(x)) = rhs
+
+    Allows for heterogeneous mass and diffusion coefficients. Supports V-, W- and
+    F-cycles, and can be used as solver in darsia.split_bregman_tvd and
+    darsia.H1_regularization. The hierarchy is set up on first use, and reused as
+    long as neither the parameters nor the shape of the problem change. By default,
+    cycles are used as preconditioner for the conjugate gradient method, which is
+    more robust for coefficients varying within coarse cells; each iteration then
+    costs one cycle and one additional operator application.
+
+    Example:
+        solver = darsia.GeometricMG(cycle="W", maxiter=10, tol=1e-8)
+        denoised_img = darsia.split_bregman_tvd(img, mu=mu, solver=solver)
+
+    """
+
+    def __init__(
+        self,
+        depth: Optional[int] = None,
+        cycle: str = "V",
+        smoother_iterations: int = 2,
+        averaging: str = "harmonic",
+        coarse_size: int = 4,
+        acceleration: str = "cg",
+        maxiter: int = 1,
+        tol: Optional[float] = None,
+        dim: int = 2,
+        mass_coeff: Optional[Union[float, np.ndarray]] = None,
+        diffusion_coeff: Optional[Union[float, np.ndarray]] = None,
+        verbose=False,
+    ) -> None:
+        """Initialize the solver.
+
+        Args:
+            depth (int, optional): number of coarsening steps; coarsening continues
+                until the coarsest grid has less than 2 * coarse_size cells along an
+                axis if None.
+            cycle (str): "V", "W", or "F".
+            smoother_iterations (int): number of red-black Gauss-Seidel sweeps
+                before and after coarse grid corrections.
+            averaging (str): averaging of cell-based diffusion coefficients to faces,
+                "harmonic" or "arithmetic".
+            coarse_size (int): minimal number of cells along each axis of the coarsest
+                grid.
+            acceleration (str): "cg" for cycles preconditioning the (flexible)
+                conjugate gradient method, or "none" for plain cycles.
+            maxiter (int): maximal number of cycles.
+            tol (float, optional): tolerance for the residual, relative to the
+                initial residual; all maxiter cycles are performed if None.
+            dim (int): dimension of the problem
+            mass_coeff (np.ndarray or float): mass coefficient
+            diffusion_coeff (np.ndarray or float): diffusion coefficient
+            verbose (bool): print information
+
+        """
+        super().__init__(
+            maxiter=maxiter,
+            tol=tol,
+            dim=dim,
+            mass_coeff=mass_coeff,
+            diffusion_coeff=diffusion_coeff,
+            verbose=verbose,
+        )
+
+        assert cycle in ["V", "W", "F"], f"Cycle {cycle} not supported."
+        assert averaging in ["harmonic", "arithmetic"]
+        assert acceleration in ["cg", "none"]
+
+        self.depth = depth
+        """Number of coarsening steps."""
+
+        self.cycle = cycle
+        """Type of multigrid cycle."""
+
+        self.smoother_iterations = smoother_iterations
+        """Number of smoothing sweeps per step."""
+
+        self.averaging = averaging
+        """Averaging of diffusion coefficients to faces."""
+
+        self.coarse_size = coarse_size
+        """Minimal size of the coarsest grid along each axis."""
+
+        self.acceleration = acceleration
+        """Krylov acceleration of the cycles."""
+
+        self._h: Optional[float] = None
+        """Grid spacing of the finest grid of the hierarchy."""
+
+        self.levels: list[_MGLevel] = []
+        """Multigrid hierarchy, from fine to coarse."""
+
+        self.residuals: list[float] = []
+        """Norms of residuals of the last call (initial and after each cycle), only
+        monitored if a tolerance is set or verbose."""
+
+    def update_params(
+        self,
+        dim: Optional[int] = None,
+        mass_coeff: Optional[Union[float, np.ndarray]] = None,
+        diffusion_coeff: Optional[Union[float, np.ndarray]] = None,
+    ) -> None:
+        """Update parameters of the solver, and reset the hierarchy.
+
+        Args:
+            dim (int, optional): spatial dimension of the problem
+            mass_coeff (float or array, optional): mass coefficient
+            diffusion_coeff (float or array, optional): diffusion coefficient
+
+        """
+        super().update_params(dim, mass_coeff, diffusion_coeff)
+        self.levels = []
+
+    # ! ---- Setup
+
+    def _face_coeffs(self, shape: tuple[int, ...]) -> list[np.ndarray]:
+        """Average cell-based diffusion coefficients to inner faces of each axis."""
+        coeff = np.broadcast_to(np.asarray(self.diffusion_coeff, dtype=float), shape)
+        face_coeffs = []
+        for d in range(len(shape)):
+            lower = da.array_slice(coeff, d, 0, -1)
+            upper = da.array_slice(coeff, d, 1, None)
+            if self.averaging == "arithmetic":
+                face_coeffs.append(0.5 * (lower + upper))
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    face_coeffs.append(
+                        np.where(
+                            lower * upper == 0,
+                            0.0,
+                            2.0 * lower * upper / (lower + upper),
+                        )
+                    )
+        return face_coeffs
+
+    def setup(self, shape: tuple[int, ...], h: float = 1.0) -> None:
+        """Setup of the multigrid hierarchy.
+
+        Args:
+            shape (tuple of int): shape of the problem
+            h (float): grid spacing of the finest grid
+
+        """
+        mass = np.array(
+            np.broadcast_to(np.asarray(self.mass_coeff, dtype=float), shape)
+        )
+        self._h = h
+        self.levels = [_MGLevel(mass, [k / h**2 for k in self._face_coeffs(shape)])]
+
+        while (self.depth is None or len(self.levels) <= self.depth) and min(
+            self.levels[-1].shape
+        ) >= 2 * self.coarse_size:
+            fine = self.levels[-1]
+            self.levels.append(
+                _MGLevel(
+                    _block_sum(fine.mass, list(range(fine.dim))),
+                    [
+                        _coarse_transmissibilities(t, d)
+                        for d, t in enumerate(fine.transmissibilities)
+                    ],
+                )
+            )
+
+        self.levels[-1].setup_coarse_solve()
+
+    # ! ---- Cycles
+
+    def _cycle(self, level: int, x: np.ndarray, rhs: np.ndarray, cycle: str) -> None:
+        """Single multigrid cycle, updating x in place.
+
+        Args:
+            level (int): index of the level
+            x (array): approximation, updated in place
+            rhs (array): right hand side
+            cycle (str): "V", "W", or "F"
+
+        """
+        current = self.levels[level]
+        if level == len(self.levels) - 1:
+            x[...] = np.reshape(current.coarse_solve(rhs.ravel()), current.shape)
+            return
+
+        # Presmoothing
+        current.smooth(x, rhs, self.smoother_iterations)
+
+        # Coarse grid correction(s)
+        coarse_rhs = _block_sum(current.residual(x, rhs), list(range(current.dim)))
+        correction = np.zeros_like(coarse_rhs)
+        if cycle == "V":
+            self._cycle(level + 1, correction, coarse_rhs, "V")
+        elif cycle == "W":
+            self._cycle(level + 1, correction, coarse_rhs, "W")
+            self._cycle(level + 1, correction, coarse_rhs, "W")
+        else:
+            self._cycle(level + 1, correction, coarse_rhs, "F")
+            self._cycle(level + 1, correction, coarse_rhs, "V")
+        x += _prolongate(correction, current.shape)
+
+        # Postsmoothing, in reverse order
+        current.smooth(x, rhs, self.smoother_iterations, reverse=True)
+
+    def _precondition(self, residual: np.ndarray) -> np.ndarray:
+        """Single cycle with zero initial guess."""
+        z = np.zeros_like(residual)
+        self._cycle(0, z, residual, self.cycle)
+        return z
+
+    def __call__(self, x0: np.ndarray, rhs: np.ndarray, h: float = 1.0) -> np.ndarray:
+        """Multigrid cycles until the residual is sufficiently reduced.
+
+        Args:
+            x0 (np.ndarray): initial guess
+            rhs (np.ndarray): right hand side
+            h (float): grid spacing
+
+        Returns:
+            np.ndarray: approximation to the solution
+
+        """
+        if len(self.levels) == 0 or self.levels[0].shape != rhs.shape or self._h != h:
+            self.setup(rhs.shape, h)
+
+        x = np.array(x0, dtype=float)
+        rhs = np.ascontiguousarray(rhs, dtype=float)
+        monitor = self.tol is not None or self.verbose
+        self.residuals = []
+        finest = self.levels[0]
+        if self.acceleration == "cg":
+            residual = finest.residual(x, rhs).copy()
+            residual_change = np.zeros_like(residual)
+            direction = np.zeros_like(residual)
+            rz = 1.0
+        if monitor:
+            self.residuals.append(np.linalg.norm(finest.residual(x, rhs)))
+        for i in range(self.maxiter):
+            if self.acceleration == "cg":
+                # Flexible (Polak-Ribiere) update, as F-cycles are not symmetric
+                z = self._precondition(residual)
+                direction = z + np.vdot(z, residual_change) / rz * direction
+                rz = np.vdot(z, residual)
+                operator_direction = finest.apply(direction)
+                curvature = np.vdot(direction, operator_direction)
+                if rz <= 0 or curvature <= 0:
+                    break
+                alpha = rz / curvature
+                x += alpha * direction
+                np.multiply(-alpha, operator_direction, out=residual_change)
+                residual += residual_change
+            else:
+                self._cycle(0, x, rhs, self.cycle)
+            if monitor:
+                self.residuals.append(
+                    np.linalg.norm(
+                        residual
+                        if self.acceleration == "cg"
+                        else finest.residual(x, rhs)
+                    )
+                )
+                if self.verbose:
+                    print(
+                        f"Multigrid {self.cycle}-cycle {i} - "
+                        f"residual: {self.residuals[-1]}"
+                    )
+                if (
+                    self.tol is not None
+                    and self.residuals[-1] <= self.tol * self.residuals[0]
+                ):
+                    break
+        return x
@@ -1,15 +1,79 @@
 """Jacobi solver for linear systems. To be used either as a solver or as a smoother.
 
+For 2d and 3d arrays, sweeps are performed by compiled (numba) stencil kernels
+alternating between two preallocated buffers, such that no memory is allocated per
+sweep.
+
 """
 
 from __future__ import annotations
 
-from typing import Union
+from typing import Optional, Union
 
+import numba
 import numpy as np
 
 import darsia as da
 
+# ! ---- Compiled sweeps
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _jacobi_sweep_2d(
+    x: np.ndarray, rhs_scaled: np.ndarray, weight: np.ndarray, out: np.ndarray
+) -> float:
+    """Single Jacobi sweep with ghost copies on the boundary.
+
+    Computes out = rhs_scaled + weight * neighbor_accumulation(x).
+
+    Returns:
+        float: squared norm of the increment out - x
+
+    """
+    n0, n1 = x.shape
+    increment = 0.0
+    for i in numba.prange(n0):
+        im = max(i - 1, 0)
+        ip = min(i + 1, n0 - 1)
+        for j in range(n1):
+            jm = max(j - 1, 0)
+            jp = min(j + 1, n1 - 1)
+            value = rhs_scaled[i, j] + weight[i, j] * (
+                x[im, j] + x[ip, j] + x[i, jm] + x[i, jp]
+            )
+            increment += (value - x[i, j]) ** 2
+            out[i, j] = value
+    return increment
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _jacobi_sweep_3d(
+    x: np.ndarray, rhs_scaled: np.ndarray, weight: np.ndarray, out: np.ndarray
+) -> float:
+    """Single Jacobi sweep with ghost copies on the boundary, see _jacobi_sweep_2d."""
+    n0, n1, n2 = x.shape
+    increment = 0.0
+    for i in numba.prange(n0):
+        im = max(i - 1, 0)
+        ip = min(i + 1, n0 - 1)
+        for j in range(n1):
+            jm = max(j - 1, 0)
+            jp = min(j + 1, n1 - 1)
+            for k in range(n2):
+                km = max(k - 1, 0)
+                kp = min(k + 1, n2 - 1)
+                value = rhs_scaled[i, j, k] + weight[i, j, k] * (
+                    x[im, j, k]
+                    + x[ip, j, k]
+                    + x[i, jm, k]
+                    + x[i, jp, k]
+                    + x[i, j, km]
+                    + x[i, j, kp]
+                )
+                increment += (value - x[i, j, k]) ** 2
+                out[i, j, k] = value
+    return increment
+
 
 class Jacobi(da.Solver):
     """Jacobi solver for the problem:
@@ -18,10 +82,63 @@ class Jacobi(da.Solver):
     Can be used either as a solver or as a smoother.
 
     TODO: Add possibility to actually have a heterogeneous diffusion coefficient.
-    As of now it is assumed to be constant, or multiplied after Laplacian.
+    As of now it is assumed to be constant, or multiplied after Laplacian. See
+    darsia.GeometricMG for heterogeneous diffusion coefficients.
 
     """
 
+    def __init__(
+        self,
+        maxiter: int = 1,
+        tol: Optional[float] = None,
+        dim: int = 2,
+        mass_coeff: Optional[Union[float, np.ndarray]] = None,
+        diffusion_coeff: Optional[Union[float, np.ndarray]] = None,
+        verbose=False,
+        check_every: int = 1,
+    ) -> None:
+        """Initialize the solver.
+
+        Args:
+            maxiter (int): maximum number of iterations
+            tol (float, optional): tolerance for the relative increment
+            dim (int): dimension of the problem
+            mass_coeff (np.ndarray or float): mass coefficient
+            diffusion_coeff (np.ndarray or float): diffusion coefficient
+            verbose (bool): print information
+            check_every (int): frequency of convergence checks (in sweeps) if tol
+                is provided
+
+        """
+        super().__init__(
+            maxiter=maxiter,
+            tol=tol,
+            dim=dim,
+            mass_coeff=mass_coeff,
+            diffusion_coeff=diffusion_coeff,
+            verbose=verbose,
+        )
+        self.check_every = max(check_every, 1)
+        """Frequency of convergence checks."""
+
+    def update_params(
+        self,
+        dim: Optional[int] = None,
+        mass_coeff: Optional[Union[float, np.ndarray]] = None,
+        diffusion_coeff: Optional[Union[float, np.ndarray]] = None,
+    ) -> None:
+        """Update parameters of the solver, and reset precomputed expressions.
+
+        Args:
+            dim (int, optional): spatial dimension of the problem
+            mass_coeff (float or array, optional): mass coefficient
+            diffusion_coeff (float or array, optional): diffusion coefficient
+
+        """
+        super().update_params(dim, mass_coeff, diffusion_coeff)
+        for attr in ["const_diag", "const_diag_scaled", "_weight"]:
+            self.__dict__.pop(attr, None)
+
     def _neighbor_accumulation(self, im: np.ndarray) -> np.ndarray:
         """Accumulation of neighbor pixels.
 
@@ -88,8 +205,6 @@ class Jacobi(da.Solver):
             np.ndarray: approximation to the linear system
 
         """
-        x: np.ndarray = x0
-
         # Main idea - Iteration is performed in non-residual form:
         #   x_new = np.divide(
         #       rhs + self.diffusion_coeff * self._neighbor_accumulation(x) / h**2,
@@ -97,15 +212,21 @@ class Jacobi(da.Solver):
         #   )
         # To reduce computations, the expression is mildly optimized.
 
-        # Precompute constant expressions
-        if not hasattr(self, "const_diag"):
+        # Precompute constant expressions (for fixed grid spacing)
+        if not hasattr(self, "const_diag") or self.__dict__.get("_h") != h:
+            self._h = h
             self.const_diag = self._diag(h)
-        if not hasattr(self, "const_diag_scaled"):
             self.const_diag_scaled = np.divide(
                 self.const_diag, self.diffusion_coeff / h**2
             )
+            self.__dict__.pop("_weight", None)
         rhs_scaled = np.divide(rhs, self.const_diag)
 
+        if x0.ndim in [2, 3]:
+            return self._compiled_sweeps(x0, rhs_scaled)
+
+        x: np.ndarray = x0
+
         # Split the tolerance based part to avoid unnecessary boolean evaluation
         if self.tol is None:
             for _ in range(self.maxiter):
@@ -131,3 +252,51 @@ class Jacobi(da.Solver):
                     )
 
         return x
+
+    def _compiled_sweeps(self, x0: np.ndarray, rhs_scaled: np.ndarray) -> np.ndarray:
+        """Jacobi sweeps for 2d and 3d arrays, alternating between two buffers.
+
+        The relative increment is only evaluated every check_every sweeps, and the
+        last iterate is returned upon convergence.
+
+        Args:
+            x0 (np.ndarray): initial guess
+            rhs_scaled (np.ndarray): right hand side scaled by the diagonal
+
+        Returns:
+            np.ndarray: approximation to the linear system
+
+        """
+        shape = x0.shape
+        sweep = _jacobi_sweep_2d if x0.ndim == 2 else _jacobi_sweep_3d
+
+        # Weight of neighbors, as full array
+        if "_weight" not in self.__dict__ or self._weight.shape != shape:
+            self._weight = np.ascontiguousarray(
+                np.broadcast_to(1.0 / np.asarray(self.const_diag_scaled), shape),
+                dtype=float,
+            )
+        rhs_scaled = np.ascontiguousarray(
+            np.broadcast_to(rhs_scaled, shape), dtype=float
+        )
+
+        # Ping-pong buffers; the input is only read
+        buffers = [np.empty(shape, dtype=float), np.empty(shape, dtype=float)]
+        x = np.asarray(x0, dtype=float)
+        x0_nrm = np.linalg.norm(x0) if self.tol is not None else 1.0
+        for i in range(self.maxiter):
+            x_new = buffers[i % 2]
+            increment = sweep(x, rhs_scaled, self._weight, x_new)
+            x = x_new
+            check = self.tol is not None and (i + 1) % self.check_every == 0
+            if check or self.verbose:
+                err = np.sqrt(increment) / x0_nrm
+                if self.verbose:
+                    print(
+                        f"Jacobi iteration {i} of {self.maxiter} completed with an "
+                        f"increment of norm {err}."
+                    )
+                if check and err < self.tol:
+                    break
+
+        return x
@@ -19,7 +19,8 @@ class MG(da.Solver):
     V-cycle.
 
     NOTE: Add possibility to actually have a heterogeneous diffusion coefficient. As of now it
-    is assumed to be constant, or multiplied after Laplacian.
+    is assumed to be constant, or multiplied after Laplacian. See darsia.GeometricMG for
+    a multigrid solver for heterogeneous diffusion coefficients.
     """
 
     def __init__(
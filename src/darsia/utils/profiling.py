@@ -0,0 +1,170 @@
+"""Opt-in profiling of iterative solvers.
+
+Iterative solvers report timings of single iterations (e.g., assembly, setup and
+solve of linear systems) in form of dictionaries. A SolverProfile collects these in a
+lightweight record, and optionally traces the memory consumption via tracemalloc.
+Since tracing slows down every allocation, memory profiling has to be requested
+explicitly. With profiling turned off, recording is a no-op.
+
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from enum import Enum
+from pathlib import Path
+from typing import Optional, Union
+
+
+class ProfilingLevel(Enum):
+    """Level of detail of profiling."""
+
+    OFF = "off"
+    TIMINGS = "timings"
+    MEMORY = "memory"
+
+
+class SolverProfile:
+    """Record of per-iteration timings and memory consumption of a single solve.
+
+    Example:
+        profile = darsia.SolverProfile(darsia.ProfilingLevel.TIMINGS)
+        profile.start()
+        for iter in range(num_iter):
+            ...
+            profile.record(iter, stats)
+        profile.stop()
+        profile.to_json("profile.json")
+
+    """
+
+    def __init__(self, level: Union[ProfilingLevel, str] = ProfilingLevel.OFF) -> None:
+        """Initialization.
+
+        Args:
+            level (ProfilingLevel or str): level of profiling - "off", "timings", or
+                "memory" (timings and peak memory consumption).
+
+        """
+        self.level = ProfilingLevel(level)
+        """Level of profiling."""
+
+        self.iterations: list[dict] = []
+        """Timings (in seconds) and, if traced, memory (in GB) of each iteration."""
+
+        self.total_time: Optional[float] = None
+        """Wall time between start and stop in seconds."""
+
+        self.peak_memory_consumption: Optional[float] = None
+        """Peak of traced memory in GB."""
+
+        self._tic = 0.0
+        """Start time."""
+
+        self._owns_tracing = False
+        """Flag whether tracemalloc has been started by this profile."""
+
+    @property
+    def enabled(self) -> bool:
+        """Flag whether any profiling is performed."""
+        return self.level != ProfilingLevel.OFF
+
+    @property
+    def trace_memory(self) -> bool:
+        """Flag whether memory is traced."""
+        return self.level == ProfilingLevel.MEMORY
+
+    # ! ---- Recording
+
+    def start(self) -> None:
+        """Start profiling, and memory tracing if requested."""
+        if not self.enabled:
+            return
+        self.iterations = []
+        self.peak_memory_consumption = None
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._owns_tracing = True
+        self._tic = time.perf_counter()
+
+    def record(self, iteration: int, stats: dict) -> None:
+        """Record the timings of a single iteration.
+
+        Args:
+            iteration (int): iteration index.
+            stats (dict): statistics of the iteration; entries starting with "time_"
+                are recorded.
+
+        """
+        if not self.enabled:
+            return
+        entry = {"iteration": iteration}
+        entry.update(
+            {key: value for key, value in stats.items() if key.startswith("time_")}
+        )
+        if self.trace_memory:
+            entry["memory"] = tracemalloc.get_traced_memory()[0] / 10**9
+        self.iterations.append(entry)
+
+    def stop(self) -> None:
+        """Stop profiling, and memory tracing if started by this profile."""
+        if not self.enabled:
+            return
+        self.total_time = time.perf_counter() - self._tic
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory_consumption = tracemalloc.get_traced_memory()[1] / 10**9
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    # ! ---- Output
+
+    def summary(self) -> dict:
+        """Accumulated timings over all iterations.
+
+        Returns:
+            dict: level, number of iterations, total time, sum of each timing, and
+                peak memory consumption (if traced).
+
+        """
+        summary = {
+            "level": self.level.value,
+            "number_iterations": len(self.iterations),
+            "total_time": self.total_time,
+        }
+        for entry in self.iterations:
+            for key, value in entry.items():
+                if key.startswith("time_"):
+                    summary[key] = summary.get(key, 0.0) + value
+        if self.trace_memory:
+            summary["peak_memory_consumption"] = self.peak_memory_consumption
+        return summary
+
+    def to_dict(self) -> dict:
+        """Conversion to dictionary.
+
+        Returns:
+            dict: summary and per-iteration record.
+
+        """
+        return {"summary": self.summary(), "iterations": self.iterations}
+
+    def to_json(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Export to JSON.
+
+        Args:
+            path (str or Path, optional): file to write to.
+
+        Returns:
+            str: JSON representation of the profile.
+
+        """
+        serialization = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            Path(path).write_text(serialization)
+        return serialization
@@ -0,0 +1,146 @@
+"""Test batch analysis of AnalysisBase."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+import darsia
+
+
+class MeanAnalysis(darsia.AnalysisBase):
+    """Minimal analysis, returning the mean value of each corrected image."""
+
+    def single_image_analysis(self, img: Path, **kwargs) -> float:
+        self.load_and_process_image(img)
+        return kwargs.get("scaling", 1.0) * float(np.mean(self.img.img))
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_batch_analysis(num_workers, tmp_path):
+    """Test serial and parallel batch analysis, with results in order of input."""
+
+    # Random images stored lossfree
+    paths = []
+    for i in range(4):
+        array = (np.random.rand(10, 20, 3) * 255).astype(np.uint8)
+        paths.append(tmp_path / f"image_{i}.png")
+        cv2.imwrite(str(paths[-1]), array, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+    config = tmp_path / "config.json"
+    with open(config, "w") as f:
+        json.dump({"physical_asset": {"dimensions": {"width": 2, "height": 1}}}, f)
+
+    # Analysis
+    analysis = MeanAnalysis(paths[0], config)
+    results = analysis.batch_analysis(paths, num_workers=num_workers, scaling=2.0)
+
+    # Compare with serial reading
+    expected = [2.0 * np.mean(darsia.imread(path).img) for path in paths]
+    assert np.allclose(results, expected)
+    assert len(analysis.batch_timings) == len(paths)
+    assert all(
+        np.isclose(t["read"] + t["analysis"], t["total"])
+        for t in analysis.batch_timings
+    )
+
+
+def test_cached_reading_detects_modified_corrections(tmp_path):
+    """Cached corrected images are not reused after corrections change in place."""
+
+    array = (np.random.rand(10, 20, 3) * 255).astype(np.uint8)
+    path = tmp_path / "image.png"
+    cv2.imwrite(str(path), array, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+    np.save(tmp_path / "translation.npy", np.array([[1.0, 0, 2], [0, 1, 0]]))
+    config = tmp_path / "config.json"
+    with open(config, "w") as f:
+        json.dump(
+            {
+                "physical_asset": {"dimensions": {"width": 2, "height": 1}},
+                "translation": str(tmp_path / "translation.npy"),
+                "cache": {"folder": str(tmp_path / "cache")},
+            },
+            f,
+        )
+    analysis = MeanAnalysis(path, config)
+
+    # Modify correction in place, and compare with uncached reading
+    hits = analysis.cache.statistics()["hits"]
+    analysis.translation_correction.translation[0, 2] = 5
+    image = analysis.load_and_process_image(path)
+    expected = darsia.imread(
+        path, transformations=[analysis.translation_correction], width=2, height=1
+    )
+    assert np.allclose(image.img, expected.img)
+    assert analysis.cache.statistics()["hits"] == hits
+
+    # Full checksums only if subsamples change, or once per batch
+    full_checksums = []
+    checksum = analysis.cache.checksum_transformations
+
+    def _counting_checksum(transformations, sample_size=None):
+        if sample_size is None:
+            full_checksums.append(True)
+        return checksum(transformations, sample_size)
+
+    analysis.cache.checksum_transformations = _counting_checksum
+    analysis.load_and_process_image(path)
+    analysis.load_and_process_image(path)
+    assert len(full_checksums) == 0
+    analysis.batch_analysis([path, path])
+    assert len(full_checksums) == 1
+
+
+def test_sampled_checksum(tmp_path):
+    """Subsampled checksums of large arrays detect changes of sampled entries."""
+
+    cache = darsia.CorrectionCache(tmp_path)
+    correction = SimpleNamespace(base=np.zeros((300, 400, 3)))
+    full, sampled = [
+        cache.checksum_transformations([correction], sample_size)
+        for sample_size in [None, 1000]
+    ]
+
+    # Modification of sampled entry
+    correction.base[0, 0, 0] = 1
+    sampled_modified = cache.checksum_transformations([correction], 1000)
+    assert sampled_modified != sampled
+
+    # Modification of entry not sampled, detected by the full checksum only
+    correction.base[0, 0, 0] = 0
+    correction.base[1, 1, 1] = 1
+    assert cache.checksum_transformations([correction], 1000) == sampled
+    assert cache.checksum_transformations([correction]) != full
+
+
+def test_parallel_batch_analysis_with_corrections(tmp_path):
+    """Test parallel batch analysis with drift and curvature corrections.
+
+    Worker processes receive the analysis incl. the state of the corrections, which
+    have been used already for the baseline image.
+
+    """
+    folder = Path(__file__).parent / "../../examples/images"
+    paths = [folder / f"co2_{i}.jpg" for i in range(3)]
+    if not all(path.exists() for path in paths + [folder / "config.json"]):
+        pytest.xfail("Images required for test not available.")
+
+    with open(folder / "config.json", "r") as f:
+        example_config = json.load(f)
+    config = tmp_path / "config.json"
+    with open(config, "w") as f:
+        json.dump(
+            {
+                "physical_asset": {"dimensions": {"width": 2.8, "height": 1.5}},
+                "drift": example_config["drift"],
+                "curvature": example_config["curvature"],
+            },
+            f,
+        )
+
+    analysis = MeanAnalysis(paths[0], config)
+    expected = analysis.batch_analysis(paths, num_workers=1)
+    results = analysis.batch_analysis(paths, num_workers=2)
+    assert np.allclose(results, expected)
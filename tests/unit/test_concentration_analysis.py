@@ -0,0 +1,331 @@
+"""Test ConcentrationAnalysis."""
+
+import numpy as np
+import pytest
+
+import darsia
+
+
+@pytest.mark.parametrize("diff_option", ["positive", "negative", "absolute", "plain"])
+@pytest.mark.parametrize("buffer_dtype", [np.float32, np.float64])
+def test_reuse_buffers(diff_option, buffer_dtype):
+    """Work arrays reproduce the default pipeline without modifying the input."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    baseline = [darsia.OpticalImage(rng.random(shape)) for _ in range(2)]
+    options = {
+        "base": baseline,
+        "signal_reduction": darsia.MonochromaticReduction(color="gray"),
+        "model": darsia.LinearModel(scaling=2.0),
+        "diff option": diff_option,
+    }
+    analysis = darsia.ConcentrationAnalysis(**options)
+    buffered_analysis = darsia.ConcentrationAnalysis(
+        **options, **{"reuse buffers": True, "buffer dtype": buffer_dtype}
+    )
+
+    arrays = [rng.random(shape), (255 * rng.random(shape)).astype(np.uint8)]
+    images = [darsia.OpticalImage(array.copy()) for array in arrays]
+    expected = [analysis(img).img for img in images]
+    results = [buffered_analysis(img).img for img in images]
+    for array, img, result, reference in zip(arrays, images, results, expected):
+        assert np.array_equal(img.img, array)
+        assert np.allclose(result, reference, atol=1e-5)
+
+    # Work arrays are allocated once per shape
+    assert len(buffered_analysis._buffers) == 2
+    assert all(
+        buffer.dtype == buffer_dtype for buffer in buffered_analysis._buffers.values()
+    )
+
+
+class CountingReduction(darsia.MonochromaticReduction):
+    """Gray reduction counting its evaluations."""
+
+    calls = 0
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        CountingReduction.calls += 1
+        return super().__call__(img)
+
+
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+def test_multi_concentration_analysis(reuse_buffers):
+    """Shared stages are evaluated once, and results agree with single analyses."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    baseline = darsia.OpticalImage(rng.random(shape))
+    options = {"diff option": "absolute", "reuse buffers": reuse_buffers}
+    analyses = {
+        "linear": darsia.ConcentrationAnalysis(
+            baseline.copy(),
+            CountingReduction(color="gray"),
+            model=darsia.LinearModel(scaling=2.0),
+            **options,
+        ),
+        "clip": darsia.ConcentrationAnalysis(
+            baseline.copy(),
+            CountingReduction(color="gray"),
+            model=darsia.ClipModel(min_value=0.1, max_value=0.2),
+            **options,
+        ),
+        "red": darsia.ConcentrationAnalysis(
+            baseline.copy(),
+            CountingReduction(color="red"),
+            **options,
+        ),
+    }
+    multi_analysis = darsia.MultiConcentrationAnalysis(analyses)
+
+    # Shared diff for all, and shared signal, cleaning, balancing and restoration for
+    # two analyses
+    assert multi_analysis.num_shared_stages == 2 + 4
+    assert multi_analysis.nodes["linear"] == multi_analysis.nodes["clip"]
+    assert multi_analysis.nodes["red"][0] == multi_analysis.nodes["linear"][0]
+    assert multi_analysis.nodes["red"][1] != multi_analysis.nodes["linear"][1]
+
+    img = darsia.OpticalImage(rng.random(shape))
+    expected = {name: analysis(img).img for name, analysis in analyses.items()}
+    CountingReduction.calls = 0
+    results = multi_analysis(img)
+    assert CountingReduction.calls == 2
+    for name in analyses:
+        assert np.allclose(results[name].img, expected[name])
+
+    # Reassigned baseline images are detected
+    analyses["red"].update(base=darsia.OpticalImage(rng.random(shape)))
+    results = multi_analysis(img)
+    assert multi_analysis.nodes["red"][0] != multi_analysis.nodes["linear"][0]
+    assert np.allclose(results["red"].img, analyses["red"](img).img)
+
+
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+def test_multi_concentration_analysis_modified_result(reuse_buffers):
+    """Results modified in place do not affect the cached shared stages."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    baseline = darsia.OpticalImage(rng.random(shape))
+    options = {"diff option": "absolute", "reuse buffers": reuse_buffers}
+    analyses = {
+        "plain": darsia.ConcentrationAnalysis(
+            baseline.copy(), darsia.MonochromaticReduction(color="gray"), **options
+        ),
+        "scaled": darsia.ConcentrationAnalysis(
+            baseline.copy(),
+            darsia.MonochromaticReduction(color="gray"),
+            model=darsia.LinearModel(scaling=2.0),
+            **options,
+        ),
+    }
+    multi_analysis = darsia.MultiConcentrationAnalysis(analyses)
+    assert multi_analysis.num_shared_stages == 5
+
+    img = darsia.OpticalImage(rng.random(shape))
+    expected = analyses["scaled"](img).img.copy()
+    multi_analysis.clear()
+    result = multi_analysis.analyze("plain", img)
+    result.img[:] = 0
+    assert np.allclose(multi_analysis.analyze("scaled", img).img, expected)
+
+
+@pytest.mark.parametrize("batch_size", [2 * 20 * 30, 2**21])
+def test_cleaning_filter(batch_size):
+    """The cleaning filter is the running maximum over batches of baseline images."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    baseline = [darsia.OpticalImage(rng.random(shape)) for _ in range(5)]
+    analysis = darsia.ConcentrationAnalysis(
+        baseline,
+        darsia.MonochromaticReduction(color="gray"),
+        **{"diff option": "plain", "batch size": batch_size},
+    )
+    expected = np.zeros(shape[:2])
+    for img in baseline[1:]:
+        diff = analysis._subtract_background(img.img)
+        expected = np.maximum(expected, analysis._reduce_signal(diff))
+    assert analysis.threshold_cleaning_filter.dtype == float
+    assert np.allclose(analysis.threshold_cleaning_filter, expected)
+
+
+class PostProcessedAnalysis(darsia.ConcentrationAnalysis):
+    """Analysis with post-processing in __call__."""
+
+    def __call__(self, img: darsia.Image) -> darsia.Image:
+        concentration = super().__call__(img)
+        concentration.img = 1.0 - concentration.img
+        return concentration
+
+
+def test_multi_concentration_analysis_custom_call():
+    """Analyses overriding __call__ are applied directly."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    baseline = darsia.OpticalImage(rng.random(shape))
+    options = {"diff option": "absolute", "reuse buffers": True}
+    analyses = {
+        "plain": darsia.ConcentrationAnalysis(
+            baseline.copy(), darsia.MonochromaticReduction(color="gray"), **options
+        ),
+        "post": PostProcessedAnalysis(
+            baseline.copy(), darsia.MonochromaticReduction(color="gray"), **options
+        ),
+    }
+    multi_analysis = darsia.MultiConcentrationAnalysis(analyses)
+    img = darsia.OpticalImage(rng.random(shape))
+    expected = {name: analysis(img).img.copy() for name, analysis in analyses.items()}
+    for name in ["plain", "post", "plain"]:
+        result = multi_analysis.analyze(name, img)
+        assert np.allclose(result.img, expected[name])
+
+
+class FrameModel(darsia.Model):
+    """Model acting on single frames only."""
+
+    def __call__(self, signal: np.ndarray) -> np.ndarray:
+        assert signal.ndim == 2
+        return signal / np.max(signal)
+
+
+@pytest.mark.parametrize("color", ["gray", "red", "hsv", "negative-key"])
+@pytest.mark.parametrize(
+    "model", [darsia.LinearModel(scaling=2.0, offset=0.1), FrameModel()]
+)
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+def test_series_analysis(color, model, reuse_buffers):
+    """Space-time images are analyzed at once, consistent with single frames."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 30, 3)
+    num_frames = 5
+    baseline = [darsia.OpticalImage(rng.random(shape)) for _ in range(2)]
+    analysis = darsia.ConcentrationAnalysis(
+        baseline,
+        darsia.MonochromaticReduction(color=color),
+        restoration=darsia.TVD(weight=0.1, max_num_iter=5),
+        model=model,
+        **{"reuse buffers": reuse_buffers},
+    )
+
+    array = rng.random((*shape[:2], num_frames, 3))
+    series = darsia.OpticalImage(
+        array.copy(), series=True, time=list(range(num_frames))
+    )
+    result = analysis(series)
+    assert np.array_equal(series.img, array)
+    assert result.series and result.img.shape == (*shape[:2], num_frames)
+
+    expected = np.stack(
+        [analysis(series.time_slice(i)).img for i in range(num_frames)], axis=-1
+    )
+    assert np.allclose(result.img, expected, atol=1e-5)
+
+    # Frame-major stacks, split into batches
+    analysis.batch_size = 2 * shape[0] * shape[1]
+    frames = np.ascontiguousarray(np.moveaxis(array, 2, 0))
+    assert np.allclose(
+        analysis.analyze_frames(frames), np.moveaxis(expected, 2, 0), atol=1e-5
+    )
+
+
+class CalibrationAnalysis(
+    darsia.ConcentrationAnalysis, darsia.InjectionRateModelObjectiveMixin
+):
+    pass
+
+
+@pytest.mark.parametrize("series", [False, True])
+def test_calibrate_model(series):
+    """Batched calibration recovers the scaling matching the injection rate."""
+
+    shape = (20, 30, 3)
+    num_frames = 6
+    dimensions = [1.0, 2.0]
+    images = [
+        darsia.OpticalImage(
+            np.full(shape, 0.05 * (i + 1)), dimensions=dimensions, time=float(i)
+        )
+        for i in range(num_frames)
+    ]
+    if series:
+        images = darsia.OpticalImage(
+            np.stack([img.img for img in images], axis=2),
+            dimensions=dimensions,
+            series=True,
+            time=[float(i) for i in range(num_frames)],
+        )
+    analysis = CalibrationAnalysis(
+        darsia.OpticalImage(np.zeros(shape), dimensions=dimensions),
+        darsia.MonochromaticReduction(color="red"),
+        model=darsia.ScalingModel(scaling=1.0),
+        **{"batch size": 2 * shape[0] * shape[1]},
+    )
+    geometry = darsia.Geometry(space_dim=2, num_voxels=shape[:2], dimensions=dimensions)
+    options = {
+        "initial_guess": [1.0],
+        "injection_rate": 0.5,
+        "geometry": geometry,
+        "regression_type": "linear",
+        "method": "Nelder-Mead",
+        "tol": 1e-8,
+        "maxiter": 100,
+    }
+
+    # Volume increases by 0.05 * scaling * 2 per time unit
+    assert analysis.calibrate_model(images, options)
+    assert np.isclose(analysis.model._scaling, 5.0, rtol=1e-3)
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        darsia.ScalingModel(scaling=2.0),
+        darsia.CombinedModel(
+            [darsia.LinearModel(scaling=2.0, offset=0.1), darsia.ScalingModel()]
+        ),
+        darsia.CombinedModel(
+            [
+                darsia.LinearModel(scaling=2.0, offset=0.1),
+                darsia.ClipModel(**{"min value": 0.2, "max value": 1.5}),
+            ]
+        ),
+    ],
+)
+@pytest.mark.parametrize("dtype", [None, np.float32])
+def test_calibration_engine(model, dtype):
+    """Cached volumes agree with converting and integrating each frame."""
+
+    rng = np.random.default_rng(0)
+    num_frames, shape = 4, (8, 12)
+    signals = rng.random((num_frames, *shape))
+    diffs = signals[..., np.newaxis]
+    geometry = darsia.ExtrudedGeometry(
+        expansion=rng.random(shape), space_dim=2, num_voxels=shape, dimensions=[1, 2]
+    )
+    analysis = darsia.ConcentrationAnalysis(model=model)
+    engine = darsia.CalibrationEngine(analysis, signals, diffs, geometry, dtype=dtype)
+    assert (engine.signals is None) == (model.affine_coefficients() is not None)
+
+    first_model = model[0] if isinstance(model, darsia.CombinedModel) else model
+    for scaling in [2.0, 3.0]:
+        first_model.update(scaling=scaling)
+        expected = [geometry.integrate(model(signal)) for signal in signals]
+        assert np.allclose(engine.volumes(), expected, rtol=1e-5)
+
+    # Area averaging conserves integrals over homogeneous geometries
+    geometry = darsia.Geometry(space_dim=2, num_voxels=shape, dimensions=[1, 2])
+    signals = np.repeat(np.repeat(rng.random((num_frames, 4, 6)), 2, 1), 2, 2)
+    engine = darsia.CalibrationEngine(
+        analysis, signals, signals[..., np.newaxis], geometry, resize=0.5
+    )
+    expected = [geometry.integrate(model(signal)) for signal in signals]
+    assert np.allclose(engine.volumes(), expected)
+
+    # Integration at full resolution is unaffected by the coarse integration
+    assert np.isclose(geometry.integrate(np.ones(shape)), 2.0)
+    engine = darsia.CalibrationEngine(analysis, signals, signals[..., None], geometry)
+    assert np.allclose(engine.volumes(), expected)
@@ -1,13 +1,16 @@
 import json
 import os
+import pickle
 from pathlib import Path
 
 import cv2
 import numpy as np
 import pytest
+import scipy.ndimage
 import skimage
 
 import darsia
+from darsia.utils.features import FeatureDetection
 
 
 def read_test_image(img_id: str) -> tuple[np.ndarray, dict]:
@@ -211,6 +214,88 @@ def test_drift_correction():
     )
 
 
+def test_drift_correction_feature_cache(tmp_path, monkeypatch):
+    """Test caching and storing of baseline features in the drift correction."""
+
+    # ! ---- Fetch test images
+    original_array, info, success = read_test_image("baseline")
+
+    if not success:
+        pytest.xfail("Image required for test not available.")
+
+    roi = darsia.make_voxel([[0, 0], [600, 600]])
+    drift_correction = darsia.DriftCorrection(base=original_array, config={"roi": roi})
+    arrays = [
+        cv2.warpAffine(
+            original_array,
+            np.array([[1, 0, dx], [0, 1, dy]]).astype(np.float32),
+            tuple(reversed(original_array.shape[:2])),
+        )
+        for dx, dy in [(10, -6), (-4, 3)]
+    ]
+
+    # Count feature extractions
+    num_calls = [0]
+    extract_features = FeatureDetection.extract_features
+
+    def counted_extract_features(*args, **kwargs):
+        num_calls[0] += 1
+        return extract_features(*args, **kwargs)
+
+    monkeypatch.setattr(FeatureDetection, "extract_features", counted_extract_features)
+
+    # Features of the baseline and of each image are extracted once
+    translations = [drift_correction.estimate_translation(array) for array in arrays]
+    assert num_calls[0] == 1 + len(arrays)
+
+    # Cached and uncached features provide the same translation
+    uncached_estimator = darsia.TranslationEstimator(cache_size=0)
+    for array, translation in zip(arrays, translations):
+        reference, intact = uncached_estimator.find_effective_translation(
+            array, drift_correction.base, drift_correction.roi, drift_correction.roi
+        )
+        assert intact and np.allclose(translation, reference)
+
+    # Features of the baseline are restored from file
+    path = tmp_path / "drift.npz"
+    drift_correction.save(path)
+    loaded_correction = darsia.read_correction(path)
+    num_calls[0] = 0
+    translation = loaded_correction.estimate_translation(arrays[0])
+    assert num_calls[0] == 1
+    assert np.allclose(translation, translations[0])
+
+    # Used drift corrections can be pickled, e.g., for parallel batch analysis
+    restored_correction = pickle.loads(pickle.dumps(loaded_correction))
+    assert np.allclose(
+        restored_correction.estimate_translation(arrays[0]), translations[0]
+    )
+
+
+def test_feature_mask():
+    """Test the restriction of features to a mask."""
+
+    # ! ---- Fetch test images
+    original_array, info, success = read_test_image("baseline")
+
+    if not success:
+        pytest.xfail("Image required for test not available.")
+
+    roi = (slice(0, 800), slice(0, 800))
+    mask = np.zeros(original_array.shape[:2], dtype=bool)
+    mask[:, :112] = True
+    (kps_all, descs_all), _ = FeatureDetection.extract_features(original_array, roi)
+    (kps, descs), found = FeatureDetection.extract_features(original_array, roi, mask)
+
+    # Compare with the restriction of all features
+    include = [bool(mask[roi][int(kp.pt[1]), int(kp.pt[0])]) for kp in kps_all]
+    assert found and 0 < sum(include) < len(kps_all)
+    assert [kp.pt for kp in kps] == [
+        kp.pt for kp, keep in zip(kps_all, include) if keep
+    ]
+    assert np.array_equal(descs, descs_all[include])
+
+
 def test_rotation():
     """Test rotation of images."""
 
@@ -244,3 +329,238 @@ def test_rotation():
     )
 
     assert np.allclose(image.img, image_ref)
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_rotation_linear(dim):
+    """Test linear interpolation of rotations, also for space-time images."""
+
+    rng = np.random.default_rng(0)
+    shape = (20, 24, 16)[:dim]
+    array = rng.random(shape)
+    anchor = [10, 12, 8][:dim]
+    rotations = [0.3] if dim == 2 else [(0.3, "x"), (0.2, "z")]
+    rotation = darsia.RotationCorrection(
+        anchor=anchor, rotations=rotations, interpolation="linear"
+    )
+    rotated_array = rotation.correct_array(array)
+
+    # Compare with scipy interpolation within the image
+    voxels = np.indices(shape).reshape(dim, -1)
+    anchor = np.array(anchor)[:, np.newaxis]
+    src_voxels = anchor + rotation.rotation_inv.dot(voxels - anchor)
+    reference = scipy.ndimage.map_coordinates(array, src_voxels, order=1)
+    valid = np.all(
+        np.logical_and(src_voxels >= 0, src_voxels <= np.array(shape)[:, None] - 1),
+        axis=0,
+    )
+    assert np.allclose(
+        rotated_array.ravel()[valid], reference[valid], atol=0.05 if dim == 2 else 0
+    )
+    assert np.allclose(rotated_array.ravel()[~valid], 0)
+
+    # Batch application to space-time images
+    info = {"space_dim": dim, "indexing": "ijk"[:dim], "series": True}
+    series = darsia.ScalarImage(img=np.stack([array, 2 * array], axis=dim), **info)
+    rotated_series = rotation(series)
+    assert np.allclose(rotated_series.img[..., 0], rotated_array)
+    assert np.allclose(rotated_series.img[..., 1], 2 * rotated_array)
+
+
+def test_composed_shape_correction():
+    """Test composition of shape corrections against sequential application."""
+
+    # ! ---- Static corrections
+
+    rows, cols = np.indices((60, 80))
+    array = np.stack([np.sin(rows / 8) + np.cos(cols / 10), rows * cols / 4800], -1)
+
+    translation = darsia.TranslationCorrection()
+    translation.translation = np.array([[1, 0, 5.3], [0, 1, -3.7]])
+    translation.active = True
+    rotation = darsia.RotationCorrection(
+        anchor=[30, 40], rotations=[0.1], interpolation="linear"
+    )
+
+    reference = rotation.correct_array(translation.correct_array(array))
+    composition = darsia.ComposedShapeCorrection([translation, rotation])
+    composed_array = composition.correct_array(array)
+
+    # Compare away from the boundary, where sequential resampling blends with zeros
+    weights = rotation.correct_array(translation.correct_array(np.ones((60, 80))))
+    interior = weights > 0.999
+    assert np.allclose(composed_array[interior], reference[interior], atol=0.05)
+
+    # Grouping of composable corrections
+    color_correction = darsia.ColorBalance()
+    transformations = darsia.compose_shape_corrections(
+        [translation, rotation, color_correction, rotation]
+    )
+    assert len(transformations) == 3
+    assert isinstance(transformations[0], darsia.ComposedShapeCorrection)
+    assert transformations[1] is color_correction
+    assert transformations[2] is rotation
+
+    # ! ---- Drift correction
+
+    original_array, info, success = read_test_image("baseline")
+    if not success:
+        pytest.xfail("Image required for test not available.")
+
+    original_image = darsia.Image(img=original_array, **info)
+    roi = darsia.make_voxel([[0, 0], [600, 600]])
+    drift_correction = darsia.DriftCorrection(base=original_image, config={"roi": roi})
+    rotation = darsia.RotationCorrection(anchor=[800, 1500], rotations=[0.01])
+
+    affine_matrix = np.array([[1, 0, 10], [0, 1, -6]]).astype(np.float32)
+    translated_array = cv2.warpAffine(
+        original_array, affine_matrix, tuple(reversed(original_array.shape[:2]))
+    )
+    reference = rotation.correct_array(drift_correction.correct_array(translated_array))
+    composition = darsia.ComposedShapeCorrection(
+        [drift_correction, rotation], interpolation_order=0
+    )
+    composed_array = composition.correct_array(translated_array)
+    assert np.allclose(composed_array[20:-20, 20:-20], reference[20:-20, 20:-20])
+
+
+def test_correction_cache(tmp_path):
+    """Test persistent caching of corrected images, incl. LRU eviction."""
+
+    # Random images stored lossfree
+    paths = []
+    for i in range(3):
+        array = (np.random.rand(10, 20, 3) * 255).astype(np.uint8)
+        paths.append(tmp_path / f"image_{i}.png")
+        cv2.imwrite(str(paths[-1]), array, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+    transformations = [darsia.TypeCorrection(np.float32)]
+    reference = darsia.imread(paths[0], transformations=transformations)
+
+    # First read is a miss, second read is a hit with identical result
+    cache = darsia.CorrectionCache(tmp_path / "cache")
+    image = cache.imread(paths[0], transformations, width=2, height=1)
+    cached_image = cache.imread(paths[0], transformations, width=2, height=1)
+    assert cache.statistics()["misses"] == 1 and cache.statistics()["hits"] == 1
+    assert np.allclose(cached_image.img, reference.img)
+    assert np.allclose(cached_image.img, image.img)
+    assert np.allclose(cached_image.dimensions, [1, 2])
+
+    # Different corrections and reading arguments are distinguished
+    cache.imread(paths[0], [darsia.TypeCorrection(np.float64)], width=2, height=1)
+    cache.imread(paths[0], transformations, width=4, height=1)
+    assert cache.statistics()["misses"] == 3
+
+    # Cache persists across instances
+    cache = darsia.CorrectionCache(tmp_path / "cache")
+    cache.imread(paths[0], transformations, width=2, height=1)
+    assert cache.statistics()["hits"] == 1 and cache.statistics()["entries"] == 3
+
+    # LRU eviction - the size limit allows only two entries
+    cache.clear()
+    cache.imread(paths[0], transformations)
+    cache.max_size = int(2.5 * cache.size)
+    cache.imread(paths[1], transformations)
+    cache.imread(paths[0], transformations)
+    cache.imread(paths[2], transformations)
+    assert cache.statistics()["evictions"] == 1
+    assert cache.statistics()["entries"] == 2
+    cache.imread(paths[0], transformations)
+    assert cache.statistics()["hits"] == 3
+
+    # Storing images does not reread the index from disk below the size limit
+    rereads = []
+    read_index = cache._read_index
+    cache._read_index = lambda: rereads.append(True) or read_index()
+    for max_size in [None, 100 * cache.size]:
+        cache.max_size = max_size
+        cache.clear()
+        rereads.clear()
+        for path in paths:
+            cache.imread(path, transformations)
+        assert len(rereads) == 0 and len(cache._index) == 3
+
+
+def test_shared_correction_cache(tmp_path):
+    """Test sharing of a cache folder among several instances, e.g., processes."""
+
+    paths = []
+    for i in range(3):
+        array = (np.random.rand(10, 20, 3) * 255).astype(np.uint8)
+        paths.append(tmp_path / f"image_{i}.png")
+        cv2.imwrite(str(paths[-1]), array, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+    transformations = [darsia.TypeCorrection(np.float32)]
+
+    # Entries written by either instance are visible to both
+    caches = [darsia.CorrectionCache(tmp_path / "cache") for _ in range(2)]
+    caches[0].imread(paths[0], transformations)
+    caches[1].imread(paths[1], transformations)
+    caches[0].imread(paths[1], transformations)
+    assert caches[0].statistics()["hits"] == 1
+    assert caches[1].statistics()["entries"] == 2
+
+    # Eviction accounts for entries of other instances
+    caches[1].max_size = int(2.5 * caches[1].size / 2)
+    caches[1].imread(paths[2], transformations)
+    assert caches[1].statistics()["evictions"] == 1
+    assert caches[0].statistics()["entries"] == 2
+
+    # Storing an existing entry keeps a single complete entry, without leftovers
+    key = caches[0].key(paths[2], transformations)
+    caches[0].put(key, darsia.imread(paths[2], transformations=transformations))
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == sorted(
+        caches[0]._index.keys()
+    )
+    assert caches[0].get(key) is not None
+
+
+def test_remap_table():
+    """Test precomputed remap tables against interpolation and voxel assignment."""
+
+    # ! ---- Compare with scipy interpolation
+
+    rng = np.random.default_rng(0)
+    array = rng.random((40, 50, 3))
+    rows, cols = np.meshgrid(np.arange(40), np.arange(50), indexing="ij")
+    rows = 0.75 * rows + 2.3
+    cols = 1.25 * cols - 1.9
+
+    for order in [0, 1]:
+        table = darsia.RemapTable.from_coordinates(rows, cols, order)
+        assert table.fixed_point
+        reference = np.stack(
+            [
+                skimage.transform.warp(
+                    array[..., i], np.array([rows, cols]), order=order, cval=0
+                )
+                for i in range(3)
+            ],
+            axis=-1,
+        )
+        interior = (slice(5, -5), slice(5, -5))
+        assert np.allclose(table(array)[interior], reference[interior], atol=0.05)
+
+    # Fallback for data types not supported by cv2
+    table = darsia.RemapTable.from_coordinates(rows, cols, 0)
+    assert np.array_equal(table(array > 0.5), table(array.astype(np.float32)) > 0.5)
+
+    # ! ---- Voxel assignment of affine correction
+
+    image = darsia.Image(img=array, space_dim=2, indexing="ij", width=5, height=4)
+    voxels_src = darsia.make_voxel([[0, 0], [0, 49], [39, 0]])
+    voxels_dst = darsia.make_voxel([[2, 3], [3, 45], [38, 1]])
+    correction = darsia.AffineCorrection(
+        coordinatesystem_src=image.coordinatesystem,
+        coordinatesystem_dst=image.coordinatesystem,
+        pts_src=voxels_src,
+        pts_dst=voxels_dst,
+    )
+    corrected_array = correction.correct_array(array)
+    assert correction.cache.remap is not None
+
+    cache = correction.cache
+    reference = np.zeros_like(array)
+    voxels = image.coordinatesystem.voxels
+    reference[tuple(voxels[cache.valid_voxels].T)] = array[
+        tuple(cache.voxels_src[cache.valid_voxels].T)
+    ]
+    assert np.array_equal(corrected_array, reference)
@@ -276,3 +276,46 @@ def test_face_to_cell_3d():
     assert np.allclose(cell_flux[0, 0, 0], [0, 20, 42.5])
     assert np.allclose(cell_flux[2, 3, 4], [19.5, 42, 66])
     assert np.allclose(cell_flux[1, 1, 1], [10.5, 51.5, 95])
+
+
+def test_cell_reconstruction_3d():
+    grid = darsia.Grid(shape=(3, 4, 5), voxel_size=[0.5, 0.25, 2])
+    flat_flux = np.arange(grid.num_faces, dtype=float)
+    reconstruction = grid.cell_reconstruction(grid.cell_corners)
+
+    # Operators are cached
+    assert reconstruction is grid.cell_reconstruction(grid.cell_corners)
+
+    # All points at once, consistent with single evaluations
+    out = np.empty(reconstruction.shape)
+    cell_flux = reconstruction(flat_flux, out=out)
+    assert cell_flux is out
+    assert np.allclose(cell_flux.shape, (8, *grid.shape, grid.dim))
+    for i, pt in enumerate(grid.cell_corners):
+        assert np.allclose(cell_flux[i], darsia.face_to_cell(grid, flat_flux, pt=pt))
+
+    # Output buffers are fully overwritten
+    reference = cell_flux.copy()
+    reconstruction(2 * flat_flux, out=out)
+    assert np.allclose(out, 2 * reference)
+
+    # Corner values coincide with normal fluxes of the adjacent faces
+    assert np.allclose(reference[0, 0, 0, 0], [0, 0, 0])
+    assert np.allclose(reference[6, 0, 0, 0], [0, 40, 85])
+
+
+def test_cell_to_face_average_2d():
+    grid = darsia.Grid(shape=(3, 4), voxel_size=[0.5, 0.25])
+    cell_qty = np.arange(1, grid.num_cells + 1, dtype=float).reshape(
+        grid.shape, order="F"
+    )
+    cell_qty[0, 0] = 0
+
+    # Face 0 connects cells 0 and 1, face 9 connects cells 1 and 4
+    arithmetic = darsia.cell_to_face_average(grid, cell_qty, mode="arithmetic")
+    assert np.allclose(arithmetic[[0, 1, 9]], [1, 2.5, 3.5])
+
+    out = np.empty(grid.num_faces)
+    harmonic = darsia.cell_to_face_average(grid, cell_qty, mode="harmonic", out=out)
+    assert harmonic is out
+    assert np.allclose(harmonic[[0, 1, 9]], [0, 2 * 2 * 3 / 5, 2 * 2 * 5 / 7])
@@ -0,0 +1,87 @@
+"""Unit tests for the geometric multigrid solver."""
+
+import numpy as np
+import pytest
+import scipy.ndimage
+
+import darsia
+
+
+@pytest.mark.parametrize("cycle", ["V", "W", "F"])
+@pytest.mark.parametrize("shape", [(37, 40), (17, 16, 18)])
+def test_heterogeneous_diffusion(cycle, shape):
+    """Compare with a direct solve for a coefficient jump of three orders."""
+
+    rng = np.random.default_rng(0)
+    diffusion_coeff = np.ones(shape)
+    diffusion_coeff[: shape[0] // 2] = 1000.0
+    mass_coeff = 0.1 + rng.random(shape)
+    rhs = rng.standard_normal(shape)
+
+    solver = darsia.GeometricMG(
+        cycle=cycle,
+        maxiter=20,
+        tol=1e-10,
+        dim=len(shape),
+        mass_coeff=mass_coeff,
+        diffusion_coeff=diffusion_coeff,
+    )
+    x = solver(np.zeros(shape), rhs, h=0.5)
+    assert len(solver.levels) > 1
+    assert len(solver.residuals) < 20
+    assert solver.residuals[-1] < 1e-10 * solver.residuals[0]
+
+    # Reference: direct solve on the finest level
+    solver.levels[0].setup_coarse_solve()
+    reference = solver.levels[0].coarse_solve(rhs.ravel()).reshape(shape)
+    assert np.allclose(x, reference, atol=1e-8)
+
+
+@pytest.mark.parametrize("acceleration, bound", [("none", 0.45), ("cg", 0.25)])
+def test_contraction_heterogeneous(acceleration, bound):
+    """Contraction for a coefficient varying within coarse cells.
+
+    Smooth lognormal field with random low-permeability cells, on a grid with odd
+    size.
+
+    """
+    rng = np.random.default_rng(0)
+    shape = (67, 70)
+    log_coeff = scipy.ndimage.gaussian_filter(rng.standard_normal(shape), 3)
+    diffusion_coeff = (
+        100
+        * np.exp(log_coeff / np.std(log_coeff))
+        * np.where(rng.random(shape) < 0.1, 1e-3, 1.0)
+    )
+    rhs = rng.standard_normal(shape)
+
+    num_cycles = 10
+    solver = darsia.GeometricMG(
+        acceleration=acceleration,
+        maxiter=num_cycles,
+        tol=1e-14,
+        mass_coeff=1.0,
+        diffusion_coeff=diffusion_coeff,
+    )
+    solver(np.zeros(shape), rhs)
+    contraction = (solver.residuals[-1] / solver.residuals[0]) ** (1 / num_cycles)
+    assert len(solver.levels) > 3
+    assert contraction < bound
+
+
+def test_consistency_with_jacobi():
+    """Constant coefficients lead to the same discretization as Jacobi."""
+
+    rng = np.random.default_rng(0)
+    rhs = rng.standard_normal((20, 30))
+    params = {"mass_coeff": 0.5, "diffusion_coeff": 2.0}
+    x = darsia.GeometricMG(maxiter=20, tol=1e-12, **params)(np.zeros_like(rhs), rhs)
+    reference = darsia.Jacobi(maxiter=5000, **params)(np.zeros_like(rhs), rhs)
+    assert np.allclose(x, reference, atol=1e-8)
+
+    # Usable as solver for TV denoising
+    img = rng.random((20, 30))
+    result = darsia.split_bregman_tvd(
+        img, mu=0.1, max_num_iter=5, solver=darsia.GeometricMG()
+    )
+    assert result.shape == img.shape
@@ -579,3 +579,20 @@ def test_geometry_normalization():
     # Test integration
     integral = geometry.integrate(normalized_random_image)
     assert np.isclose(integral, 0.25**2 * (0.5 + 0.75 - 0.2 + 0.6 + 0.1))
+
+
+def test_extruded_geometry_image_series():
+    """Heterogeneous voxel volumes are broadcast over time."""
+
+    rng = np.random.default_rng(0)
+    num_voxels = (4, 6)
+    geometry = darsia.ExtrudedGeometry(
+        expansion=rng.random(num_voxels),
+        space_dim=2,
+        num_voxels=num_voxels,
+        dimensions=[0.5, 1.0],
+    )
+    data = rng.random((*num_voxels, 3))
+    integral = geometry.integrate(data)
+    assert integral.shape == (3,)
+    assert np.allclose(integral, [geometry.integrate(data[..., i]) for i in range(3)])
@@ -246,6 +246,25 @@ def test_grid_connectivity_3d():
     assert np.allclose(grid.reverse_connectivity[2, 16], [89, 101])
 
 
+def test_lazy_grid_3d():
+    """Index arrays are materialized on demand and reported in the memory footprint."""
+
+    # Constructing a large grid does not allocate index arrays
+    grid = darsia.Grid(shape=(512, 512, 512))
+    assert grid.memory_footprint() == {"total": 0}
+    assert grid.face_slices[1] == slice(511 * 512**2, 2 * 511 * 512**2)
+
+    # Index arrays are computed on first access
+    grid = darsia.Grid(shape=(3, 4, 5))
+    assert len(grid.exterior_faces[2]) == 3 * 4 * 4 - 1 * 2 * 4
+    assert np.allclose(grid.exterior_faces[2][:6], [85, 86, 87, 88, 90, 91])
+    assert set(grid.memory_footprint()) == {"exterior_faces", "total"}
+    assert np.allclose(grid.faces[2], np.arange(85, 133))
+    footprint = grid.memory_footprint()
+    assert footprint["faces"] == grid.num_faces * grid.faces[0].itemsize
+    assert footprint["total"] == footprint["faces"] + footprint["exterior_faces"]
+
+
 @pytest.mark.parametrize("shape", [(3, 4), (3, 4, 5)])
 def test_compatibility(shape):
     """Compatibility of connectivity, reverse connectivity and interior faces.
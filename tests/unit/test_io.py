@@ -1,5 +1,6 @@
 """Test I/O capabilities in darsia."""
 
+from datetime import datetime
 from pathlib import Path
 
 import cv2
@@ -89,3 +90,123 @@ def test_imread_from_vtu():
 
     assert np.allclose(slice_0.img, vtu_image_2d.img)
     assert np.allclose(slice_1.img, vtu_image_2d.img)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_imread_from_optical_parallel(executor):
+    """Test parallel reading of a series of optical images, preserving the order."""
+
+    # Generate a collection of random images and store them lossfree
+    shape = (10, 20, 3)
+    arrays = [(np.random.rand(*shape) * 255).astype(np.uint8) for _ in range(5)]
+    paths = [Path(f"random_distribution_{i}.png") for i in range(len(arrays))]
+    for array, path in zip(arrays, paths):
+        cv2.imwrite(
+            str(path),
+            cv2.cvtColor(array, cv2.COLOR_RGB2BGR),
+            [cv2.IMWRITE_PNG_COMPRESSION, 0],
+        )
+
+    # Read serially and in parallel, with a prefetch queue shorter than the series
+    serial_image = darsia.imread(paths, time=list(range(len(paths))))
+    parallel_image = darsia.imread(
+        paths,
+        time=list(range(len(paths))),
+        num_workers=2,
+        executor=executor,
+        prefetch=3,
+    )
+
+    # Compare arrays.
+    assert parallel_image.series and parallel_image.time_num == len(paths)
+    assert np.allclose(serial_image.img, parallel_image.img)
+    for i, array in enumerate(arrays):
+        assert np.allclose(parallel_image.time_slice(i).img_as(np.uint8).img, array)
+
+    # Clean up
+    for path in paths:
+        path.unlink()
+
+
+def test_iter_images_and_lazy_image_series():
+    """Test lazy reading of a series of optical images, one time slice at a time."""
+
+    # Generate a collection of random images and store them lossfree
+    shape = (10, 20, 3)
+    arrays = [(np.random.rand(*shape) * 255).astype(np.uint8) for _ in range(4)]
+    paths = [Path(f"random_distribution_{i}.png") for i in range(len(arrays))]
+    for array, path in zip(arrays, paths):
+        cv2.imwrite(
+            str(path),
+            cv2.cvtColor(array, cv2.COLOR_RGB2BGR),
+            [cv2.IMWRITE_PNG_COMPRESSION, 0],
+        )
+    time = [0.0, 1.0, 2.0, 3.0]
+    correction = darsia.TypeCorrection(np.float32)
+
+    # Reference: full space-time image
+    image = darsia.imread(paths, time=time, transformations=[correction])
+
+    # Generator API, from paths and from the space-time image
+    for i, time_slice in enumerate(darsia.iter_images(paths, time=time, num_workers=2)):
+        assert not time_slice.series
+        assert np.isclose(time_slice.time, time[i])
+        assert np.allclose(time_slice.img_as(np.uint8).img, arrays[i])
+    for i, time_slice in enumerate(darsia.iter_images(image)):
+        assert np.allclose(time_slice.img, image.time_slice(i).img)
+
+    # Lazy series, with corrections deferred to the time slices
+    lazy_image = correction(darsia.LazyImageSeries(paths, time=time))
+    assert lazy_image.time_num == image.time_num
+    assert np.allclose(lazy_image.time_slice(2).img, image.time_slice(2).img)
+    lazy_interval = lazy_image.time_interval(slice(1, 3))
+    interval = image.time_interval(slice(1, 3))
+    assert lazy_interval.time_num == 2
+    assert np.allclose(lazy_interval.to_image().img, interval.img)
+    assert np.allclose(lazy_interval.to_image().time, interval.time)
+    assert np.allclose(lazy_image.to_image().img, image.img)
+
+    # Clean up
+    for path in paths:
+        path.unlink()
+
+
+@pytest.mark.parametrize("scalar", [True, False])
+def test_image_container(scalar, tmp_path):
+    """Test writing and memory-mapped reading of image containers."""
+
+    # Space-time image with dates
+    shape = (10, 20, 4) if scalar else (10, 20, 4, 3)
+    array = np.random.rand(*shape)
+    date = [datetime(2023, 1, 1, 12, i) for i in range(4)]
+    image_type = darsia.ScalarImage if scalar else darsia.OpticalImage
+    image = image_type(array, date=date, series=True, dimensions=[1, 2])
+
+    # Store and read container
+    path = tmp_path / "container"
+    image.save(path, verbose=False)
+    assert darsia.is_image_container(path)
+    container_image = darsia.imread(path)
+
+    # Compare arrays and metadata
+    assert type(container_image) is image_type
+    assert np.allclose(container_image.img, image.img)
+    assert container_image.date == image.date
+    assert np.allclose(container_image.time, image.time)
+    assert np.allclose(container_image.dimensions, image.dimensions)
+
+    # Time slices are views of the memory-mapped data
+    time_slice = container_image.time_slice(2)
+    assert isinstance(time_slice.img.base, np.memmap) or np.shares_memory(
+        time_slice.img, container_image.img
+    )
+    assert np.allclose(time_slice.img, image.time_slice(2).img)
+
+    # Streamed writing of time slices
+    stream_path = tmp_path / "stream"
+    darsia.write_image_series_container(
+        darsia.iter_images(image), stream_path, image.time_num
+    )
+    stream_image = darsia.imread(stream_path)
+    assert np.allclose(stream_image.img, image.img)
+    assert stream_image.date == image.date
@@ -0,0 +1,52 @@
+"""Unit tests for the Jacobi solver."""
+
+import numpy as np
+import pytest
+
+import darsia
+
+
+@pytest.mark.parametrize("shape", [(12, 13), (6, 7, 8)])
+def test_jacobi_sweeps(shape):
+    """Compare compiled sweeps with the vectorized reference iteration."""
+
+    rng = np.random.default_rng(0)
+    x0 = rng.random(shape)
+    x0_copy = x0.copy()
+    rhs = rng.random(shape)
+    mass_coeff = 0.5 + rng.random(shape)
+    solver = darsia.Jacobi(
+        maxiter=10, dim=len(shape), mass_coeff=mass_coeff, diffusion_coeff=0.3
+    )
+
+    # Reference
+    diag = solver._diag(h=0.5)
+    x = x0
+    for _ in range(10):
+        x = (rhs + 0.3 * solver._neighbor_accumulation(x) / 0.5**2) / diag
+
+    result = solver(x0, rhs, h=0.5)
+    assert np.allclose(result, x)
+    assert np.array_equal(x0, x0_copy)
+
+    # Parameters and grid spacing are not frozen after the first call
+    solver.update_params(diffusion_coeff=0.6)
+    x = x0
+    for _ in range(10):
+        x = (rhs + 0.6 * solver._neighbor_accumulation(x)) / solver._diag()
+    assert np.allclose(solver(x0, rhs), x)
+
+
+def test_jacobi_tolerance():
+    """Convergence checks every few sweeps."""
+
+    rng = np.random.default_rng(0)
+    rhs = rng.random((20, 20))
+    solver = darsia.Jacobi(
+        maxiter=1000, tol=1e-8, mass_coeff=1.0, diffusion_coeff=1.0, check_every=5
+    )
+    x = solver(np.ones_like(rhs), rhs)
+    reference = darsia.Jacobi(maxiter=1000, mass_coeff=1.0, diffusion_coeff=1.0)(
+        np.ones_like(rhs), rhs
+    )
+    assert np.allclose(x, reference, atol=1e-6)
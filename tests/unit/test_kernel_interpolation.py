@@ -0,0 +1,82 @@
+"""Test kernels and kernel-based interpolation."""
+
+import numpy as np
+import pytest
+
+import darsia
+
+
+@pytest.mark.parametrize(
+    "kernel", [darsia.LinearKernel(a=0.5), darsia.GaussianKernel(gamma=2.0)]
+)
+def test_gram_matrix(kernel):
+    """Compare batched kernel matrix with pairwise evaluation."""
+
+    rng = np.random.default_rng(0)
+    x = rng.random((5, 3)).astype(np.float32)
+    y = rng.random((4, 3)).astype(np.float32)
+    reference = np.array([[kernel(xi, yj) for yj in y] for xi in x])
+    assert np.allclose(kernel.gram_matrix(x, y), reference, atol=1e-6)
+    assert np.allclose(kernel.gram_matrix(x), kernel.gram_matrix(x, x))
+
+
+def test_kernel_interpolation_append():
+    """Appending supports updates the factorization consistently."""
+
+    rng = np.random.default_rng(0)
+    supports = rng.random((12, 3))
+    values = rng.random(12)
+    kernel = darsia.GaussianKernel(gamma=2.0)
+
+    interpolation = darsia.KernelInterpolation(kernel, supports[:8], values[:8])
+    assert interpolation.factorization[0] == "cholesky"
+    interpolation.update(supports=supports[8:], values=values[8:], append=True)
+    reference = darsia.KernelInterpolation(kernel, supports, values)
+
+    assert np.allclose(
+        interpolation.interpolation_weights, reference.interpolation_weights
+    )
+    assert np.allclose(
+        interpolation.X @ interpolation.interpolation_weights, interpolation.values
+    )
+
+    # Interpolation of supports reproduces values
+    signal = interpolation.supports[np.newaxis, :, :].astype(np.float32)
+    assert np.allclose(interpolation(signal)[0], interpolation.values, atol=1e-3)
+
+    # Updating the kernel requires a new factorization
+    interpolation.update(kernel=darsia.GaussianKernel(gamma=1.0))
+    reference = darsia.KernelInterpolation(
+        darsia.GaussianKernel(gamma=1.0), supports, values
+    )
+    assert np.allclose(
+        interpolation.interpolation_weights, reference.interpolation_weights
+    )
+
+
+@pytest.mark.parametrize("kernel_type", [darsia.LinearKernel, darsia.GaussianKernel])
+@pytest.mark.parametrize("parallel", [True, False])
+def test_linear_combination(kernel_type, parallel):
+    """Compare compiled linear combinations with the generic implementation."""
+
+    rng = np.random.default_rng(0)
+    signal = rng.random((7, 9, 3))
+    supports = rng.random((4, 3)).astype(np.float32)
+    weights = rng.random(4).astype(np.float32)
+
+    kernel = kernel_type(parallel=parallel)
+    reference = darsia.BaseKernel.linear_combination(
+        kernel, signal.astype(np.float32), supports, weights
+    )
+    result = kernel.linear_combination(signal, supports, weights)
+    assert result.dtype == np.float32
+    assert np.allclose(result, reference, atol=1e-5)
+
+    # Chunked evaluation
+    kernel.chunk_size = 10
+    assert np.allclose(kernel.linear_combination(signal, supports, weights), result)
+
+    # Single pixel
+    assert np.isclose(
+        kernel.linear_combination(signal[2, 3], supports, weights), result[2, 3]
+    )
@@ -0,0 +1,84 @@
+"""Unit tests for split Bregman TV denoising."""
+
+import numpy as np
+import pytest
+
+import darsia
+from darsia.restoration.split_bregman_tvd import (
+    _anisotropic_shrinkage,
+    _isotropic_shrinkage,
+)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("shape", [(6, 7), (4, 5, 6)])
+def test_shrinkage(dtype, shape):
+    """Compare compiled shrinkage kernels with numpy reference."""
+
+    rng = np.random.default_rng(0)
+    dim = len(shape)
+    dub = rng.standard_normal((*shape, dim)).astype(dtype)
+    quot = (0.5 * rng.random(shape)).astype(dtype)
+
+    # Isotropic shrinkage
+    s = np.linalg.norm(dub, 2, axis=-1)
+    d_ref = dub * (np.maximum(s - quot, 0) / (s + 1e-18))[..., None]
+    d = np.zeros_like(dub)
+    b = dub.copy()
+    _isotropic_shrinkage(d.reshape(-1, dim), b.reshape(-1, dim), quot.ravel())
+    assert np.allclose(d, d_ref, atol=1e-6)
+    assert np.allclose(b, dub - d_ref, atol=1e-6)
+
+    # Anisotropic shrinkage with scalar threshold
+    d_ref = np.maximum(np.abs(dub) - 0.3, 0) * np.sign(dub)
+    b = dub.copy()
+    _anisotropic_shrinkage(
+        d.reshape(-1, dim), b.reshape(-1, dim), np.array([0.3], dtype=dtype)
+    )
+    assert np.allclose(d, d_ref, atol=1e-6)
+    assert np.allclose(b, dub - d_ref, atol=1e-6)
+
+
+def test_isotropic_heterogeneous_3d():
+    """Isotropic TV denoising of 3d images with heterogeneous weights."""
+
+    rng = np.random.default_rng(0)
+    img = rng.random((8, 9, 10)).astype(np.float32)
+    mu = 0.05 + 0.1 * rng.random(img.shape)
+    result = darsia.split_bregman_tvd(
+        img,
+        mu=mu,
+        dim=3,
+        isotropic=True,
+        max_num_iter=5,
+        solver=darsia.Jacobi(maxiter=5),
+    )
+    assert result.dtype == np.float32
+    assert result.shape == img.shape
+    assert np.linalg.norm(np.diff(result, axis=0)) < np.linalg.norm(
+        np.diff(img, axis=0)
+    )
+
+
+@pytest.mark.parametrize("isotropic", [False, True])
+def test_initial_guess_unchanged(isotropic):
+    """The initial guess is not modified by the in-place updates."""
+
+    rng = np.random.default_rng(0)
+    img = rng.random((10, 12))
+    x0 = [
+        img.copy(),
+        rng.standard_normal((10, 12, 2)),
+        rng.standard_normal((10, 12, 2)),
+    ]
+    reference = [array.copy() for array in x0]
+    darsia.split_bregman_tvd(
+        img,
+        mu=0.1,
+        isotropic=isotropic,
+        max_num_iter=3,
+        solver=darsia.Jacobi(maxiter=3),
+        x0=x0,
+    )
+    for array, expected in zip(x0, reference):
+        assert np.array_equal(array, expected)
@@ -0,0 +1,102 @@
+"""Test tiled application of restoration methods."""
+
+import numpy as np
+import pytest
+
+import darsia
+
+
+@pytest.mark.parametrize("overlap", [0, 3])
+def test_partition_of_unity(overlap):
+    """Blending weights of all tiles sum up to one."""
+
+    tiled = darsia.TiledRestoration(
+        lambda tile: np.ones(tile.shape), tile_shape=(7, 5), overlap=overlap
+    )
+    img = np.zeros((30, 23, 3))
+    assert np.allclose(tiled(img), 1)
+
+    # Pointwise restorations are reproduced exactly
+    rng = np.random.default_rng(0)
+    img = rng.random((30, 23))
+    tiled = darsia.TiledRestoration(
+        lambda tile, scale: scale * tile,
+        tile_shape=8,
+        overlap=overlap,
+        num_workers=2,
+    )
+    scale = rng.random((30, 23))
+    out = np.empty((30, 23), dtype=np.float32)
+    result = tiled(img, out=out, scale=scale)
+    assert result is out
+    assert np.allclose(out, scale * img, atol=1e-6)
+
+
+def test_iterate(tmp_path):
+    """Tile-synchronous iterations of a local stencil reproduce the full image."""
+
+    def _smooth(state, scale):
+        x = np.pad(state["x"], 1, mode="edge")
+        return {"x": scale * (x[:-2, 1:-1] + x[2:, 1:-1] + x[1:-1, :-2] + x[1:-1, 2:])}
+
+    rng = np.random.default_rng(0)
+    img = rng.random((30, 23))
+    scale = 0.25 * np.ones(img.shape)
+    reference = {"x": img}
+    for _ in range(10):
+        reference = _smooth(reference, scale)
+
+    tiled = darsia.TiledRestoration(
+        _smooth, tile_shape=8, overlap=1, num_workers=2, workspace=str(tmp_path)
+    )
+    result = tiled.iterate(_smooth, {"x": img}, num_rounds=10, scale=scale)
+    assert isinstance(result["x"], np.memmap)
+    assert np.allclose(result["x"], reference["x"], atol=1e-14)
+
+
+@pytest.mark.parametrize("maxiter, overlap", [(20, 16), (7, 3)])
+def test_tiled_H1_regularization(maxiter, overlap):
+    """Tiled H1 regularization with Jacobi agrees with the full image."""
+
+    rng = np.random.default_rng(0)
+    img = np.zeros((120, 90))
+    img[30:90, 20:60] = 1
+    img += 0.1 * rng.random(img.shape)
+
+    solver = darsia.Jacobi(maxiter=maxiter)
+    reference = darsia.H1_regularization(img, mu=1.0, solver=solver)
+    result = darsia.H1_regularization(
+        img, mu=1.0, solver=solver, tile_shape=40, overlap=overlap, num_workers=2
+    )
+    assert np.allclose(result, reference, atol=1e-12)
+
+
+def test_tiled_tvd():
+    """Tiled heterogeneous TVD exchanges halos and agrees with the full image."""
+
+    rng = np.random.default_rng(0)
+    img = np.zeros((120, 90))
+    img[30:90, 20:60] = 1
+    img += 0.1 * rng.random(img.shape)
+
+    options = {
+        "method": "heterogeneous bregman",
+        "weight": 0.05 * np.ones(img.shape),
+        "max_num_iter": 30,
+        "solver": darsia.Jacobi(maxiter=5),
+    }
+    reference = darsia.TVD(**options)(img)
+    result = darsia.TVD(tile_shape=(40, 40), tile_overlap=6, num_workers=2, **options)(
+        img
+    )
+    assert result.shape == img.shape
+    assert np.allclose(result, reference, atol=1e-12)
+
+    # Insufficient overlap is reported
+    with pytest.warns(UserWarning, match="domain of dependence"):
+        darsia.TVD(tile_shape=(40, 40), tile_overlap=5, **options)(img)
+
+    # The skimage methods do not exchange halos
+    with pytest.warns(UserWarning, match="does not exchange halos"):
+        result = darsia.TVD(method="chambolle", tile_shape=(40, 40))(img)
+    assert np.allclose(result, darsia.TVD(method="chambolle")(img), atol=1e-2)
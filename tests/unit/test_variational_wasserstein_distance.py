@@ -1,5 +1,8 @@
 """Unit test of VariationalWassersteinDistance metods."""
 
+import json
+import tracemalloc
+
 import numpy as np
 
 import darsia
@@ -70,3 +73,26 @@ def test_vector_face_flux_norm_face_based():
         2 * [2**0.5] + 2 * [(0.5**2 + 2**2) ** 0.5],
         atol=1e-3,
     )
+
+
+def test_profiling(tmp_path):
+    """Profiling is opt-in and exports timings and memory consumption."""
+    solver_options = {"num_iter": 5, "return_info": True}
+    w1 = darsia.WassersteinDistanceNewton(grid, None, solver_options)
+    _, info = w1(src_image_2d, dst_image_2d)
+    assert "profile" not in info and "peak_memory_consumption" not in info
+    num_iter = len(info["convergence_history"]["run_time"])
+
+    solver_options["profiling"] = "memory"
+    w1 = darsia.WassersteinDistanceNewton(grid, None, solver_options)
+    _, info = w1(src_image_2d, dst_image_2d)
+    profile = info["profile"]
+    assert len(profile.iterations) == num_iter
+    assert info["peak_memory_consumption"] > 0
+    assert not tracemalloc.is_tracing()
+
+    profile.to_json(tmp_path / "profile.json")
+    summary = json.loads((tmp_path / "profile.json").read_text())["summary"]
+    assert summary["level"] == "memory"
+    assert summary["number_iterations"] == num_iter
+    assert summary["time_solve"] > 0
@@ -4,6 +4,7 @@ import numpy as np
 import pytest
 
 import darsia
+from darsia.measure.wasserstein import _coarsen_cells, _prolongate_flux
 
 try:
     import petsc4py
@@ -235,3 +236,111 @@ def test_adaptive_bregman(a_key, s_key, dim):
     )
     assert np.isclose(distance, true_distance[dim], atol=1e-5)
     assert info["converged"]
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_distance_matrix(warm_start, tmp_path):
+    """Compare batched distance matrix with pairwise distances."""
+    distance_options = options.copy()
+    distance_options.update(newton_options)
+    distance_options.update(off_aa)
+    distance_options.update(lu_options)
+    distance_options.update({"num_iter": 20, "return_info": False})
+
+    # Time series interpolating between source and destination
+    images = []
+    for t in np.linspace(0, 1, 4):
+        image = src_image_2d.copy()
+        image.img = (1 - t) * src_image_2d.img + t * dst_image_2d.img
+        images.append(image)
+
+    grid = darsia.generate_grid(images[0])
+    w1 = darsia.WassersteinDistanceNewton(grid, None, distance_options)
+    reference = np.array([[w1(img_i, img_j) for img_j in images] for img_i in images])
+
+    checkpoint = tmp_path / "distance_matrix.npz"
+    distance_matrix = w1.distance_matrix(
+        images, warm_start=warm_start, checkpoint=checkpoint
+    )
+    assert np.allclose(distance_matrix, reference, atol=1e-3 if warm_start else 1e-8)
+
+    # Computed pairs are reused from the checkpoint
+    with np.load(checkpoint) as data:
+        assert np.all(data["computed"] == np.triu(np.ones((4, 4), dtype=bool), 1))
+    assert np.allclose(
+        w1.distance_matrix(images, checkpoint=checkpoint), distance_matrix
+    )
+
+    # Parallel computation
+    if not warm_start:
+        distance_matrix = w1.distance_matrix(images, num_workers=2)
+        assert np.allclose(distance_matrix, reference, atol=1e-8)
+
+
+@pytest.mark.parametrize("mode", ["consecutive", "reference"])
+def test_distance_series(mode):
+    """Compare distances along a series with pairwise distances."""
+    distance_options = options.copy()
+    distance_options.update(newton_options)
+    distance_options.update(off_aa)
+    distance_options.update(lu_options)
+    distance_options.update({"num_iter": 20, "return_info": False})
+
+    images = []
+    for t in np.linspace(0, 1, 4):
+        image = src_image_2d.copy()
+        image.img = (1 - t) * src_image_2d.img + t * dst_image_2d.img
+        images.append(image)
+    pairs = [(i, i + 1) if mode == "consecutive" else (0, i + 1) for i in range(3)]
+    reference = [
+        darsia.wasserstein_distance(
+            images[i], images[j], method="newton", options=distance_options
+        )
+        for i, j in pairs
+    ]
+
+    for warm_start in [False, True]:
+        distances, info = darsia.wasserstein_distance_series(
+            images,
+            method="newton",
+            mode=mode,
+            warm_start=warm_start,
+            options=distance_options,
+        )
+        assert info["pairs"] == pairs
+        assert len(info["number_iterations"]) == 3
+        assert np.allclose(distances, reference, atol=1e-3 if warm_start else 1e-8)
+
+
+@pytest.mark.parametrize("shape", [(8, 6), (4, 6, 8)])
+def test_prolongate_flux(shape):
+    """RT0 prolongation of fluxes preserves the divergence."""
+    fine_grid = darsia.Grid(shape, 0.5)
+    coarse_grid = darsia.Grid(tuple(n // 2 for n in shape), 1.0)
+    coarse_flux = np.random.default_rng(0).random(coarse_grid.num_faces)
+    fine_flux = _prolongate_flux(coarse_grid, fine_grid, coarse_flux)
+
+    coarse_div = darsia.FVDivergence(coarse_grid).mat @ coarse_flux
+    fine_div = darsia.FVDivergence(fine_grid).mat @ fine_flux
+    restricted_div = _coarsen_cells(np.reshape(fine_div, shape, order="F")) * 2 ** len(
+        shape
+    )
+    assert np.allclose(np.ravel(restricted_div, "F"), coarse_div)
+
+
+def test_multilevel_newton():
+    """Multilevel initialization reports all levels and the fine distance."""
+    multilevel_options = options.copy()
+    multilevel_options.update(newton_options)
+    multilevel_options.update(off_aa)
+    multilevel_options.update(lu_options)
+    multilevel_options.update(
+        {"num_iter": 100, "num_levels": 2, "level_options": [{"num_iter": 20}]}
+    )
+    distance, info = darsia.wasserstein_distance(
+        src_image_2d, dst_image_2d, method="newton", options=multilevel_options
+    )
+    assert np.isclose(distance, true_distance_2d, atol=1e-4)
+    assert [level["shape"] for level in info["levels"]] == [(5, 5), (10, 10)]
+    assert info["levels"][0]["number_iterations"] <= 19
+    assert info["levels"][-1]["distance"] == distance